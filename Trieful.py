@@ -1,23 +1,339 @@
 #!/usr/bin/python
+import os
+import sys
 import types
+import struct
+import zlib
+import cPickle as pickle
+import sqlite3
+import socket
+import binascii
+import unicodedata
 import copy
+import ast
+import base64
+import codecs
+import json
+import heapq
+import random
+import time
+from itertools import chain, imap, islice, izip
+from collections import OrderedDict, deque
+from bisect import bisect_left, bisect_right, insort
+from array import array
+from timeit import default_timer
 
-KEY_DOTTED = {
+# the type of the read-only set views of dict keys, see STORE_SET
+KEYS_VIEW = type({}.viewkeys())
+
+"""
+Key and store function registry
+
+Key and store functions are dicts of functions. Registering them under a
+name lets a Trie using them be pickled (to hand to a multiprocessing worker,
+say): the functions are pickled by name, and looked up again when the Trie
+is unpickled, so the receiving process must have registered the same name.
+
+	KEY_REVERSED = registerKeyFunction('reversed', {
+		'pathToKey': lambda x: x[::-1],
+		'keyToPath': lambda x: ''.join(x)[::-1]
+	})
+
+The built in KEY_ and STORE_ functions are registered. Tries are only
+merged (+, +=) when their key and store functions have the same names.
+"""
+class TrieFunctions(dict):
+	"""
+	A registered dict of key or store functions, see registerKeyFunction
+	and registerStoreFunction.
+	"""
+	
+	def __init__(self, kind, name, functions):
+		dict.__init__(self, functions)
+		self.kind = kind
+		self.name = name
+	
+	def __reduce__(self):
+		return (registeredFunctions, (self.kind, self.name))
+	
+	def __repr__(self):
+		return "<%s function %s>" % (self.kind, self.name)
+
+_REGISTRY = {'key': {}, 'store': {}}
+
+def registerKeyFunction(name, functions):
+	"""
+	Register a dict of key functions (pathToKey, keyToPath) under a name,
+	returning the registered functions to pass to Trie.
+	"""
+	registered = TrieFunctions('key', name, functions)
+	_REGISTRY['key'][name] = registered
+	return registered
+
+def registerStoreFunction(name, functions):
+	"""
+	Register a dict of store functions (add, remove, get) under a name,
+	returning the registered functions to pass to Trie.
+	"""
+	registered = TrieFunctions('store', name, functions)
+	_REGISTRY['store'][name] = registered
+	return registered
+
+def registeredFunctions(kind, name):
+	"""
+	Look up registered 'key' or 'store' functions by name.
+	"""
+	try:
+		return _REGISTRY[kind][name]
+	except KeyError:
+		raise KeyError("No %s functions registered as %s" % (kind, name))
+
+def _functionsName(functions):
+	"""
+	The registered (kind, name) of key or store functions, or the functions
+	themselves if they aren't registered.
+	"""
+	if isinstance(functions, TrieFunctions):
+		return (functions.kind, functions.name)
+	return functions
+
+KEY_DOTTED = registerKeyFunction('dotted', {
 	'pathToKey':lambda x: x.split('.'),
 	'keyToPath':lambda x: '.'.join(x)
-}
+})
 
-KEY_STRING = {
+KEY_STRING = registerKeyFunction('string', {
 	'pathToKey': lambda x: x,
 	'keyToPath': lambda x: x
+})
+
+"""
+IP prefix KEY FUNCTION
+
+Map IPv4 or IPv6 CIDR prefixes ('10.0.0.0/8', '2001:db8::/32', or a bare
+address for a full length prefix) to their bits, grouped into _stride_ bit
+components so each node branches on up to 2^stride children. A prefix that
+ends partway through a stride ends in a (bits, length) component:
+	
+	'10.128.0.0/9' -> [10, (1, 1)]	(stride 8)
+	'0.0.0.0/0' -> [(0, 0)]
+	
+Host bits beyond the prefix length are ignored. The 'partials' function
+lists the partial components that a component starts with (longest first,
+down to the zero length (0, 0)), which Trie::longestPrefix uses to find
+prefixes that don't end on a stride boundary.
+"""
+def key_ip(version = 4, stride = 8):
+	
+	name = 'ipv%s/%s' % (version, stride)
+	if name in _REGISTRY['key']:
+		return _REGISTRY['key'][name]
+	
+	if version == 4:
+		(family, bits) = (socket.AF_INET, 32)
+	elif version == 6:
+		(family, bits) = (socket.AF_INET6, 128)
+	else:
+		raise ValueError("Unknown IP version: %s" % (version))
+	
+	chunkMask = (1 << stride) - 1
+	
+	def pathToKey(path):
+		if '/' in path:
+			(address, length) = path.split('/', 1)
+			length = int(length)
+			if length < 0 or length > bits:
+				raise ValueError("Invalid prefix length: %s" % (path))
+		else:
+			(address, length) = (path, bits)
+		
+		packed = socket.inet_pton(family, address)
+		rest = length % stride
+		
+		# a default route is a zero length component, so it's stored on a
+		# node like any other prefix rather than on the root
+		if length == 0:
+			return [(0, 0)]
+		
+		# byte strides are the packed address bytes
+		if stride == 8:
+			key = list(bytearray(packed[:length // 8]))
+			if rest:
+				key.append((ord(packed[length // 8]) >> (8 - rest), rest))
+			return key
+		
+		value = int(binascii.hexlify(packed), 16)
+		
+		key = []
+		offset = bits
+		for i in xrange(length // stride):
+			offset -= stride
+			key.append(int((value >> offset) & chunkMask))
+		
+		if rest:
+			key.append((int((value >> (offset - rest)) & ((1 << rest) - 1)), rest))
+		
+		return key
+	
+	def keyToPath(key):
+		value = 0
+		length = 0
+		for comp in key:
+			if isinstance(comp, tuple):
+				value = (value << comp[1]) | comp[0]
+				length += comp[1]
+			else:
+				value = (value << stride) | comp
+				length += stride
+		
+		value <<= bits - length
+		address = socket.inet_ntop(family, binascii.unhexlify('%0*x' % (bits // 4, value)))
+		return '%s/%i' % (address, length)
+	
+	# partial components are the same for every node, so compute them once
+	partialTable = [
+		[(comp >> (stride - l), l) for l in xrange(stride - 1, -1, -1)]
+		for comp in xrange(1 << stride)
+	]
+	
+	def partials(comp):
+		if isinstance(comp, tuple):
+			return [(comp[0] >> (comp[1] - l), l) for l in xrange(comp[1] - 1, -1, -1)]
+		return partialTable[comp]
+	
+	return registerKeyFunction(name, {
+		'pathToKey': pathToKey,
+		'keyToPath': keyToPath,
+		'partials': partials
+	})
+
+KEY_IPV4 = key_ip(4)
+KEY_IPV6 = key_ip(6)
+
+"""
+Normalized KEY FUNCTION
+
+Case insensitive and Unicode normalized keys. Paths are normalized as they
+are added, so u'Stra\xdfe', 'STRASSE' and 'strasse' are one path:
+
+	t = Trie(keyFunction = key_normalized('casefold'))
+	t.add(u'Stra\xdfe', 1)
+	t.get('STRASSE')	# 1
+
+The _form_ is 'casefold' (full case folding), 'nfkc' (compatibility
+normalization, so u'\uff21' is 'A' and u'\ufb01' is 'fi') or 'nfkc_casefold'
+(both). Components are characters, or the parts between _separator_ if it
+is given. str paths are taken to be UTF-8.
+
+The 'fold' function generates the key of a path one component at a time,
+so lookups that stop early (see NormalizedTrie) don't normalize the rest of
+the path. Runs of non-ASCII characters (with the ASCII character before
+them) are normalized up to the next ASCII character, which never combines
+with the characters before it. Keys come
+back as the normalized spelling; NormalizedTrie keeps the original.
+"""
+
+# full case foldings that differ from lower()
+_CASEFOLD = {
+	u'\xb5': u'\u03bc', u'\xdf': u'ss', u'\u0149': u'\u02bcn', u'\u017f': u's',
+	u'\u01f0': u'j\u030c', u'\u0345': u'\u03b9', u'\u0390': u'\u03b9\u0308\u0301',
+	u'\u03b0': u'\u03c5\u0308\u0301', u'\u03c2': u'\u03c3', u'\u03d0': u'\u03b2',
+	u'\u03d1': u'\u03b8', u'\u03d5': u'\u03c6', u'\u03d6': u'\u03c0', u'\u03f0': u'\u03ba',
+	u'\u03f1': u'\u03c1', u'\u03f5': u'\u03b5', u'\u0587': u'\u0565\u0582',
+	u'\u1e96': u'h\u0331', u'\u1e97': u't\u0308', u'\u1e98': u'w\u030a', u'\u1e99': u'y\u030a',
+	u'\u1e9a': u'a\u02be', u'\u1e9b': u'\u1e61', u'\u1fbe': u'\u03b9',
+	u'\ufb00': u'ff', u'\ufb01': u'fi', u'\ufb02': u'fl', u'\ufb03': u'ffi',
+	u'\ufb04': u'ffl', u'\ufb05': u'st', u'\ufb06': u'st'
 }
 
+def _casefold(s):
+	return u''.join([_CASEFOLD.get(c, c) for c in s.lower()])
+
+def key_normalized(form = 'casefold', separator = None):
+	
+	name = 'normalized:%s:%s' % (form, separator)
+	if name in _REGISTRY['key']:
+		return _REGISTRY['key'][name]
+	
+	if form == 'casefold':
+		normalize = _casefold
+	elif form == 'nfkc':
+		normalize = lambda s: unicodedata.normalize('NFKC', s)
+	elif form == 'nfkc_casefold':
+		normalize = lambda s: unicodedata.normalize('NFKC', _casefold(unicodedata.normalize('NFKC', s)))
+	else:
+		raise ValueError("Unknown normalization form: %s" % (form))
+	
+	lowers = form != 'nfkc'
+	
+	# ASCII characters fold on their own
+	if lowers:
+		asciiFolds = dict((chr(i), chr(i).lower()) for i in xrange(0x80))
+	else:
+		asciiFolds = dict((chr(i), chr(i)) for i in xrange(0x80))
+	
+	def foldRun(run):
+		if isinstance(run, str):
+			run = run.decode('utf-8')
+		return normalize(run)
+	
+	def foldChars(path):
+		asciiFold = asciiFolds.get
+		
+		# the last ASCII character is held back in case combining
+		# characters follow it, and is folded with them
+		held = None
+		run = None
+		for (i, ch) in enumerate(path):
+			folded = asciiFold(ch)
+			if folded is not None:
+				if held is not None:
+					yield held
+				elif run is not None:
+					for c in foldRun(path[run:i]):
+						yield c
+					run = None
+				held = folded
+			elif run is None:
+				run = i - 1 if held is not None else i
+				held = None
+		
+		if held is not None:
+			yield held
+		elif run is not None:
+			for c in foldRun(path[run:]):
+				yield c
+	
+	if separator is None:
+		fold = foldChars
+		keyToPath = lambda key: ''.join(key)
+	else:
+		def fold(path):
+			start = 0
+			while True:
+				end = path.find(separator, start)
+				if end < 0:
+					yield ''.join(foldChars(path[start:]))
+					return
+				yield ''.join(foldChars(path[start:end]))
+				start = end + len(separator)
+		
+		keyToPath = lambda key: separator.join(key)
+	
+	return registerKeyFunction(name, {
+		'pathToKey': lambda path: list(fold(path)),
+		'keyToPath': keyToPath,
+		'fold': fold
+	})
+
 """
 Default STORE FUNCTION
 
 add: Append value to a list
 remove: Remove first occurance of value from list
 get: Return the list, or if the list is of length 1, return the only item in the list
+members: The values in the list, for the value index (see Trie::enableValueIndex)
+contains: Whether the list holds a value
 """
 def store_default_add(old, new):
 	if old is None:
@@ -42,11 +358,19 @@ def store_default_get(obj):
 	else:
 		return obj
 
-STORE_DEFAULT = {
+def store_default_members(obj):
+	return obj
+
+def store_default_contains(obj, val):
+	return val in obj
+
+STORE_DEFAULT = registerStoreFunction('default', {
 	'add': store_default_add,
 	'remove': store_default_remove,
-	'get': store_default_get
-}
+	'get': store_default_get,
+	'members': store_default_members,
+	'contains': store_default_contains
+})
 
 """
 Overwrite STORE FUNCTION
@@ -66,11 +390,11 @@ def store_ow_remove(obj, val):
 def store_ow_get(obj):
 	return obj
 	
-STORE_OVERWRITE = {
+STORE_OVERWRITE = registerStoreFunction('overwrite', {
 	'add': store_ow_add,
 	'remove': store_ow_remove,
 	'get': store_ow_get
-}
+})
 
 """
 Addition STORE FUNCTION
@@ -93,11 +417,11 @@ def store_add_remove(old, new):
 def store_add_get(old):
 	return old
 	
-STORE_ADD = {
+STORE_ADD = registerStoreFunction('add', {
 	'add': store_add_add,
 	'remove': store_add_remove,
 	'get': store_add_get
-}
+})
 
 """
 Count STORE FUNCTION
@@ -124,12 +448,383 @@ def store_count_remove(old, new):
 def store_count_get(obj):
 	return obj
 	
-STORE_COUNT = {
+STORE_COUNT = registerStoreFunction('count', {
 	'add': store_count_add,
 	'remove': store_count_remove,
 	'get': store_count_get
-}
+})
+
+"""
+Set STORE FUNCTION
+
+Each path holds a set of distinct values. Values are kept as the keys of
+a dict, so adding, removing and testing a value take constant time
+however many values the path holds.
+
+add: Add the value, if it isn't already held
+remove: Remove the value (None when no values remain)
+get: A read-only, set-like view of the values, which follows later changes
+members: The values held
+contains: Whether the value is held
+"""
+def store_set_add(old, new):
+	if old is None:
+		return {new: None}
+	else:
+		old[new] = None
+		return old
+
+def store_set_remove(obj, val):
+	obj.pop(val, None)
+	if len(obj) == 0:
+		return None
+	else:
+		return obj
+
+def store_set_get(obj):
+	return obj.viewkeys()
+
+def store_set_members(obj):
+	return obj.iterkeys()
+
+def store_set_contains(obj, val):
+	return val in obj
+
+STORE_SET = registerStoreFunction('set', {
+	'add': store_set_add,
+	'remove': store_set_remove,
+	'get': store_set_get,
+	'members': store_set_members,
+	'contains': store_set_contains
+})
+
+"""
+Multiset STORE FUNCTION
+
+Like STORE_SET, but counting how many times each value was added. Values
+are kept in a dict of counts.
+
+add: Increment the count of the value
+remove: Decrement the count of the value, dropping it at zero (None when no values remain)
+get: A read-only MultisetView of the values and their counts
+members: Each value, repeated by its count
+contains: Whether the value is held
+"""
+def store_multiset_add(old, new):
+	if old is None:
+		return {new: 1}
+	else:
+		old[new] = old.get(new, 0) + 1
+		return old
+
+def store_multiset_remove(obj, val):
+	count = obj.get(val)
+	if count is None:
+		return obj
+	elif count > 1:
+		obj[val] = count - 1
+		return obj
+	
+	del obj[val]
+	if len(obj) == 0:
+		return None
+	else:
+		return obj
+
+def store_multiset_get(obj):
+	return MultisetView(obj)
+
+def store_multiset_members(obj):
+	for (val, count) in obj.iteritems():
+		for i in xrange(count):
+			yield val
+
+STORE_MULTISET = registerStoreFunction('multiset', {
+	'add': store_multiset_add,
+	'remove': store_multiset_remove,
+	'get': store_multiset_get,
+	'members': store_multiset_members,
+	'contains': store_set_contains
+})
+
+class MultisetView(object):
+	"""
+	A read-only view of the values held by a STORE_MULTISET path. Like a
+	collections.Counter, iterating and len() see each distinct value once,
+	and count() gives the number of times a value was added:
+		
+		t = Trie(storeFunction = STORE_MULTISET)
+		t.add('a', 'x')
+		t.add('a', 'x')
+		t.get('a').count('x') == 2
+	"""
+	
+	__slots__ = ('_counts',)
+	
+	def __init__(self, counts):
+		self._counts = counts
+	
+	def __contains__(self, val):
+		return val in self._counts
+	
+	def __iter__(self):
+		return self._counts.iterkeys()
+	
+	def __len__(self):
+		return len(self._counts)
 	
+	def __eq__(self, other):
+		if isinstance(other, MultisetView):
+			return self._counts == other._counts
+		return self._counts == other
+	
+	def __ne__(self, other):
+		return not self == other
+	
+	def count(self, val):
+		return self._counts.get(val, 0)
+	
+	def elements(self):
+		"""
+		Generate each value, repeated by its count.
+		"""
+		return store_multiset_members(self._counts)
+	
+	def items(self):
+		"""
+		Return (value, count) for each distinct value.
+		"""
+		return self._counts.items()
+	
+	def copy(self):
+		"""
+		Return a view of a copy of the counts, which doesn't follow later
+		changes.
+		"""
+		return MultisetView(dict(self._counts))
+	
+	def __repr__(self):
+		return "MultisetView(%r)" % (self._counts,)
+
+"""
+Array STORE FUNCTION
+
+Numeric values are kept in a contiguous array, and each node holds the
+number of its slot in the array. This gives no memory saving and no
+speed-up over STORE_COUNT: the slot number takes the place of the count in
+the node, addCounts is about as fast with either, and prefixSum and
+prefixMax are slower, as each value is looked up in the array. Use it to
+keep floats ('d') or counts of a fixed width in one array. Each Trie needs
+its own array store, so this is a factory:
+
+	t = Trie(storeFunction = store_array())
+	t = Trie(storeFunction = store_array('d', count = False))
+
+count=True behaves like STORE_COUNT, count=False behaves like STORE_ADD.
+
+add: allocate a slot, or increment the value in the existing slot
+remove: decrement the slot value (count mode frees the slot at zero)
+get: retrieve the slot value
+bulk: add _n_ occurrences of a value in one step (see Trie::addCounts)
+discard: release the slot of a node removed with removeAll
+dump: the portable value of a slot, for serializing the Trie
+load: store a portable value, reusing the old slot if there is one
+"""
+def store_array(typecode = 'q', count = True):
+	
+	try:
+		values = array(typecode)
+	except ValueError:
+		# 'q' isn't available on older interpreters, 'l' is 64 bit on LP64 platforms
+		if typecode != 'q':
+			raise
+		values = array('l')
+	
+	return _array_store(values, [], count)
+
+def _array_store(values, free, count):
+	
+	def alloc(amount):
+		if free:
+			slot = free.pop()
+			values[slot] = amount
+		else:
+			slot = len(values)
+			values.append(amount)
+		return slot
+	
+	def bulk(old, n, new):
+		if count:
+			amount = n
+		else:
+			amount = n * new
+		
+		if old is None:
+			return alloc(amount)
+		else:
+			values[old] += amount
+			return old
+	
+	def add(old, new):
+		return bulk(old, 1, new)
+	
+	def remove(old, new):
+		if count:
+			values[old] -= 1
+			if values[old] == 0:
+				free.append(old)
+				return None
+		else:
+			values[old] -= new
+		return old
+	
+	def get(obj):
+		return values[obj]
+	
+	def discard(obj):
+		values[obj] = 0
+		free.append(obj)
+	
+	def load(old, value):
+		if old is None:
+			return alloc(value)
+		values[old] = value
+		return old
+	
+	def copyStore():
+		return _array_store(array(values.typecode, values), list(free), count)
+	
+	return ArrayStoreFunctions(values, free, count, {
+		'add': add,
+		'remove': remove,
+		'get': get,
+		'bulk': bulk,
+		'discard': discard,
+		'dump': get,
+		'load': load,
+		'copy': copyStore,
+		'values': values,
+		'count': count
+	})
+
+class ArrayStoreFunctions(TrieFunctions):
+	"""
+	The store functions of a store_array, which pickle with their array.
+	"""
+	
+	def __init__(self, values, free, count, functions):
+		TrieFunctions.__init__(self, 'store', 'array:%s:%s' % (values.typecode, count), functions)
+		self._state = (values, free, count)
+	
+	def __reduce__(self):
+		return (_array_store, self._state)
+	
+# nodes with more children than this keep their sorted child keys cached
+# between ordered traversals, smaller nodes are cheaper to sort each time
+SORTED_CHILDREN_CACHE = 32
+
+"""
+Walk controls
+
+Returned by the visitor of Trie::walk to skip the children of the node
+just visited, or to stop the walk.
+"""
+WALK_SKIP = 'skip'
+WALK_STOP = 'stop'
+
+class TrieProfiler(object):
+	"""
+	Call counts and latency histograms for the operations of a profiled Trie,
+	see Trie::enableProfiling. Latencies are bucketed by powers of two
+	microseconds, so a bucket of 8 holds calls taking 4-8us.
+	
+	An optional _sink_ is called with (operation, seconds) for every
+	recorded call, to forward timings to an external metrics system.
+	"""
+	
+	def __init__(self, sink = None):
+		self.sink = sink
+		self.reset()
+	
+	def reset(self):
+		"""
+		Discard all recorded timings.
+		"""
+		self._stats = {}
+	
+	def record(self, op, elapsed):
+		stats = self._stats.get(op)
+		if stats is None:
+			stats = self._stats[op] = [0, 0.0, {}]
+		
+		stats[0] += 1
+		stats[1] += elapsed
+		
+		bucket = 1
+		micros = elapsed * 1000000
+		while bucket < micros:
+			bucket <<= 1
+		stats[2][bucket] = stats[2].get(bucket, 0) + 1
+		
+		if self.sink is not None:
+			self.sink(op, elapsed)
+	
+	def snapshot(self):
+		"""
+		Return a copy of the recorded timings, keyed by operation name:
+			
+			{
+				'get': {'calls': 2, 'total': 0.000012, 'histogram': {4: 1, 8: 1}},
+				'store.get': {...}
+			}
+		"""
+		snap = {}
+		for (op, stats) in self._stats.items():
+			snap[op] = {
+				'calls': stats[0],
+				'total': stats[1],
+				'histogram': dict(stats[2])
+			}
+		return snap
+	
+	def _timed(self, op, func):
+		record = self.record
+		def timed(*args, **kwargs):
+			st = default_timer()
+			try:
+				return func(*args, **kwargs)
+			finally:
+				record(op, default_timer() - st)
+		return timed
+	
+	def _timedGenerator(self, op, func):
+		record = self.record
+		def timed(*args, **kwargs):
+			# only time spent producing items is recorded, not time spent
+			# by the caller consuming them
+			st = default_timer()
+			elapsed = 0.0
+			try:
+				gen = func(*args, **kwargs)
+				while True:
+					try:
+						item = gen.next()
+					except StopIteration:
+						break
+					elapsed += default_timer() - st
+					yield item
+					st = default_timer()
+			finally:
+				record(op, elapsed + default_timer() - st)
+		return timed
+	
+	def _timedFunctions(self, prefix, functions):
+		timed = dict(functions)
+		for (name, func) in functions.items():
+			if name in ('add', 'remove', 'get', 'pathToKey', 'keyToPath'):
+				timed[name] = self._timed(prefix + name, func)
+		return timed
+
 class Trie(object):
 	"""
 	A fast, non-recursive Trie structure. Keys can be any iterable data type, and
@@ -289,6 +984,37 @@ class Trie(object):
 			self._keyFunction = keyFunction
 		
 		self._defaultValue = defaultValue
+		self._profiler = None
+		
+		# counts changes to the shape of the Trie (nodes and the presence
+		# of values, not the values themselves), so structures derived from
+		# the nodes can tell when they are stale
+		self._changes = 0
+		
+		# sorted child keys of the nodes visited by ordered traversals,
+		# keyed by node id (see _sortedChildren)
+		self._childOrder = {}
+		
+		# hashes of subtrees compared by diff, keyed by node id, and
+		# discarded along the path of every change (see _subtreeHash)
+		self._hashes = {}
+		
+		# [node, paths, weight, sampling table] of subtrees, used to sample,
+		# rank and index paths, keyed by node id and discarded like the
+		# hashes (see _subtreeSize)
+		self._subtreeSizes = {}
+		
+		# (callback, batch size, pending events) of each subscriber, see
+		# subscribe. Changes are only turned into events while this is
+		# non-empty
+		self._subscribers = []
+		
+		# value -> set of keys holding it, see enableValueIndex
+		self._valueIndex = None
+		
+		# whether changes need _beforeChange and _changed calls, for
+		# subscribers or the value index
+		self._watched = False
 		
 	def _pathToKey(self, p):
 		"""
@@ -301,59 +1027,671 @@ class Trie(object):
 		Given a key, reconstitute the original path
 		"""
 		return self._keyFunction['keyToPath'](k)
-		
-	def add(self, path, value = None, atAllSubPaths = False):
+	
+	def _findNode(self, key):
 		"""
-		Map the path key to the given object.
+		Walk the key components from the root, returning the node at the
+		end of the key, or None if the key isn't in the Trie.
 		"""
-		addObj = value
-		if addObj is None:
-			addObj = self._defaultValue
-			
 		baseNode = self._nodes
-		lastNodeAdded = False
-		
-		for comp in self._pathToKey(path):
+		for comp in key:
 			if comp not in baseNode:
-				baseNode[comp] = {}
+				return None
 			baseNode = baseNode[comp]
-			
-			# add to this subpath
-			if atAllSubPaths:
-				if '__' not in baseNode:
-					lastNodeAdded = True
-					baseNode['__'] = self._storeFunction['add'](None, addObj)
-				else:
-					lastNodeAdded = False
-					oldValue = baseNode['__']
-					baseNode['__'] = self._storeFunction['add'](oldValue, addObj)
-
-		if not atAllSubPaths:
-			if '__' not in baseNode:
-				lastNodeAdded = True
-				baseNode['__'] = self._storeFunction['add'](None, addObj)
-			else:
-				lastNodeAdded = False
-				oldValue = baseNode['__']
-				baseNode['__'] = self._storeFunction['add'](oldValue, addObj)
-		
-		if lastNodeAdded:
-			self._size += 1
-			
-	def __setitem__(self, path, obj):
+		return baseNode
+	
+	def _sortedChildren(self, node):
 		"""
-		Set an item using the square bracket accessors
+		Return the sorted child keys of a node. The sorted keys are cached
+		the first time a node is visited, and kept up to date as children
+		are added and removed, so repeated ordered traversals don't sort.
 		"""
-		self.add(path, obj)
+		entry = self._childOrder.get(id(node))
 		
-	def removeAll(self, path):
+		# the node is kept in the entry, so an id can't be recycled by
+		# another node while the entry exists
+		if entry is not None and entry[0] is node:
+			return entry[1]
+		
+		keys = [k for k in node if k != '__']
+		keys.sort()
+		self._childOrder[id(node)] = (node, keys)
+		return keys
+	
+	def _childAdded(self, node, comp):
+		entry = self._childOrder.get(id(node))
+		if entry is not None and entry[0] is node:
+			insort(entry[1], comp)
+	
+	def _childRemoved(self, node, comp):
+		child = node.pop(comp)
+		
+		if self._childOrder:
+			self._childOrder.pop(id(child), None)
+			entry = self._childOrder.get(id(node))
+			if entry is not None and entry[0] is node:
+				keys = entry[1]
+				del keys[bisect_left(keys, comp)]
+	
+	def _invalidatePath(self, key):
 		"""
-		Remove all of the items associated with this path. This does not delete sub paths, only
-		the current objects of the path.
+		Discard the cached subtree hashes and sizes of the nodes along the
+		key, before the node at the end of it changes.
 		"""
-		
 		baseNode = self._nodes
-		pathKey = self._pathToKey(path)
+		self._hashes.pop(id(baseNode), None)
+		self._subtreeSizes.pop(id(baseNode), None)
+		for comp in key:
+			if comp not in baseNode:
+				return
+			baseNode = baseNode[comp]
+			self._hashes.pop(id(baseNode), None)
+			self._subtreeSizes.pop(id(baseNode), None)
+	
+	def _subtreeHash(self, node):
+		"""
+		Hash the paths and values at and below a node, independent of the
+		order children were added in. Hashes are cached until a change
+		below the node, so comparing mostly unchanged Tries is cheap.
+		"""
+		hashes = self._hashes
+		entry = hashes.get(id(node))
+		if entry is not None and entry[0] is node:
+			return entry[1]
+		
+		# post order, so children are hashed before their parents
+		stack = [(node, False)]
+		while stack:
+			(node, expanded) = stack.pop()
+			if not expanded:
+				entry = hashes.get(id(node))
+				if entry is None or entry[0] is not node:
+					stack.append((node, True))
+					for (comp, child) in node.iteritems():
+						if comp != '__':
+							stack.append((child, False))
+				continue
+			
+			h = 0
+			for (comp, child) in node.iteritems():
+				if comp == '__':
+					h += hash(repr(self._dumpValue(child)))
+				else:
+					h += hash((comp, hashes[id(child)][1]))
+			hashes[id(node)] = (node, h & 0xFFFFFFFFFFFFFFFF)
+		
+		return hashes[id(node)][1]
+	
+	def _subtreeSize(self, node):
+		"""
+		Return (paths, weight) for the values at and below a node: the
+		number of them, and the sum of them (None if any isn't a number).
+		Sizes are cached until a change below the node, like the hashes.
+		"""
+		sizes = self._subtreeSizes
+		entry = sizes.get(id(node))
+		if entry is not None and entry[0] is node:
+			return (entry[1], entry[2])
+		
+		get = self._storeFunction['get']
+		numbers = (int, long, float)
+		
+		# post order, so children are sized before their parents
+		stack = [(node, False)]
+		while stack:
+			(node, expanded) = stack.pop()
+			if not expanded:
+				entry = sizes.get(id(node))
+				if entry is None or entry[0] is not node:
+					stack.append((node, True))
+					for (comp, child) in node.iteritems():
+						if comp != '__':
+							stack.append((child, False))
+				continue
+			
+			paths = 0
+			weight = 0
+			for (comp, child) in node.iteritems():
+				if comp == '__':
+					paths += 1
+					value = get(child)
+					if weight is not None and isinstance(value, numbers):
+						weight += value
+					else:
+						weight = None
+				else:
+					(childPaths, childWeight) = sizes[id(child)][1:3]
+					paths += childPaths
+					if weight is not None and childWeight is not None:
+						weight += childWeight
+					else:
+						weight = None
+			sizes[id(node)] = [node, paths, weight, None]
+		
+		entry = sizes[id(node)]
+		return (entry[1], entry[2])
+	
+	def _samplingTable(self, node):
+		"""
+		Return the child keys of a node with the running totals of the
+		paths and weights below them, (keys, paths, weights), so a child
+		can be picked by bisecting. weights is None if any value below
+		isn't a number. Cached with the subtree size of the node.
+		"""
+		self._subtreeSize(node)
+		entry = self._subtreeSizes[id(node)]
+		if entry[3] is None:
+			comps = []
+			cumPaths = []
+			cumWeights = []
+			paths = 0
+			weight = 0
+			for (comp, child) in node.iteritems():
+				if comp == '__':
+					continue
+				(childPaths, childWeight) = self._subtreeSize(child)
+				comps.append(comp)
+				paths += childPaths
+				cumPaths.append(paths)
+				if weight is not None and childWeight is not None:
+					weight += childWeight
+					cumWeights.append(weight)
+				else:
+					weight = None
+			
+			entry[3] = (comps, cumPaths, cumWeights if weight is not None else None)
+		return entry[3]
+	
+	def subscribe(self, callback, batch = None):
+		"""
+		Call the callback with an (op, path, old, new) event for every
+		change to the values of the Trie:
+		
+			def reindex(event):
+				(op, path, old, new) = event
+				index[path] = new
+			
+			t.subscribe(reindex)
+		
+		op is 'add', 'remove' or 'removeAll', and old and new are the
+		values at the path before and after the change, None where the path
+		had no value. prune and += generate the events of the removeAll and
+		add calls they make, and changes applied by applyDiff are 'add'
+		events. mapValues and filterValues generate 'map' and 'filter'
+		events. Subclasses add their own: 'expire' for entries expired from
+		an ExpiringTrie, and 'evict' for entries evicted from a BoundedTrie.
+		
+		With a _batch_ size, events are queued and the callback is called
+		with a list of up to _batch_ events at a time, so busy writers aren't
+		slowed by a callback per change. Queued events are delivered early by
+		flushEvents. Without subscribers no events are made at all.
+		"""
+		self._subscribers.append((callback, batch, []))
+		self._watch()
+	
+	def unsubscribe(self, callback):
+		"""
+		Stop sending events to the callback, after delivering any that are
+		queued for it.
+		"""
+		for subscriber in self._subscribers:
+			if subscriber[0] == callback:
+				self._deliver(subscriber)
+				self._subscribers.remove(subscriber)
+				self._watch()
+				return
+		raise ValueError("Callback isn't subscribed to the Trie")
+	
+	def flushEvents(self):
+		"""
+		Deliver the queued events of batched subscribers.
+		"""
+		for subscriber in self._subscribers:
+			self._deliver(subscriber)
+	
+	def enableValueIndex(self):
+		"""
+		Keep an index from values to the paths holding them, for pathsFor
+		and removeValueEverywhere. The index is built from the current
+		contents, and kept up to date by every change. Values must be
+		hashable.
+		
+		Stores holding many values per path (STORE_DEFAULT) index each of
+		the values, other stores index the value returned by get.
+		"""
+		self._valueIndex = {}
+		for (key, raw) in self._rawItems():
+			self._reindex(key, self._beforeChange(None, True)[1], raw, 'add', None)
+		self._watch()
+	
+	def disableValueIndex(self):
+		"""
+		Stop maintaining the value index, and discard it.
+		"""
+		self._valueIndex = None
+		self._watch()
+	
+	def pathsFor(self, value):
+		"""
+		Return the paths holding the value, in order, using the value index
+		(see enableValueIndex):
+		
+			t.pathsFor(handler)
+		"""
+		if self._valueIndex is None:
+			raise ValueError("The value index isn't enabled, see Trie::enableValueIndex")
+		
+		keys = sorted(self._valueIndex.get(value, ()))
+		return [self._keyToPath(list(key)) for key in keys]
+	
+	def removeValueEverywhere(self, value):
+		"""
+		Remove the value from every path holding it, returning the number of
+		paths it was removed from. Every copy of the value is removed from
+		stores holding many values per path (STORE_DEFAULT), and paths are
+		removed with removeAll for other stores. Uses the value index, so
+		this takes time in proportion to the paths holding the value rather
+		than the size of the Trie.
+		"""
+		if self._valueIndex is None:
+			raise ValueError("The value index isn't enabled, see Trie::enableValueIndex")
+		
+		store = self._functions()[1]
+		keys = list(self._valueIndex.get(value, ()))
+		for key in keys:
+			path = self._keyToPath(list(key))
+			if 'members' in store:
+				copies = [member for member in store['members'](self._findNode(key)['__']) if member == value]
+				for member in copies:
+					self.remove(path, value)
+			else:
+				self.removeAll(path)
+		
+		return len(keys)
+	
+	def _deliver(self, subscriber):
+		(callback, batch, pending) = subscriber
+		if pending:
+			events = pending[:]
+			del pending[:]
+			callback(events)
+	
+	def _eventValue(self, raw):
+		"""
+		The value of a raw node value as seen by subscribers. Values are
+		copied, as stores like STORE_DEFAULT change them in place.
+		"""
+		if raw is None:
+			return None
+		
+		value = self._functions()[1]['get'](raw)
+		if type(value) is list:
+			return value[:]
+		elif type(value) in (dict, set):
+			return copy.copy(value)
+		elif type(value) is KEYS_VIEW:
+			return frozenset(value)
+		elif type(value) is MultisetView:
+			return value.copy()
+		return value
+	
+	def _watch(self):
+		self._watched = bool(self._subscribers) or self._valueIndex is not None
+	
+	def _beforeChange(self, raw, whole = False):
+		"""
+		Capture what subscribers and the value index need to know about a
+		raw node value before it changes. _whole_ marks changes replacing
+		the entire value (removeAll, load) rather than adding or removing
+		the one value passed to add or remove.
+		"""
+		if self._subscribers:
+			old = self._eventValue(raw)
+		else:
+			old = None
+		
+		store = self._functions()[1]
+		if self._valueIndex is None:
+			indexed = None
+		elif 'members' in store:
+			if not whole:
+				indexed = None
+			elif raw is None:
+				indexed = []
+			else:
+				indexed = list(store['members'](raw))
+		elif raw is None:
+			indexed = None
+		else:
+			indexed = store['get'](raw)
+		
+		return (old, indexed)
+	
+	def _changed(self, op, key, before, raw, value):
+		"""
+		Record the change of a node value, now _raw_, for subscribers and
+		the value index.
+		"""
+		if self._valueIndex is not None:
+			self._reindex(key, before[1], raw, op, value)
+		if self._subscribers:
+			self._emit(op, key, before[0], self._eventValue(raw))
+	
+	def _reindex(self, key, before, raw, op, value):
+		index = self._valueIndex
+		key = tuple(key)
+		store = self._functions()[1]
+		
+		if 'members' not in store:
+			# the value is the whole node value
+			if raw is None:
+				after = None
+			else:
+				after = store['get'](raw)
+			
+			if before is not None and before != after:
+				self._unindex(before, key)
+			if after is not None:
+				index.setdefault(after, set()).add(key)
+		
+		elif before is not None:
+			# the whole node value was replaced
+			for member in before:
+				self._unindex(member, key)
+			if raw is not None:
+				for member in store['members'](raw):
+					index.setdefault(member, set()).add(key)
+		
+		elif op == 'add':
+			index.setdefault(value, set()).add(key)
+		
+		elif raw is None or not store['contains'](raw, value):
+			self._unindex(value, key)
+	
+	def _unindex(self, value, key):
+		keys = self._valueIndex.get(value)
+		if keys is not None:
+			keys.discard(key)
+			if not keys:
+				del self._valueIndex[value]
+	
+	def _emit(self, op, key, old, new):
+		event = (op, self._keyToPath(key), old, new)
+		for subscriber in self._subscribers:
+			(callback, batch, pending) = subscriber
+			if batch is None:
+				callback(event)
+			else:
+				pending.append(event)
+				if len(pending) >= batch:
+					self._deliver(subscriber)
+	
+	def _childKeys(self, node):
+		"""
+		Return the child keys of a node in ascending order.
+		"""
+		if len(node) > SORTED_CHILDREN_CACHE:
+			return self._sortedChildren(node)
+		
+		keys = [k for k in node if k != '__']
+		keys.sort()
+		return keys
+	
+	def _rawItems(self, key = None, node = None):
+		"""
+		Generate (key, raw value) for every node holding a value at or below
+		the node, in no particular order. Keys are shared with the traversal,
+		so copy them if they need to be kept.
+		"""
+		if node is None:
+			(key, node) = ([], self._nodes)
+		
+		stack = [(key, node)]
+		while stack:
+			(key, node) = stack.pop()
+			if '__' in node:
+				yield (key, node['__'])
+			for (comp, child) in node.iteritems():
+				if comp != '__':
+					stack.append((key + [comp], child))
+	
+	def _dumpValue(self, raw):
+		"""
+		Convert a raw node value to a portable value, for storage functions
+		(like store_array) whose node values only mean something to this Trie.
+		"""
+		dump = self._storeFunction.get('dump')
+		if dump is None:
+			return raw
+		return dump(raw)
+	
+	def _loadValue(self, key, value):
+		"""
+		Set the raw value of the node at the key from a portable value
+		produced by _dumpValue, creating the node if needed.
+		"""
+		if self._hashes or self._subtreeSizes:
+			self._invalidatePath(key)
+		
+		baseNode = self._nodes
+		for comp in key:
+			if comp not in baseNode:
+				baseNode[comp] = {}
+				self._changes += 1
+				if self._childOrder:
+					self._childAdded(baseNode, comp)
+			baseNode = baseNode[comp]
+		
+		old = baseNode.get('__')
+		if old is None:
+			self._size += 1
+			self._changes += 1
+		
+		if self._watched:
+			before = self._beforeChange(old, True)
+		
+		load = self._storeFunction.get('load')
+		if load is None:
+			baseNode['__'] = value
+		else:
+			baseNode['__'] = load(old, value)
+		
+		if self._watched:
+			self._changed('add', key, before, baseNode['__'], None)
+	
+	def _subNodes(self, node):
+		"""
+		Generate the given node and every node below it, without recursion.
+		"""
+		stack = [node]
+		while stack:
+			node = stack.pop()
+			yield node
+			for (comp, child) in node.iteritems():
+				if comp != '__':
+					stack.append(child)
+		
+	def add(self, path, value = None, atAllSubPaths = False):
+		"""
+		Map the path key to the given object.
+		"""
+		addObj = value
+		if addObj is None:
+			addObj = self._defaultValue
+			
+		pathKey = self._pathToKey(path)
+		if self._hashes or self._subtreeSizes:
+			self._invalidatePath(pathKey)
+		
+		baseNode = self._nodes
+		lastNodeAdded = False
+		
+		if atAllSubPaths:
+			depth = 0
+		
+		for comp in pathKey:
+			if comp not in baseNode:
+				baseNode[comp] = {}
+				self._changes += 1
+				if self._childOrder:
+					self._childAdded(baseNode, comp)
+			baseNode = baseNode[comp]
+			
+			# add to this subpath
+			if atAllSubPaths:
+				depth += 1
+				if self._watched:
+					before = self._beforeChange(baseNode.get('__'))
+				
+				if '__' not in baseNode:
+					lastNodeAdded = True
+					baseNode['__'] = self._storeFunction['add'](None, addObj)
+					self._changes += 1
+				else:
+					lastNodeAdded = False
+					oldValue = baseNode['__']
+					baseNode['__'] = self._storeFunction['add'](oldValue, addObj)
+				
+				if self._watched:
+					self._changed('add', pathKey[:depth], before, baseNode['__'], addObj)
+
+		if not atAllSubPaths:
+			if self._watched:
+				before = self._beforeChange(baseNode.get('__'))
+			
+			if '__' not in baseNode:
+				lastNodeAdded = True
+				baseNode['__'] = self._storeFunction['add'](None, addObj)
+				self._changes += 1
+			else:
+				lastNodeAdded = False
+				oldValue = baseNode['__']
+				baseNode['__'] = self._storeFunction['add'](oldValue, addObj)
+			
+			if self._watched:
+				self._changed('add', pathKey, before, baseNode['__'], addObj)
+		
+		if lastNodeAdded:
+			self._size += 1
+			
+	def addCounts(self, paths, value = None, atAllSubPaths = False):
+		"""
+		Add many paths in one pass. Repeated paths are tallied first, so
+		each distinct path is walked once and its value incremented by the
+		number of occurrences:
+			
+			t = Trie(storeFunction = STORE_COUNT)
+			t.addCounts(word.strip() for word in wordfile)
+		
+		Storage functions with a bulk function (store_array) add all the
+		occurrences in one step, others have their add function applied
+		once per occurrence.
+		"""
+		addObj = value
+		if addObj is None:
+			addObj = self._defaultValue
+		
+		tally = {}
+		for path in paths:
+			tally[path] = tally.get(path, 0) + 1
+		
+		bulk = self._storeFunction.get('bulk')
+		if bulk is None:
+			storeAdd = self._storeFunction['add']
+			def bulk(old, n, new):
+				for i in xrange(n):
+					old = storeAdd(old, new)
+				return old
+		
+		# array stores are incremented in place
+		values = self._storeFunction.get('values')
+		if values is None:
+			perOccurrence = None
+		elif self._storeFunction['count']:
+			perOccurrence = 1
+		else:
+			perOccurrence = addObj
+		
+		pathToKey = self._keyFunction['pathToKey']
+		
+		for (path, n) in tally.iteritems():
+			
+			pathKey = pathToKey(path)
+			if self._hashes or self._subtreeSizes:
+				self._invalidatePath(pathKey)
+			
+			baseNode = self._nodes
+			if values is not None:
+				amount = n * perOccurrence
+			lastNodeAdded = False
+			depth = 0
+			
+			for comp in pathKey:
+				if comp in baseNode:
+					baseNode = baseNode[comp]
+				else:
+					newNode = {}
+					baseNode[comp] = newNode
+					self._changes += 1
+					if self._childOrder:
+						self._childAdded(baseNode, comp)
+					baseNode = newNode
+				
+				if atAllSubPaths:
+					depth += 1
+					if self._watched:
+						before = self._beforeChange(baseNode.get('__'))
+					
+					if '__' in baseNode:
+						lastNodeAdded = False
+						if values is None:
+							baseNode['__'] = bulk(baseNode['__'], n, addObj)
+						else:
+							values[baseNode['__']] += amount
+					else:
+						lastNodeAdded = True
+						baseNode['__'] = bulk(None, n, addObj)
+						self._changes += 1
+					
+					if self._watched:
+						self._changed('add', pathKey[:depth], before, baseNode['__'], addObj)
+			
+			if not atAllSubPaths:
+				if self._watched:
+					before = self._beforeChange(baseNode.get('__'))
+				
+				if '__' in baseNode:
+					if values is None:
+						baseNode['__'] = bulk(baseNode['__'], n, addObj)
+					else:
+						values[baseNode['__']] += amount
+				else:
+					lastNodeAdded = True
+					baseNode['__'] = bulk(None, n, addObj)
+					self._changes += 1
+				
+				if self._watched:
+					self._changed('add', pathKey, before, baseNode['__'], addObj)
+			
+			if lastNodeAdded:
+				self._size += 1
+	
+	def __setitem__(self, path, obj):
+		"""
+		Set an item using the square bracket accessors
+		"""
+		self.add(path, obj)
+		
+	def removeAll(self, path):
+		"""
+		Remove all of the items associated with this path. This does not delete sub paths, only
+		the current objects of the path.
+		"""
+		
+		baseNode = self._nodes
+		pathKey = self._pathToKey(path)
+		if self._hashes or self._subtreeSizes:
+			self._invalidatePath(pathKey)
 		
 		for comp in pathKey[:-1]:
 			if comp not in baseNode:
@@ -362,19 +1700,65 @@ class Trie(object):
 		
 		# see if the tail leaf exists
 		leafPath = pathKey[-1]
-		if leafPath not in baseNode:
+		if leafPath not in baseNode or '__' not in baseNode[leafPath]:
 			return
 			
+		if self._watched:
+			before = self._beforeChange(baseNode[leafPath]['__'], True)
+		
 		# remove any values
+		if 'discard' in self._storeFunction:
+			self._storeFunction['discard'](baseNode[leafPath]['__'])
 		del baseNode[leafPath]['__']
 		self._size -= 1
+		self._changes += 1
+		
+		if self._watched:
+			self._changed('removeAll', pathKey, before, None, None)
 		
 		# if the node is now empty, delete it
-		if len(baseNode[leafPath].keys()) == 0:
-			del baseNode[leafPath]
+		if len(baseNode[leafPath]) == 0:
+			self._childRemoved(baseNode, leafPath)
 		
 	def __delitem__(self, path):
 		self.removeAll(path)
+	
+	def _discardKey(self, key, op = 'removeAll'):
+		"""
+		Remove the value at the key like removeAll, and also remove any
+		nodes above it left without values or children. Returns True if
+		there was a value to remove.
+		"""
+		nodes = [self._nodes]
+		for comp in key:
+			node = nodes[-1].get(comp)
+			if node is None:
+				return False
+			nodes.append(node)
+		
+		node = nodes[-1]
+		if '__' not in node:
+			return False
+		
+		if self._hashes or self._subtreeSizes:
+			self._invalidatePath(key)
+		if self._watched:
+			before = self._beforeChange(node['__'], True)
+		
+		if 'discard' in self._storeFunction:
+			self._storeFunction['discard'](node['__'])
+		del node['__']
+		self._size -= 1
+		self._changes += 1
+		
+		depth = len(key)
+		while depth > 0 and not nodes[depth]:
+			self._childRemoved(nodes[depth - 1], key[depth - 1])
+			depth -= 1
+		
+		if self._watched:
+			self._changed(op, key, before, None, None)
+		return True
 		
 	def remove(self, path, value = None, atAllSubPaths = False):
 		"""
@@ -387,24 +1771,38 @@ class Trie(object):
 			
 		baseNode = self._nodes
 		pathKey = self._pathToKey(path)
+		if self._hashes or self._subtreeSizes:
+			self._invalidatePath(pathKey)
 		
+		depth = 0
 		for comp in pathKey[:-1]:
 			if comp not in baseNode:
 				return
 			baseNode = baseNode[comp]
 			
 			if atAllSubPaths:
+				depth += 1
 				if '__' in baseNode:
+					if self._watched:
+						before = self._beforeChange(baseNode['__'])
+					
 					baseNode['__'] = self._storeFunction['remove'](baseNode['__'], remObj)
 				
 					if baseNode['__'] is None:
 						del baseNode['__']
+						self._changes += 1
+					
+					if self._watched:
+						self._changed('remove', pathKey[:depth], before, baseNode.get('__'), remObj)
 			
 		
 		# see if the tail leaf exists
 		leafPath = pathKey[-1]
-		if leafPath not in baseNode:
+		if leafPath not in baseNode or '__' not in baseNode[leafPath]:
 			return
+		
+		if self._watched:
+			before = self._beforeChange(baseNode[leafPath]['__'])
 			
 		# remove any values
 		baseNode[leafPath]['__'] = self._storeFunction['remove'](baseNode[leafPath]['__'], remObj)
@@ -412,10 +1810,14 @@ class Trie(object):
 		if baseNode[leafPath]['__'] is None:
 			del baseNode[leafPath]['__']
 			self._size -= 1
+			self._changes += 1
+		
+		if self._watched:
+			self._changed('remove', pathKey, before, baseNode[leafPath].get('__'), remObj)
 			
 		# if the node is now empty, delete it
-		if len(baseNode[leafPath].keys()) == 0:
-			del baseNode[leafPath]
+		if len(baseNode[leafPath]) == 0:
+			self._childRemoved(baseNode, leafPath)
 	
 	def __len__(self):
 		return self._size
@@ -425,13 +1827,97 @@ class Trie(object):
 		Remove an entire branch of the path, including child nodes and paths.
 		"""
 		
-		prunePaths = list(self.paths(prefix = path))
+		prunePaths = list(self.paths(prefix = path, ordered = False))
 		
 		for prunePath in prunePaths:
 			self.removeAll(prunePath)
 		# make sure structure is pruned completely
+	
+	def view(self, prefix):
+		"""
+		Return a live TrieView of the paths below the prefix, with paths
+		relative to the prefix. Nothing is copied, so changes to the Trie
+		show through the view, and changes through the view are made to
+		the Trie.
+		"""
+		return TrieView(self, self._pathToKey(prefix))
+	
+	def extract(self, prefix):
+		"""
+		Move the paths below the prefix out into a new Trie, with paths
+		relative to the prefix (a value at the prefix itself stays behind).
+		The branch is detached rather than copied, so this costs O(depth)
+		plus counting the paths moved, which is free when their number is
+		already cached (see rank and sample), and dropping the cache entries
+		of the moved nodes when anything is cached. Subscribers and the
+		value index see an 'extract' removal of each path moved.
+			
+			com = t.extract('com')
+			com.get('example.www')
+		"""
+		(keyFunction, storeFunction) = self._functions()
+		nt = Trie(keyFunction = keyFunction, defaultValue = self._defaultValue, storeFunction = storeFunction)
+		
+		key = list(self._pathToKey(prefix))
+		nodes = [self._nodes]
+		for comp in key:
+			node = nodes[-1].get(comp)
+			if node is None:
+				return nt
+			nodes.append(node)
+		
+		node = nodes[-1]
+		if len(node) == 1 and '__' in node:
+			return nt
+		
+		# take a cached count before the cached sizes along the key go
+		entry = self._subtreeSizes.get(id(node))
+		if entry is not None and entry[0] is node:
+			count = entry[1] - (1 if '__' in node else 0)
+		else:
+			count = None
+		if self._hashes or self._subtreeSizes:
+			self._invalidatePath(key)
+		
+		# cache entries hold on to their nodes, so drop those of the moved
+		# nodes rather than keep them alive
+		if self._hashes or self._subtreeSizes or self._childOrder:
+			for subNode in self._subNodes(node):
+				self._hashes.pop(id(subNode), None)
+				self._subtreeSizes.pop(id(subNode), None)
+				self._childOrder.pop(id(subNode), None)
+		
+		if '__' in node:
+			# the prefix keeps its value, in a new node
+			kept = {'__': node.pop('__')}
+			if key:
+				nodes[-2][key[-1]] = kept
+			else:
+				self._nodes = kept
+		
+		elif key:
+			self._childRemoved(nodes[-2], key[-1])
+			depth = len(key) - 1
+			while depth > 0 and not nodes[depth]:
+				self._childRemoved(nodes[depth - 1], key[depth - 1])
+				depth -= 1
+		
+		else:
+			self._nodes = {}
 		
+		nt._nodes = node
+		if count is None:
+			count = nt._subtreeSize(node)[0]
+		nt._size = count
+		self._size -= count
+		self._changes += 1
 		
+		if self._watched:
+			for (subKey, raw) in nt._rawItems():
+				self._changed('extract', key + subKey, self._beforeChange(raw, True), None, None)
+		
+		return nt
+	
 	def get(self, path, defaultValue = None):
 		"""
 		Retrieve the objects mapped to this path key.
@@ -450,7 +1936,7 @@ class Trie(object):
 			if ret is not None:
 				return ret
 			else:
-				return defaultvalue
+				return defaultValue
 	
 	def __getitem__(self, path):
 		return self.get(path)
@@ -476,13 +1962,8 @@ class Trie(object):
 			
 		elif isinstance(other, Trie):
 
-			if self._keyFunction != other._keyFunction:
-				raise TypeError("Trie keyFunctions don't match")
-			elif self._storeFunction != other._storeFunction:
-				raise TypeError("Trie storeFunctions don't match")
-			
-			for (k, v) in other.items():
-				self.add(k, v)
+			self._checkCompatible(other)
+			self._merge(other)
 			
 			return self
 		else:
@@ -515,36 +1996,369 @@ class Trie(object):
 			
 		elif isinstance(other, Trie):
 		
-			if self._keyFunction != other._keyFunction:
-				raise TypeError("Trie keyFunctions don't match")
-			elif self._storeFunction != other._storeFunction:
-				raise TypeError("Trie storeFunctions don't match")
+			self._checkCompatible(other)
 				
 			# duplicate self
 			nt = self._deepcopy()
 			
 			# merge the other trie data
-			for (k, v) in other.items():
-				nt.add(k, v)
+			nt._merge(other)
 			
 			return nt
 		else:
 			raise TypeError("Unsupported type added to Trie: %s" % (type(other)))
 	
+	def _merge(self, other):
+		"""
+		Add the paths and values of another Trie, for + and +=. Stores
+		holding many values per path (STORE_SET, STORE_MULTISET) have each
+		of their values added, rather than the view get() returns.
+		"""
+		members = self._functions()[1].get('members')
+		if members is None:
+			for (k, v) in other.items(ordered = False):
+				self.add(k, v)
+			return
+		
+		for (k, raw) in other._pathsBelow([], other._nodes, False, raw = True):
+			for v in members(raw):
+				self.add(k, v)
+	
 	def __mod__(self, other):
 		"""
 		"""
 		pass
 		
-	def _deepcopy(self):
-		nt = Trie(storeFunction = self._storeFunction, keyFunction = self._keyFunction)
-		nt._nodes = copy.deepcopy(self._nodes)
-		nt._size = self._size
-		return nt
+	def _functions(self):
+		"""
+		The (keyFunction, storeFunction) of the Trie, without any profiling
+		wrappers.
+		"""
+		if self._profiler is not None:
+			return self._profiledFunctions
+		return (self._keyFunction, self._storeFunction)
+	
+	def _checkCompatible(self, other):
+		"""
+		Raise a TypeError if the other Trie can't be merged into this one.
+		"""
+		(keyFunction, storeFunction) = self._functions()
+		(otherKeyFunction, otherStoreFunction) = other._functions()
 		
-	def getSubPaths(self, path):
+		if _functionsName(keyFunction) != _functionsName(otherKeyFunction):
+			raise TypeError("Trie keyFunctions don't match")
+		elif _functionsName(storeFunction) != _functionsName(otherStoreFunction):
+			raise TypeError("Trie storeFunctions don't match")
+	
+	def __reduce__(self):
 		"""
-		Retrieve the given path (if it is a valid path), as well as
+		Pickle the Trie as flat lists rather than nested dicts, which is both
+		faster and smaller. The key and store functions are pickled by their
+		registered names, see registerKeyFunction. Subclasses pickle as a
+		plain Trie of their contents.
+		"""
+		(keyFunction, storeFunction) = self._functions()
+		
+		# number the nodes in walk order, root first: each node after the root
+		# is a (parent, comp), and valued holds the numbers of nodes with values
+		parents = []
+		comps = []
+		valued = []
+		values = []
+		stack = [(0, self._nodes)]
+		while stack:
+			(index, node) = stack.pop()
+			for (comp, sub) in node.iteritems():
+				if comp == '__':
+					valued.append(index)
+					values.append(sub)
+				else:
+					parents.append(index)
+					comps.append(comp)
+					stack.append((len(parents), sub))
+		
+		return (_unpickleTrie, (keyFunction, storeFunction, self._defaultValue, self._size, parents, comps, valued, values))
+	
+	def _deepcopy(self):
+		(keyFunction, storeFunction) = self._functions()
+		if 'copy' in storeFunction:
+			storeFunction = storeFunction['copy']()
+		
+		nt = Trie(storeFunction = storeFunction, keyFunction = keyFunction)
+		nt._nodes = copy.deepcopy(self._nodes)
+		nt._size = self._size
+		return nt
+	
+	def diff(self, other):
+		"""
+		Generate the changes that turn this Trie into the other, in path
+		order, as (change, path, old, new) where change is one of 'added',
+		'removed' or 'changed':
+		
+			for (change, path, old, new) in primary.diff(replica):
+				...
+		
+		The Tries are walked together, skipping any subtree whose hash is
+		the same in both. Hashes are cached and only recomputed below the
+		paths that changed, so repeatedly diffing Tries that differ in a few
+		places is much cheaper than walking them. Values are in their
+		portable form (see store_array), so a diff can be shipped to another
+		Trie and applied with applyDiff.
+		
+		The Tries must have compatible key and store functions, or a
+		TypeError is raised.
+		"""
+		self._checkCompatible(other)
+		
+		stack = [([], self._nodes, other._nodes)]
+		while stack:
+			(key, node, otherNode) = stack.pop()
+			
+			if node is not None and otherNode is not None:
+				if node is otherNode or self._subtreeHash(node) == other._subtreeHash(otherNode):
+					continue
+			
+			old = None
+			new = None
+			if node is not None and '__' in node:
+				old = self._dumpValue(node['__'])
+			if otherNode is not None and '__' in otherNode:
+				new = other._dumpValue(otherNode['__'])
+			
+			if old is None and new is not None:
+				yield ('added', self._keyToPath(key), None, new)
+			elif old is not None and new is None:
+				yield ('removed', self._keyToPath(key), old, None)
+			elif old != new:
+				yield ('changed', self._keyToPath(key), old, new)
+			
+			if node is None:
+				comps = other._childKeys(otherNode)
+			elif otherNode is None:
+				comps = self._childKeys(node)
+			else:
+				comps = list(set(self._childKeys(node)) | set(other._childKeys(otherNode)))
+				comps.sort()
+			
+			# pushed in reverse, so children are generated in order
+			for comp in reversed(comps):
+				child = None
+				otherChild = None
+				if node is not None:
+					child = node.get(comp)
+				if otherNode is not None:
+					otherChild = otherNode.get(comp)
+				stack.append((key + [comp], child, otherChild))
+	
+	def applyDiff(self, delta):
+		"""
+		Apply changes generated by diff to this Trie. Applying the diff
+		from a Trie to another makes the first match the second:
+		
+			replica.applyDiff(replica.diff(primary))
+		
+		Added and changed paths are set to their new values, and removed
+		paths are removed with removeAll.
+		"""
+		# materialize first, as the delta may be generated from this Trie
+		for (change, path, old, new) in list(delta):
+			if change == 'removed':
+				self.removeAll(path)
+			else:
+				self._loadValue(self._pathToKey(path), copy.deepcopy(new))
+	
+	def dump(self, fileobj, format = 'jsonl', prefix = None, ordered = True):
+		"""
+		Write the paths at or below the prefix (the whole Trie by default)
+		and their values to a file, one per line, returning the number of
+		paths written. Lines are generated and written one at a time (see
+		dumpLines), so memory use doesn't grow with the Trie. The formats:
+			
+			jsonl	["com.example",3]
+			tsv	com.example<tab>3
+		
+		Values are written as JSON in the form the store function keeps
+		them (see _dumpValue), so loadStream restores them exactly as long
+		as they survive JSON: tuples come back as lists, and dict keys as
+		strings. Paths are written as UTF-8 (see loadStream for reading
+		them back), and tsv paths can't hold tabs or newlines.
+		
+		The many small lists the walk creates set off the cyclic garbage
+		collector over and over, and it scans every node of the Trie each
+		time without finding anything, so dumping a large Trie is much
+		faster with it paused (gc.disable()) around the call.
+		"""
+		write = fileobj.write
+		written = 0
+		
+		for line in self.dumpLines(format, prefix, ordered):
+			write(line)
+			written += 1
+		return written
+	
+	def dumpLines(self, format = 'jsonl', prefix = None, ordered = True):
+		"""
+		Generate the lines of dump, one path at a time.
+		"""
+		if format not in ('jsonl', 'tsv'):
+			raise ValueError("Unknown dump format: %s" % (format))
+		
+		if prefix is None:
+			key = []
+			node = self._nodes
+		else:
+			key = list(self._pathToKey(prefix))
+			node = self._findNode(key)
+			if node is None:
+				return
+		
+		encode = json.JSONEncoder(separators = (',', ':')).encode
+		quote = json.encoder.encode_basestring_ascii
+		dump = self._dumpValue
+		
+		for (path, raw) in self._pathsBelow(key, node, ordered, raw = True):
+			# the encoder is slow for the common case of a count
+			value = dump(raw)
+			if type(value) is int:
+				value = str(value)
+			else:
+				value = encode(value)
+			
+			if format == 'jsonl':
+				if isinstance(path, basestring):
+					yield '[' + quote(path) + ',' + value + ']\n'
+				else:
+					yield '[' + encode(path) + ',' + value + ']\n'
+				continue
+			
+			# KEY_STRING paths come back as lists of characters
+			if not isinstance(path, basestring):
+				path = ''.join(path)
+			if isinstance(path, unicode):
+				path = path.encode('utf-8')
+			if '\t' in path or '\n' in path:
+				raise ValueError("Path can't be written as tsv: %r" % (path))
+			
+			yield path + '\t' + value + '\n'
+	
+	def loadStream(self, fileobj, format = 'jsonl', batchSize = 10000, encoding = 'utf-8'):
+		"""
+		Load the paths and values written by dump from a file, or any
+		iterable of lines, returning the number of paths loaded. Lines are
+		read and parsed _batchSize_ at a time, and each batch is set in a
+		single pass that walks each path on from the nodes it shares with
+		the path before it, so memory use stays flat however long the file:
+			
+			t = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+			t.loadStream(open('counts.jsonl'))
+		
+		Loaded values replace any already at their paths, unless the store
+		function merges them (like store_array). As with dump, large loads
+		are much faster with the garbage collector paused around the call.
+		
+		Paths are given back as str in the _encoding_, so str paths (with
+		or without non-ASCII bytes) load back into the same keys they were
+		dumped from. With encoding=None paths are loaded as unicode, for
+		Tries of unicode paths.
+		"""
+		if format not in ('jsonl', 'tsv'):
+			raise ValueError("Unknown dump format: %s" % (format))
+		
+		# tsv paths are UTF-8 already
+		rawPaths = format == 'tsv' and encoding is not None and codecs.lookup(encoding).name == 'utf-8'
+		
+		decode = json.JSONDecoder().decode
+		lines = iter(fileobj)
+		loaded = 0
+		
+		while True:
+			chunk = list(islice(lines, batchSize))
+			if not chunk:
+				return loaded
+			
+			# decoding the batch as one JSON array is much faster than
+			# decoding each line
+			if format == 'jsonl':
+				batch = decode('[' + ','.join([line for line in chunk if line.strip()]) + ']')
+			else:
+				paths = []
+				values = []
+				for line in chunk:
+					(path, tab, value) = line.rstrip('\r\n').partition('\t')
+					if tab:
+						paths.append(path if rawPaths else path.decode('utf-8'))
+						values.append(value)
+					elif path:
+						raise ValueError("Invalid tsv line: %r" % (line))
+				batch = zip(paths, decode('[' + ','.join(values) + ']'))
+			
+			if encoding is not None and not rawPaths:
+				batch = [(path.encode(encoding) if isinstance(path, unicode) else path, value) for (path, value) in batch]
+			
+			loaded += self._loadItems(batch)
+	
+	def _loadItems(self, items):
+		"""
+		Set the values of many paths from portable values produced by
+		_dumpValue, like _loadValue. Each path is walked on from the nodes
+		it shares with the path before it, so paths in dump order don't walk
+		down from the root each time. Returns the number of items.
+		"""
+		# cheaper than invalidating along every path
+		if self._hashes or self._subtreeSizes:
+			self._hashes.clear()
+			self._subtreeSizes.clear()
+		
+		pathToKey = self._keyFunction['pathToKey']
+		load = self._storeFunction.get('load')
+		nodes = [self._nodes]
+		previous = []
+		
+		for (path, value) in items:
+			key = pathToKey(path)
+			
+			# keep the nodes shared with the previous path
+			depth = 0
+			shared = min(len(key), len(previous))
+			while depth < shared and key[depth] == previous[depth]:
+				depth += 1
+			del nodes[depth + 1:]
+			
+			baseNode = nodes[-1]
+			for i in xrange(depth, len(key)):
+				comp = key[i]
+				child = baseNode.get(comp)
+				if child is None:
+					child = {}
+					baseNode[comp] = child
+					self._changes += 1
+					if self._childOrder:
+						self._childAdded(baseNode, comp)
+				nodes.append(child)
+				baseNode = child
+			previous = key
+			
+			old = baseNode.get('__')
+			if old is None:
+				self._size += 1
+				self._changes += 1
+			
+			if self._watched:
+				before = self._beforeChange(old, True)
+			
+			if load is None:
+				baseNode['__'] = value
+			else:
+				baseNode['__'] = load(old, value)
+			
+			if self._watched:
+				self._changed('add', key, before, baseNode['__'], None)
+		
+		return len(items)
+	
+	def getSubPaths(self, path):
+		"""
+		Retrieve the given path (if it is a valid path), as well as
 		any valid sub paths:
 			t = Trie()
 			t.add("asd", 1)
@@ -576,6 +2390,149 @@ class Trie(object):
 		
 		return keyPaths
 		
+	def _walkMany(self, paths, visit, collect = False):
+		"""
+		Call visit(node, nodes) once per distinct path, where node is the
+		node at the end of the path's key (None if the key isn't in the
+		Trie), and nodes lists the root and the nodes along the key when
+		_collect_ is set. Results are returned in the order of the paths.
+		
+		Repeated paths are only converted to keys and walked once. Paths
+		that can't be hashed are walked individually.
+		"""
+		paths = list(paths)
+		pathToKey = self._keyFunction['pathToKey']
+		root = self._nodes
+		
+		try:
+			results = dict.fromkeys(paths)
+			distinct = results
+		except TypeError:
+			results = None
+			distinct = paths
+		
+		walked = []
+		for path in distinct:
+			baseNode = root
+			nodes = [root] if collect else None
+			
+			for comp in pathToKey(path):
+				if comp == '__' or comp not in baseNode:
+					baseNode = None
+					break
+				baseNode = baseNode[comp]
+				if collect:
+					nodes.append(baseNode)
+			
+			if results is None:
+				walked.append(visit(baseNode, nodes))
+			else:
+				results[path] = visit(baseNode, nodes)
+		
+		if results is None:
+			return walked
+		return [results[path] for path in paths]
+	
+	def hasMany(self, paths):
+		"""
+		Return a list of has() for each of the paths:
+			
+			t.hasMany(['com.example', 'com.example.sub']) == [True, False]
+		
+		Batches with repeated paths (like clustered topic names) only pay
+		for each distinct path once.
+		"""
+		return self._walkMany(paths, lambda node, nodes: node is not None and '__' in node)
+	
+	def getMany(self, paths, defaultValue = None):
+		"""
+		Return a list of get() for each of the paths, see hasMany()
+		"""
+		get = self._storeFunction['get']
+		
+		def visit(node, nodes):
+			if node is None or '__' not in node:
+				return defaultValue
+			ret = get(node['__'])
+			if ret is None:
+				return defaultValue
+			return ret
+		
+		return self._walkMany(paths, visit)
+	
+	def getAllPathValuesMany(self, paths):
+		"""
+		Return a list of getAllPathValues() for each of the paths, see
+		hasMany()
+		"""
+		members = self._storeFunction.get('members')
+		
+		def visit(node, nodes):
+			if node is None or '__' not in node:
+				return None
+			
+			retValues = []
+			for node in nodes:
+				if '__' in node:
+					if members is None:
+						retValues += node['__']
+					else:
+						retValues.extend(members(node['__']))
+			return retValues
+		
+		return self._walkMany(paths, visit, collect = True)
+	
+	def longestPrefix(self, path):
+		"""
+		Find the longest stored path that is a prefix of the given path,
+		returning (path, value), or None if no stored path is a prefix:
+			
+			routes = Trie(keyFunction = KEY_IPV4, storeFunction = STORE_OVERWRITE)
+			routes.add('10.0.0.0/8', 'gw1')
+			routes.add('10.1.0.0/16', 'gw2')
+			
+			routes.longestPrefix('10.1.2.3') == ('10.1.0.0/16', 'gw2')
+		
+		Key functions with a 'partials' function (like KEY_IPV4) can store
+		keys ending in a component that only partially matches a component
+		of the path; these are checked at each level too.
+		"""
+		key = self._pathToKey(path)
+		partials = self._keyFunction.get('partials')
+		
+		# the best match so far, as (depth, partial component or None, node)
+		baseNode = self._nodes
+		best = None
+		if '__' in baseNode:
+			best = (0, None, baseNode)
+		
+		depth = 0
+		for comp in key:
+			
+			if partials is not None:
+				for partial in partials(comp):
+					if partial in baseNode and '__' in baseNode[partial]:
+						best = (depth, partial, baseNode[partial])
+						break
+			
+			if comp not in baseNode:
+				break
+			baseNode = baseNode[comp]
+			depth += 1
+			
+			if '__' in baseNode:
+				best = (depth, None, baseNode)
+		
+		if best is None:
+			return None
+		
+		(depth, partial, bestNode) = best
+		bestKey = list(key[:depth])
+		if partial is not None:
+			bestKey.append(partial)
+		
+		return (self._keyToPath(bestKey), self._storeFunction['get'](bestNode['__']))
+	
 	def getAllPathValues(self, path):
 		"""
 		Retrieve the values mapped to the path key, including
@@ -595,9 +2552,12 @@ class Trie(object):
 			#	[functionA, functionB]
 			funcs = listeners.getAllPathLeaves("ui.summary.file".split("."))
 		
-		Returned mapped values are in heirarchical order
+		Returned mapped values are in heirarchical order. Each value held by
+		stores with many values per path (STORE_SET, STORE_MULTISET) is
+		included.
 		"""
 		retValues = []
+		members = self._storeFunction.get('members')
 		
 		baseNode = self._nodes
 		
@@ -605,13 +2565,55 @@ class Trie(object):
 			if comp not in baseNode:
 				return None
 			if '__' in baseNode:
-				retValues += baseNode['__']
+				if members is None:
+					retValues += baseNode['__']
+				else:
+					retValues.extend(members(baseNode['__']))
 			baseNode = baseNode[comp]
 		
 		if '__' not in baseNode:
 			return None
-		else:
+		elif members is None:
 			return retValues + baseNode['__']
+		else:
+			retValues.extend(members(baseNode['__']))
+			return retValues
+		
+	def _prefixValues(self, prefix):
+		"""
+		Generate the stored values at and below the prefix.
+		"""
+		if prefix is None:
+			node = self._nodes
+		else:
+			node = self._findNode(self._pathToKey(prefix))
+			if node is None:
+				return iter(())
+		
+		# streamed, so the subtree's values are never all held at once
+		raw = (n['__'] for n in self._subNodes(node) if '__' in n)
+		
+		if 'values' in self._storeFunction:
+			return imap(self._storeFunction['values'].__getitem__, raw)
+		return imap(self._storeFunction['get'], raw)
+	
+	def prefixSum(self, prefix = None):
+		"""
+		Sum the numeric values stored at and below the prefix, or across the
+		entire Trie. Tries built with atAllSubPaths already hold prefix totals,
+		so use get() on those instead.
+		"""
+		return sum(self._prefixValues(prefix))
+	
+	def prefixMax(self, prefix = None):
+		"""
+		Find the largest numeric value stored at or below the prefix, or None
+		if nothing is stored there.
+		"""
+		values = self._prefixValues(prefix)
+		for first in values:
+			return max(chain((first,), values))
+		return None
 		
 	def has(self, path):
 		"""
@@ -635,53 +2637,2432 @@ class Trie(object):
 		"""
 		return self.has(path)
 	
-	def items(self):
-		
-		for path in self.paths():
+	def items(self, prefix = None, ordered = True):
+		"""
+		Generate (path, value) pairs for the stored paths, see paths()
+		"""
+		for path in self.paths(prefix = prefix, ordered = ordered):
 			yield (path, self[path])
 			
-	def paths(self, prefix = None):
+	def paths(self, prefix = None, ordered = True):
+		"""
+		Return all of the paths stored in the Trie, or only those paths that
+		start with the given prefix.
+		
+		Paths are generated in lexicographic order of their key components.
+		With ordered=False children are visited in whatever order the nodes
+		hold them, which skips sorting and is faster when the order doesn't
+		matter (bulk export, merges, counting).
+		"""
+		
+		if prefix is None:
+			key = []
+			node = self._nodes
+		else:
+			key = list(self._pathToKey(prefix))
+			node = self._findNode(key)
+			if node is None:
+				return iter(())
+		
+		return self._pathsBelow(key, node, ordered)
+	
+	def _pathsBelow(self, key, node, ordered, start = 0, raw = False):
+		"""
+		Generate the paths of the values at and below the node at the key,
+		see paths. Paths leave out the first _start_ key components, and the
+		value at the key itself when it is that short. With raw=True
+		(path, raw value) pairs are generated instead.
+		"""
+		keyToPath = self._keyToPath
+		stack = [(key, node)]
+		push = stack.append
+		
+		# loop through the stack until complete
+		while stack:
+			
+			(key, node) = stack.pop()
+			
+			# if their is a leaf, yield this path
+			if '__' in node and len(key) > start:
+				if raw:
+					yield (keyToPath(key[start:] if start else key), node['__'])
+				else:
+					yield keyToPath(key[start:] if start else key)
+			
+			if not ordered:
+				for (comp, child) in node.iteritems():
+					if comp != '__':
+						push((key + [comp], child))
+			
+			elif len(node) > SORTED_CHILDREN_CACHE:
+				# push the children in reverse, so the smallest is popped next
+				children = self._sortedChildren(node)
+				for i in xrange(len(children) - 1, -1, -1):
+					comp = children[i]
+					push((key + [comp], node[comp]))
+			
+			else:
+				children = node.keys()
+				if len(children) > 1:
+					children.sort(reverse = True)
+				for comp in children:
+					if comp != '__':
+						push((key + [comp], node[comp]))
+	
+	def walk(self, visitor = None, prefix = None, ordered = True, leave = None):
 		"""
-		Return all of the paths stored in the Trie.
+		Visit every node at or below the prefix (the whole Trie by default)
+		without recursion, calling _visitor(key, value)_ as each node is
+		entered, parents before children. value is None for nodes without a
+		value. The visitor can return WALK_SKIP to skip the children of the
+		node, or WALK_STOP to end the walk.
+		
+		key is a list of key components shared by the whole walk, and
+		changed as it moves on, so copy it to keep it:
+		
+			found = []
+			def visitor(key, value):
+				if len(key) == 2:
+					return WALK_SKIP
+				if value is not None:
+					found.append(list(key))
+			
+			t.walk(visitor, prefix = 'com')
+		
+		_leave(key, value, results)_ is called as each node is left,
+		children before parents, with the list of results returned by
+		leave for its children; walk returns the result for the node at
+		the prefix. This computes aggregates in one pass, like the sum of
+		every STORE_ADD value below each node:
+		
+			total = t.walk(leave = lambda key, value, results: (value or 0) + sum(results))
+		
+		Skipped nodes are left with no child results. A stopped walk
+		returns None. With ordered=False children are visited in the order
+		the nodes hold them, which is faster. The Trie must not be changed
+		during the walk.
 		"""
+		if prefix is None:
+			key = []
+			node = self._nodes
+		else:
+			key = list(self._pathToKey(prefix))
+			node = self._findNode(key)
+			if node is None:
+				return None
+		
+		get = self._storeFunction['get']
+		childKeys = self._childKeys
 		
+		# each frame is [node, value, child keys, next child, child results]
 		stack = []
-		pathPrefix = None
-		if prefix is not None:
-			pathPrefix = self._pathToKey(prefix)
+		while True:
+			if '__' in node:
+				value = get(node['__'])
+			else:
+				value = None
 			
-		# prime the stack with the base prefixes
-		baseNode = self._nodes
-		startKeys = baseNode.keys()
-		startKeys.sort()
-		startKeys.reverse()
+			control = None
+			if visitor is not None:
+				control = visitor(key, value)
+				if control == WALK_STOP:
+					return None
+			
+			if control == WALK_SKIP or (len(node) == 1 and '__' in node):
+				children = ()
+			elif ordered:
+				children = childKeys(node)
+			else:
+				children = [comp for comp in node if comp != '__']
+			
+			stack.append([node, value, children, 0, []])
+			
+			# move on to the next child of the deepest unfinished node,
+			# leaving every node that has no more children
+			while stack:
+				frame = stack[-1]
+				if frame[3] < len(frame[2]):
+					comp = frame[2][frame[3]]
+					frame[3] += 1
+					node = frame[0][comp]
+					key.append(comp)
+					break
+				
+				stack.pop()
+				if leave is not None:
+					result = leave(key, frame[1], frame[4])
+				else:
+					result = None
+				
+				if not stack:
+					return result
+				
+				stack[-1][4].append(result)
+				key.pop()
+	
+	def mapValues(self, fn, prefix = None):
+		"""
+		Replace every value at or below the prefix (the whole Trie by
+		default) with _fn(value)_, in a single pass:
 		
-		for key in startKeys:
-			stack.append( ([key], baseNode[key]) )
+			weights.mapValues(lambda weight: weight * 0.5)
 		
-		# loop through the stack until complete
-		while len(stack) > 0:
-			
-			# get the last item on the stack, and add
-			# any keys to the stack
-			pathTuple = stack.pop()
-			
-			pathKeys = pathTuple[1].keys()
-			if '__' in pathKeys:
-				pathKeys.remove('__')
-			pathKeys.sort()
-			pathKeys.reverse()
-			for pathKey in pathKeys:
-				stack.append( (pathTuple[0] + [pathKey], pathTuple[1][pathKey]) )
+		Values are given to fn in the form the store function keeps them,
+		which for STORE_DEFAULT is the list of values at the path (see
+		_dumpValue). Returning None removes the value, and any branches
+		left empty.
+		"""
+		dump = self._dumpValue
+		load = self._storeFunction.get('load')
+		
+		def transform(raw):
+			value = fn(dump(raw))
+			if value is None or load is None:
+				return value
+			return load(raw, value)
+		
+		self._rewrite(prefix, 'map', transform)
+	
+	def filterValues(self, pred, prefix = None):
+		"""
+		Remove every value at or below the prefix (the whole Trie by
+		default) for which _pred(value)_ is false, along with any branches
+		left empty, in a single pass. Returns the number of values removed:
+		
+			counts.filterValues(lambda count: count >= 10)
+		
+		Values are given to pred as they are to mapValues.
+		"""
+		dump = self._dumpValue
+		return self._rewrite(prefix, 'filter', lambda raw: raw if pred(dump(raw)) else None)
+	
+	def _rewrite(self, prefix, op, transform):
+		"""
+		Replace the raw value of every node at or below the prefix with
+		_transform(raw)_, removing values transformed to None and the nodes
+		they leave empty. Returns the number of values removed.
+		"""
+		if prefix is None:
+			key = []
+			node = self._nodes
+		else:
+			key = list(self._pathToKey(prefix))
+			node = self._findNode(key)
+			if node is None:
+				return 0
+		
+		# every cached hash and size at or above the prefix may be stale
+		self._hashes = {}
+		self._subtreeSizes = {}
+		
+		discard = self._storeFunction.get('discard')
+		removed = 0
+		start = node
+		
+		# each frame is [node, child keys, next child]
+		stack = []
+		while True:
+			if '__' in node:
+				raw = node['__']
+				if self._watched:
+					before = self._beforeChange(raw, True)
 				
-			# if their is a leaf, yield this path
-			if '__' in pathTuple[1]:
-				if pathPrefix is None:
-					yield self._keyToPath(pathTuple[0])
+				value = transform(raw)
+				if value is None:
+					if discard is not None:
+						discard(raw)
+					del node['__']
+					self._size -= 1
+					self._changes += 1
+					removed += 1
 				else:
-					if pathPrefix == pathTuple[0][:len(pathPrefix)]:
-						yield self._keyToPath(pathTuple[0])
+					node['__'] = value
+				
+				# values kept by a filter are unchanged
+				if op == 'map' or value is None:
+					if self._watched:
+						self._changed(op, key, before, value, None)
+					self._rewritten(key, value)
+			
+			stack.append([node, [comp for comp in node if comp != '__'], 0])
+			
+			# move on to the next child, removing emptied nodes on the way up
+			while stack:
+				frame = stack[-1]
+				if frame[2] < len(frame[1]):
+					comp = frame[1][frame[2]]
+					frame[2] += 1
+					node = frame[0][comp]
+					key.append(comp)
+					break
+				
+				stack.pop()
+				if not stack:
+					break
+				
+				if not frame[0]:
+					self._childRemoved(stack[-1][0], key[-1])
+				key.pop()
+			
+			if not stack:
+				break
+		
+		# the node at the prefix, and the branch above it, may be empty too
+		if key and not start:
+			nodes = [self._nodes]
+			for comp in key:
+				nodes.append(nodes[-1][comp])
+			
+			depth = len(key)
+			while depth > 0 and not nodes[depth]:
+				self._childRemoved(nodes[depth - 1], key[depth - 1])
+				depth -= 1
+		
+		return removed
 	
-	def __repr__(self):
+	def _rewritten(self, key, raw):
+		"""
+		Called by _rewrite with the key and new raw value (None if it was
+		removed) of each value it changes, for subclasses that keep track
+		of their entries.
+		"""
+		pass
+	
+	def _boundedKeys(self, lo = None, hi = None, loInclusive = True, hiInclusive = False, reverse = False):
+		"""
+		Generate the keys between lo and hi (key component lists, or None
+		for no bound) in lexicographic order. Only the nodes along the two
+		bounds and the nodes within the range are visited; children outside
+		the bounds are skipped by bisecting the sorted child keys.
+		
+		Each stack entry tracks whether its key is still a prefix of the
+		lower and/or upper bound, as only those nodes need their children
+		clipped.
+		"""
+		stack = [([], self._nodes, lo is not None, hi is not None, False)]
+		
+		while stack:
+			
+			(key, node, loTight, hiTight, expanded) = stack.pop()
+			depth = len(key)
+			
+			if not expanded:
+				
+				# children of the upper bound itself are all beyond it
+				if hiTight and depth >= len(hi):
+					children = []
+				else:
+					children = self._childKeys(node)
+					
+					start = 0
+					end = len(children)
+					if loTight and depth < len(lo):
+						start = bisect_left(children, lo[depth])
+					if hiTight:
+						end = bisect_right(children, hi[depth], start)
+					
+					children = [
+						(key + [comp], node[comp],
+							loTight and depth < len(lo) and comp == lo[depth],
+							hiTight and comp == hi[depth], False)
+						for comp in children[start:end]
+					]
+				
+				if reverse:
+					# children are generated (largest first) before the node
+					stack.append((key, node, loTight, hiTight, True))
+					stack.extend(children)
+					continue
+				else:
+					children.reverse()
+					stack.extend(children)
+			
+			if '__' not in node or not key:
+				continue
+			
+			# a key still tight against a bound is either a prefix of the
+			# bound (and so less than it), or equal to it
+			if loTight and (depth < len(lo) or not loInclusive):
+				continue
+			if hiTight and depth >= len(hi) and not hiInclusive:
+				continue
+			
+			yield key
+	
+	def _boundKey(self, path):
+		if path is None:
+			return None
+		return list(self._pathToKey(path))
+	
+	def _firstPath(self, keys):
+		for key in keys:
+			return self._keyToPath(key)
+		return None
+	
+	def range(self, lo = None, hi = None, reverse = False):
+		"""
+		Generate the stored paths from lo (inclusive) up to hi (exclusive)
+		in lexicographic order of their key components, or in descending
+		order with reverse=True. Either bound can be None:
+			
+			t = Trie(keyFunction = KEY_DOTTED)
+			...
+			
+			# com.example, com.example.sub, ... com.lzz
+			list(t.range('com.e', 'com.m'))
 		
-		return str(self._nodes)
\ No newline at end of file
+		Key components only need to be orderable; unlike filtering paths(),
+		only the nodes within the range are visited.
+		"""
+		keyToPath = self._keyToPath
+		for key in self._boundedKeys(self._boundKey(lo), self._boundKey(hi), reverse = reverse):
+			yield keyToPath(key)
+	
+	def successor(self, path):
+		"""
+		Return the first stored path after the given path, or None.
+		"""
+		return self._firstPath(self._boundedKeys(lo = self._boundKey(path), loInclusive = False))
+	
+	def predecessor(self, path):
+		"""
+		Return the last stored path before the given path, or None.
+		"""
+		return self._firstPath(self._boundedKeys(hi = self._boundKey(path), reverse = True))
+	
+	def ceiling(self, path):
+		"""
+		Return the given path if it is stored, otherwise its successor.
+		"""
+		return self._firstPath(self._boundedKeys(lo = self._boundKey(path)))
+	
+	def floor(self, path):
+		"""
+		Return the given path if it is stored, otherwise its predecessor.
+		"""
+		return self._firstPath(self._boundedKeys(hi = self._boundKey(path), hiInclusive = True, reverse = True))
+	
+	def rank(self, path):
+		"""
+		Return the number of stored paths before the given path, so the
+		rank of a stored path is its index in paths(). Uses the cached
+		subtree sizes (see sample), so after the first call this costs
+		O(depth * children) rather than O(rank).
+		"""
+		baseNode = self._nodes
+		rank = 0
+		
+		for comp in self._pathToKey(path):
+			# every path stored along the way, and below the smaller
+			# children, comes first
+			if '__' in baseNode and baseNode is not self._nodes:
+				rank += 1
+			
+			for child in self._childKeys(baseNode):
+				if child >= comp:
+					break
+				rank += self._subtreeSize(baseNode[child])[0]
+			
+			if comp not in baseNode:
+				return rank
+			baseNode = baseNode[comp]
+		
+		return rank
+	
+	def nth(self, i):
+		"""
+		Return the i'th stored path in paths() order. Negative indexes count
+		back from the last path. Raises IndexError when out of range. Uses
+		the cached subtree sizes, like rank.
+		"""
+		count = self._subtreeSize(self._nodes)[0]
+		if '__' in self._nodes:
+			count -= 1
+		
+		if i < 0:
+			i += count
+		if i < 0 or i >= count:
+			raise IndexError("Trie index out of range")
+		
+		key = []
+		baseNode = self._nodes
+		while True:
+			if '__' in baseNode and key:
+				if i == 0:
+					return self._keyToPath(key)
+				i -= 1
+			
+			for comp in self._childKeys(baseNode):
+				paths = self._subtreeSize(baseNode[comp])[0]
+				if i < paths:
+					break
+				i -= paths
+			
+			key.append(comp)
+			baseNode = baseNode[comp]
+	
+	def sample(self, k, prefix = None, weighted = False):
+		"""
+		Return _k_ stored paths chosen at random, from the paths starting
+		with the prefix if it's given. Paths are drawn independently (with
+		replacement), so may repeat. With weighted=True paths are chosen in
+		proportion to their values, for numeric stores like STORE_COUNT:
+		
+			requests = t.sample(1000, weighted = True)
+		
+		Each path is chosen by descending from the prefix, picking a child
+		in proportion to the number (or weight) of paths below it, so no
+		paths are listed. The sizes of subtrees are cached and kept up to
+		date along the paths of later changes, so after the first call
+		sampling costs O(k * depth * children).
+		"""
+		if prefix is None:
+			key = []
+			node = self._nodes
+		else:
+			key = list(self._pathToKey(prefix))
+			node = self._findNode(key)
+		
+		if node is None:
+			return []
+		
+		get = self._storeFunction['get']
+		
+		(paths, total) = self._subtreeSize(node)
+		if not weighted:
+			total = paths
+		elif total is None:
+			raise TypeError("Weighted sampling needs numeric values")
+		
+		if node is self._nodes and '__' in node:
+			# the root's value isn't a stored path (see paths)
+			total -= get(node['__']) if weighted else 1
+		if total <= 0:
+			return []
+		
+		samples = []
+		for n in xrange(k):
+			r = random.random() * total
+			sampleKey = list(key)
+			baseNode = node
+			while True:
+				if '__' in baseNode and baseNode is not self._nodes:
+					r -= get(baseNode['__']) if weighted else 1
+					if r < 0:
+						break
+				
+				(comps, cumPaths, cumWeights) = self._samplingTable(baseNode)
+				
+				# rounding can leave r just past the last child
+				if not comps:
+					break
+				
+				cumulative = cumWeights if weighted else cumPaths
+				i = min(bisect_right(cumulative, r), len(comps) - 1)
+				if i:
+					r -= cumulative[i - 1]
+				
+				sampleKey.append(comps[i])
+				baseNode = baseNode[comps[i]]
+			
+			samples.append(self._keyToPath(sampleKey))
+		
+		return samples
+	
+	def iterFrom(self, afterPath = None, limit = 100, cursor = None):
+		"""
+		Page through the stored paths in paths() order. Returns a list of at
+		most _limit_ paths after _afterPath_ (or from the start), and a cursor
+		to pass back in for the next page, or None after the last page:
+			
+			(page, cursor) = t.iterFrom(limit = 1000)
+			while cursor is not None:
+				(page, cursor) = t.iterFrom(limit = 1000, cursor = cursor)
+		
+		Cursors are opaque strings that survive serialization, and remain
+		valid while the Trie is changed between pages. Each page seeks
+		directly past the last key, so costs O(depth + limit).
+		"""
+		if cursor is not None:
+			lo = self._decodeCursor(cursor)
+		else:
+			lo = self._boundKey(afterPath)
+		
+		keys = list(islice(self._boundedKeys(lo = lo, loInclusive = False), limit + 1))
+		
+		if len(keys) > limit:
+			keys = keys[:limit]
+			cursor = self._encodeCursor(keys[-1])
+		else:
+			cursor = None
+		
+		keyToPath = self._keyToPath
+		return ([keyToPath(key) for key in keys], cursor)
+	
+	def _encodeCursor(self, key):
+		return base64.urlsafe_b64encode(repr(key))
+	
+	def _decodeCursor(self, cursor):
+		# literal_eval keeps the component types (str, int, tuple) intact
+		# without evaluating anything else from an untrusted cursor
+		try:
+			key = ast.literal_eval(base64.urlsafe_b64decode(str(cursor)))
+		except (TypeError, ValueError, SyntaxError):
+			raise ValueError("Invalid Trie cursor: %r" % (cursor))
+		
+		if not isinstance(key, list):
+			raise ValueError("Invalid Trie cursor: %r" % (cursor))
+		return key
+	
+	def scanner(self):
+		"""
+		Return a TrieScanner, for finding every stored path within a text in
+		one pass.
+		"""
+		return TrieScanner(self)
+	
+	def enableProfiling(self, sink = None):
+		"""
+		Start recording call counts and latencies for the public operations
+		of this Trie, and separately for the key and store functions they
+		call. Returns the TrieProfiler collecting the timings:
+			
+			profiler = t.enableProfiling()
+			t.add('foo', 1)
+			profiler.snapshot()['store.add']['calls'] == 1
+		
+		Profiling wraps the methods of this instance only, so a Trie that
+		isn't profiled pays nothing for it.
+		"""
+		if self._profiler is not None:
+			self._profiler.sink = sink
+			return self._profiler
+		
+		profiler = TrieProfiler(sink)
+		
+		for op in ('add', 'get', 'has', 'remove', 'removeAll', 'prune'):
+			setattr(self, op, profiler._timed(op, getattr(self, op)))
+		self.paths = profiler._timedGenerator('paths', self.paths)
+		
+		self._profiledFunctions = (self._keyFunction, self._storeFunction)
+		self._keyFunction = profiler._timedFunctions('key.', self._keyFunction)
+		self._storeFunction = profiler._timedFunctions('store.', self._storeFunction)
+		self._profiler = profiler
+		
+		return profiler
+	
+	def disableProfiling(self):
+		"""
+		Stop profiling, returning the TrieProfiler with the recorded timings,
+		or None if profiling wasn't enabled.
+		"""
+		profiler = self._profiler
+		if profiler is None:
+			return None
+		
+		for op in ('add', 'get', 'has', 'remove', 'removeAll', 'prune', 'paths'):
+			delattr(self, op)
+		
+		(self._keyFunction, self._storeFunction) = self._profiledFunctions
+		del self._profiledFunctions
+		self._profiler = None
+		
+		return profiler
+	
+	def stats(self):
+		"""
+		Report the shape and estimated memory footprint of the Trie, computed
+		in a single non-recursive pass over the nodes:
+			
+			nodes: number of nodes, not counting the root
+			values: number of nodes holding a value
+			leaves: number of nodes without children
+			maxDepth: length of the longest key
+			depths: {depth: nodes at that depth}
+			fanout: {children: nodes with that many children}
+			singleChildRatio: fraction of nodes with one child and no value,
+				the nodes a compressed (radix) trie would fold away
+			nodeBytes: estimated bytes per node
+			valueBytes: estimated bytes per stored value
+			bytes: estimated total bytes for nodes and values
+		
+		Byte estimates use sys.getsizeof, so they count the node dicts and
+		the top level of each value, but not key components or objects
+		referenced from within values.
+		"""
+		nodes = 0
+		values = 0
+		leaves = 0
+		singles = 0
+		maxDepth = 0
+		nodeBytes = sys.getsizeof(self._nodes)
+		valueBytes = 0
+		depths = {}
+		fanout = {}
+		
+		storeValues = self._functions()[1].get('values')
+		
+		stack = [(self._nodes, 0)]
+		while stack:
+			(node, depth) = stack.pop()
+			
+			children = len(node)
+			if '__' in node:
+				children -= 1
+				values += 1
+				if storeValues is None:
+					valueBytes += sys.getsizeof(node['__'])
+				else:
+					valueBytes += storeValues.itemsize
+			
+			if depth > 0:
+				nodes += 1
+				depths[depth] = depths.get(depth, 0) + 1
+				fanout[children] = fanout.get(children, 0) + 1
+				if children == 0:
+					leaves += 1
+				elif children == 1 and '__' not in node:
+					singles += 1
+				if depth > maxDepth:
+					maxDepth = depth
+			
+			for (comp, child) in node.iteritems():
+				if comp != '__':
+					nodeBytes += sys.getsizeof(child)
+					stack.append((child, depth + 1))
+		
+		return {
+			'nodes': nodes,
+			'values': values,
+			'leaves': leaves,
+			'maxDepth': maxDepth,
+			'depths': depths,
+			'fanout': fanout,
+			'singleChildRatio': (singles * 1.0) / nodes if nodes else 0.0,
+			'nodeBytes': (nodeBytes * 1.0) / (nodes + 1),
+			'valueBytes': (valueBytes * 1.0) / values if values else 0.0,
+			'bytes': nodeBytes + valueBytes
+		}
+	
+	def __repr__(self):
+		"""
+		Show the size and the first few paths of the Trie, without walking
+		the entire structure.
+		"""
+		shown = [repr(path) for path in islice(self.paths(), 10)]
+		if len(shown) < self._size:
+			shown.append('...')
+		
+		return "<Trie size=%i [%s]>" % (self._size, ', '.join(shown))
+
+def _unpickleTrie(keyFunction, storeFunction, defaultValue, size, parents, comps, valued, values):
+	"""
+	Rebuild a pickled Trie, see Trie.__reduce__.
+	"""
+	t = Trie(keyFunction = keyFunction, defaultValue = defaultValue, storeFunction = storeFunction)
+	
+	nodes = [t._nodes]
+	append = nodes.append
+	for (parent, comp) in izip(parents, comps):
+		node = {}
+		nodes[parent][comp] = node
+		append(node)
+	
+	for (index, value) in izip(valued, values):
+		nodes[index]['__'] = value
+	
+	t._size = size
+	return t
+
+class TrieView(object):
+	"""
+	A live view of the paths of a Trie below a prefix, see Trie::view.
+	Paths are relative to the prefix:
+		
+		t = Trie(keyFunction = KEY_DOTTED)
+		t.add('com.example.www', 1)
+		
+		com = t.view('com')
+		com.get('example.www')		# 1
+		com.add('example.mail', 2)	# adds com.example.mail to t
+	
+	The view holds no nodes of its own, finding the prefix node on each
+	call, so it stays valid as the prefix comes and goes. Reads walk the
+	nodes directly, while changes go through the Trie, so its size,
+	caches, subscribers and index are kept up to date. len() uses the
+	Trie's cached subtree sizes.
+	"""
+	
+	def __init__(self, trie, prefixKey):
+		self._trie = trie
+		self._prefixKey = list(prefixKey)
+	
+	def _node(self):
+		return self._trie._findNode(self._prefixKey)
+	
+	def _path(self, path):
+		"""
+		The path in the Trie of a path relative to the prefix.
+		"""
+		trie = self._trie
+		return trie._keyToPath(self._prefixKey + list(trie._pathToKey(path)))
+	
+	def get(self, path, defaultValue = None):
+		baseNode = self._node()
+		if baseNode is None:
+			return defaultValue
+		
+		for comp in self._trie._pathToKey(path):
+			if comp not in baseNode:
+				return defaultValue
+			baseNode = baseNode[comp]
+		
+		if '__' not in baseNode:
+			return defaultValue
+		
+		ret = self._trie._storeFunction['get'](baseNode['__'])
+		if ret is not None:
+			return ret
+		return defaultValue
+	
+	def __getitem__(self, path):
+		return self.get(path)
+	
+	def has(self, path):
+		baseNode = self._node()
+		if baseNode is None:
+			return False
+		
+		for comp in self._trie._pathToKey(path):
+			if comp not in baseNode:
+				return False
+			baseNode = baseNode[comp]
+		
+		return '__' in baseNode
+	
+	def __contains__(self, path):
+		return self.has(path)
+	
+	def paths(self, prefix = None, ordered = True):
+		"""
+		Generate the relative paths in the view, see Trie::paths
+		"""
+		trie = self._trie
+		key = list(self._prefixKey)
+		if prefix is not None:
+			key.extend(trie._pathToKey(prefix))
+		
+		node = trie._findNode(key)
+		if node is None:
+			return iter(())
+		
+		# the value at the prefix itself isn't a path of the view
+		return trie._pathsBelow(key, node, ordered, len(self._prefixKey))
+	
+	def items(self, prefix = None, ordered = True):
+		for path in self.paths(prefix = prefix, ordered = ordered):
+			yield (path, self.get(path))
+	
+	def __len__(self):
+		node = self._node()
+		if node is None:
+			return 0
+		
+		paths = self._trie._subtreeSize(node)[0]
+		if '__' in node:
+			paths -= 1
+		return paths
+	
+	def add(self, path, value = None):
+		self._trie.add(self._path(path), value)
+	
+	def __setitem__(self, path, obj):
+		self.add(path, obj)
+	
+	def remove(self, path, value = None):
+		self._trie.remove(self._path(path), value)
+	
+	def removeAll(self, path):
+		self._trie.removeAll(self._path(path))
+	
+	def __delitem__(self, path):
+		self.removeAll(path)
+	
+	def prune(self, path):
+		self._trie.prune(self._path(path))
+	
+	def view(self, prefix):
+		"""
+		A view of the paths below a prefix relative to this view.
+		"""
+		return TrieView(self._trie, self._prefixKey + list(self._trie._pathToKey(prefix)))
+	
+	def extract(self, prefix):
+		"""
+		Move the paths below a prefix relative to this view out into a new
+		Trie, see Trie::extract
+		"""
+		return self._trie.extract(self._path(prefix))
+	
+	def __repr__(self):
+		shown = [repr(path) for path in islice(self.paths(), 10)]
+		if len(shown) < len(self):
+			shown.append('...')
+		
+		return "<TrieView %r [%s]>" % (self._trie._keyToPath(self._prefixKey), ', '.join(shown))
+
+class TrieScanner(object):
+	"""
+	Find every occurance of every path stored in a Trie within a text, in a
+	single pass over the text (the Aho-Corasick algorithm). Create one with
+	Trie::scanner:
+		
+		keywords = Trie()
+		keywords.add('he', 1)
+		keywords.add('she', 2)
+		keywords.add('hers', 3)
+		
+		# [(1, 4, ['s', 'h', 'e'], 2), (2, 4, ['h', 'e'], 1), (2, 6, ['h', 'e', 'r', 's'], 3)]
+		list(keywords.scanner().scan('ushers'))
+	
+	Matches are (start, end, path, value), with start and end counting
+	key components of the text (characters for KEY_STRING, tokens for
+	KEY_DOTTED). Failure and output links are kept beside the Trie's own
+	nodes, and are rebuilt the next time the scanner is used after the
+	Trie's paths change.
+	
+	feed() scans a stream in chunks, carrying the match state (and the
+	positions) from one chunk to the next, so keys spanning chunks are
+	found. Chunks must be split on component boundaries.
+	"""
+	
+	def __init__(self, trie):
+		self._trie = trie
+		self._built = None
+		self.reset()
+	
+	def reset(self):
+		"""
+		Start a new stream for feed()
+		"""
+		self._state = None
+		self._offset = 0
+		self._recent = deque()
+	
+	def _build(self):
+		"""
+		Breadth first pass over the Trie, linking each node to the node for
+		its longest proper suffix (fail), and to the nearest node along the
+		fail links holding a value (output).
+		"""
+		trie = self._trie
+		root = trie._nodes
+		
+		# id(node) -> (fail node, output node or None)
+		links = {id(root): (root, None)}
+		
+		# id(node) -> key, for nodes holding a value
+		keys = {}
+		maxDepth = 0
+		
+		queue = deque()
+		for (comp, child) in root.iteritems():
+			if comp != '__':
+				links[id(child)] = (root, None)
+				queue.append((child, [comp]))
+		
+		while queue:
+			(node, key) = queue.popleft()
+			if '__' in node:
+				keys[id(node)] = key
+			if len(key) > maxDepth:
+				maxDepth = len(key)
+			
+			for (comp, child) in node.iteritems():
+				if comp == '__':
+					continue
+				
+				fail = links[id(node)][0]
+				while comp not in fail and fail is not root:
+					fail = links[id(fail)][0]
+				
+				if comp in fail and fail[comp] is not child:
+					fail = fail[comp]
+				else:
+					fail = root
+				
+				# a value on the root is the empty path, which never matches
+				if '__' in fail and fail is not root:
+					output = fail
+				else:
+					output = links[id(fail)][1]
+				
+				links[id(child)] = (fail, output)
+				queue.append((child, key + [comp]))
+		
+		self._links = links
+		self._keys = keys
+		self._maxDepth = maxDepth
+		self._built = trie._changes
+	
+	def _refresh(self):
+		if self._built == self._trie._changes:
+			return
+		
+		self._build()
+		
+		# node identities may have changed, so restore the stream state by
+		# running the most recent components back through the new links
+		if self._state is not None:
+			state = self._trie._nodes
+			for comp in self._recent:
+				state = self._step(state, comp)
+			self._state = state
+	
+	def _step(self, node, comp):
+		root = self._trie._nodes
+		links = self._links
+		
+		# '__' holds values, so it never matches a text component
+		while (comp == '__' or comp not in node) and node is not root:
+			node = links[id(node)][0]
+		
+		if comp != '__' and comp in node:
+			return node[comp]
+		return root
+	
+	def _matches(self, comps, state, offset):
+		"""
+		Generate the matches in the components, and finally the end state
+		"""
+		trie = self._trie
+		root = trie._nodes
+		links = self._links
+		keys = self._keys
+		keyToPath = trie._keyToPath
+		get = trie._storeFunction['get']
+		
+		for (i, comp) in enumerate(comps):
+			state = self._step(state, comp)
+			
+			if '__' in state and state is not root:
+				match = state
+			else:
+				match = links[id(state)][1]
+			
+			while match is not None:
+				key = keys[id(match)]
+				end = offset + i + 1
+				yield (end - len(key), end, keyToPath(key), get(match['__']))
+				match = links[id(match)][1]
+		
+		yield state
+	
+	def scan(self, text):
+		"""
+		Generate (start, end, path, value) for every occurance of a stored
+		path in the text, in order of where the matches end.
+		"""
+		self._refresh()
+		
+		for match in self._matches(self._trie._pathToKey(text), self._trie._nodes, 0):
+			if isinstance(match, tuple):
+				yield match
+	
+	def feed(self, chunk):
+		"""
+		Scan the next chunk of a stream, returning the list of matches that
+		end in this chunk. Positions count from the start of the stream.
+		"""
+		self._refresh()
+		
+		comps = self._trie._pathToKey(chunk)
+		if self._state is None:
+			self._state = self._trie._nodes
+		
+		matches = list(self._matches(comps, self._state, self._offset))
+		self._state = matches.pop()
+		self._offset += len(comps)
+		
+		# remember enough of the stream to rebuild the state after changes
+		recent = self._recent
+		recent.extend(comps)
+		while len(recent) > self._maxDepth:
+			recent.popleft()
+		
+		return matches
+
+class ExpiringTrie(Trie):
+	"""
+	A Trie whose entries expire, for short lived caches of prefixes. A
+	time to live in seconds can be given for the whole Trie, and for each
+	add:
+		
+		sessions = ExpiringTrie(keyFunction = KEY_DOTTED, ttl = 300)
+		sessions.add('eu.web.1234', session)
+		sessions.add('eu.web.5678', session, ttl = 30)
+	
+	Adding to a path again restarts its time to live, and adding without a
+	time to live (to a Trie without one) makes the path permanent. get, has
+	and _in_ treat expired entries as absent, removing them as they are
+	found. Other reads (paths, items, len and so on) see expired entries
+	until purgeExpired removes them; call it periodically, or before
+	iterating.
+	
+	Expiry times are kept in a heap, so purgeExpired takes time in
+	proportion to the number of entries expired rather than the size of the
+	Trie. Branches left empty by expired entries are removed. _clock_ is the
+	time source, time.time by default.
+	"""
+	
+	def __init__(self, keyFunction = None, defaultValue = None, storeFunction = None, ttl = None, clock = time.time):
+		Trie.__init__(self, keyFunction = keyFunction, defaultValue = defaultValue, storeFunction = storeFunction)
+		self._ttl = ttl
+		self._clock = clock
+		
+		# key -> expiry time, and a heap of (expiry time, key). Entries
+		# restarted or removed leave stale heap items, skipped when popped
+		self._expiry = {}
+		self._expiryHeap = []
+	
+	def add(self, path, value = None, atAllSubPaths = False, ttl = None):
+		"""
+		Map the path key to the given object, see Trie::add. The entry
+		expires after _ttl_ seconds, or the Trie's ttl if not given.
+		"""
+		Trie.add(self, path, value, atAllSubPaths)
+		
+		key = tuple(self._pathToKey(path))
+		if atAllSubPaths:
+			for depth in xrange(1, len(key) + 1):
+				self._expireAfter(key[:depth], ttl)
+		else:
+			self._expireAfter(key, ttl)
+	
+	def addCounts(self, paths, value = None, atAllSubPaths = False):
+		"""
+		Add many paths in one pass, see Trie::addCounts. The entries expire
+		after the Trie's ttl.
+		"""
+		paths = list(paths)
+		Trie.addCounts(self, paths, value, atAllSubPaths)
+		
+		for path in set(paths):
+			key = tuple(self._pathToKey(path))
+			if atAllSubPaths:
+				for depth in xrange(1, len(key) + 1):
+					self._expireAfter(key[:depth], None)
+			else:
+				self._expireAfter(key, None)
+	
+	def _expireAfter(self, key, ttl):
+		if ttl is None:
+			ttl = self._ttl
+		
+		if ttl is None:
+			self._expiry.pop(key, None)
+			return
+		
+		expires = self._clock() + ttl
+		self._expiry[key] = expires
+		heapq.heappush(self._expiryHeap, (expires, key))
+		
+		# restarts leave stale items behind, so compact a heap that has
+		# grown well past the number of expiring entries
+		if len(self._expiryHeap) > 2 * len(self._expiry) + 64:
+			self._expiryHeap = [(expires, key) for (key, expires) in self._expiry.iteritems()]
+			heapq.heapify(self._expiryHeap)
+	
+	def _expired(self, path):
+		"""
+		Check whether the path has expired, removing it if it has.
+		"""
+		if not self._expiry:
+			return False
+		
+		key = tuple(self._pathToKey(path))
+		expires = self._expiry.get(key)
+		if expires is None or expires > self._clock():
+			return False
+		
+		del self._expiry[key]
+		self._discardKey(key, 'expire')
+		return True
+	
+	def expiresAt(self, path):
+		"""
+		Return the time the path expires, or None if it doesn't.
+		"""
+		return self._expiry.get(tuple(self._pathToKey(path)))
+	
+	def purgeExpired(self):
+		"""
+		Remove every expired entry, and any branches left empty, returning
+		the number of entries removed.
+		"""
+		now = self._clock()
+		heap = self._expiryHeap
+		purged = 0
+		
+		while heap and heap[0][0] <= now:
+			(expires, key) = heapq.heappop(heap)
+			if self._expiry.get(key) != expires:
+				continue
+			
+			del self._expiry[key]
+			if self._discardKey(key, 'expire'):
+				purged += 1
+		
+		return purged
+	
+	def get(self, path, defaultValue = None):
+		if self._expired(path):
+			return defaultValue
+		return Trie.get(self, path, defaultValue)
+	
+	def has(self, path):
+		if self._expired(path):
+			return False
+		return Trie.has(self, path)
+	
+	def remove(self, path, value = None, atAllSubPaths = False):
+		Trie.remove(self, path, value, atAllSubPaths)
+		
+		# forget the expiry of entries the last value was removed from
+		key = tuple(self._pathToKey(path))
+		if atAllSubPaths:
+			depths = xrange(1, len(key) + 1)
+		else:
+			depths = [len(key)]
+		
+		for depth in depths:
+			node = self._findNode(key[:depth])
+			if node is None or '__' not in node:
+				self._expiry.pop(key[:depth], None)
+	
+	def removeAll(self, path):
+		# prune removes each path with removeAll too
+		Trie.removeAll(self, path)
+		self._expiry.pop(tuple(self._pathToKey(path)), None)
+	
+	def extract(self, prefix):
+		nt = Trie.extract(self, prefix)
+		
+		# the moved paths no longer expire
+		key = list(self._pathToKey(prefix))
+		for (subKey, raw) in nt._rawItems():
+			self._expiry.pop(tuple(key + subKey), None)
+		return nt
+	
+	def _rewritten(self, key, raw):
+		if raw is None:
+			self._expiry.pop(tuple(key), None)
+	
+	def _loadItems(self, items):
+		# loaded entries expire after the Trie's ttl, like addCounts
+		loaded = Trie._loadItems(self, items)
+		pathToKey = self._keyFunction['pathToKey']
+		for (path, value) in items:
+			self._expireAfter(tuple(pathToKey(path)), None)
+		return loaded
+
+class BoundedTrie(Trie):
+	"""
+	A Trie of bounded size, for prefix caches. Once the Trie holds more
+	than _maxSize_ paths, or its entries more than _maxBytes_ bytes, the
+	coldest entries are evicted, along with any branches left empty:
+		
+		cache = BoundedTrie(keyFunction = KEY_DOTTED, maxSize = 10000, policy = 'lfu')
+	
+	The _policy_ decides which entries are coldest:
+		
+		lru: the least recently used by add or get (the default)
+		lfu: the least frequently used by add or get, the least recently
+			used of those on a tie
+	
+	The size of an entry is estimated by _sizeOf(key, value)_, by default
+	the shallow sizes of the key components and value (sys.getsizeof), so
+	maxBytes bounds the data held rather than the exact memory used.
+	Bookkeeping is constant time for each add, get and removal.
+	evictionStats() counts evictions, and get hits and misses.
+	"""
+	
+	def __init__(self, keyFunction = None, defaultValue = None, storeFunction = None, maxSize = None, maxBytes = None, policy = 'lru', sizeOf = None):
+		Trie.__init__(self, keyFunction = keyFunction, defaultValue = defaultValue, storeFunction = storeFunction)
+		
+		if policy not in ('lru', 'lfu'):
+			raise ValueError("Unknown eviction policy: %s" % (policy))
+		
+		self._maxSize = maxSize
+		self._maxBytes = maxBytes
+		self._policy = policy
+		
+		if sizeOf is None:
+			sizeOf = lambda key, value: sum([sys.getsizeof(comp) for comp in key]) + sys.getsizeof(value)
+		self._sizeOf = sizeOf
+		
+		# key -> estimated bytes of each entry
+		self._entryBytes = {}
+		self._bytes = 0
+		
+		# lru: key -> None, least recently used first
+		self._recent = OrderedDict()
+		
+		# lfu: key -> use count, and use count -> keys used that often,
+		# least recently used first
+		self._uses = {}
+		self._usesBuckets = {}
+		self._minUses = 0
+		
+		self._evictionStats = {'evictions': 0, 'hits': 0, 'misses': 0}
+	
+	def evictionStats(self):
+		"""
+		Return the number of evictions, and of get calls that found (hits)
+		and didn't find (misses) their path.
+		"""
+		return dict(self._evictionStats)
+	
+	def _touch(self, key):
+		"""
+		Record a use of the entry at the key.
+		"""
+		if self._policy == 'lru':
+			recent = self._recent
+			if key in recent:
+				del recent[key]
+			recent[key] = None
+			return
+		
+		buckets = self._usesBuckets
+		uses = self._uses.get(key, 0)
+		if uses:
+			bucket = buckets[uses]
+			del bucket[key]
+			if not bucket:
+				del buckets[uses]
+				if self._minUses == uses:
+					self._minUses = uses + 1
+		else:
+			self._minUses = 1
+		
+		self._uses[key] = uses + 1
+		if uses + 1 not in buckets:
+			buckets[uses + 1] = OrderedDict()
+		buckets[uses + 1][key] = None
+	
+	def _untrack(self, key):
+		"""
+		Stop tracking the entry at the key, after it was removed.
+		"""
+		self._bytes -= self._entryBytes.pop(key, 0)
+		
+		if self._policy == 'lru':
+			self._recent.pop(key, None)
+			return
+		
+		uses = self._uses.pop(key, None)
+		if uses is not None:
+			bucket = self._usesBuckets[uses]
+			del bucket[key]
+			if not bucket:
+				del self._usesBuckets[uses]
+	
+	def _coldest(self):
+		if self._policy == 'lru':
+			return next(self._recent.iterkeys())
+		
+		# removals can leave the least use count stale
+		if self._minUses not in self._usesBuckets:
+			self._minUses = min(self._usesBuckets)
+		return next(self._usesBuckets[self._minUses].iterkeys())
+	
+	def _measure(self, key):
+		"""
+		Update the size of the entry at the key after a change, returning
+		False if the change removed it.
+		"""
+		node = self._findNode(key)
+		if node is None or '__' not in node:
+			self._untrack(key)
+			return False
+		
+		if self._maxBytes is not None:
+			entryBytes = self._sizeOf(key, self._storeFunction['get'](node['__']))
+			self._bytes += entryBytes - self._entryBytes.get(key, 0)
+			self._entryBytes[key] = entryBytes
+		return True
+	
+	def _used(self, key):
+		"""
+		Record an add to the entry at the key, then evict entries while the
+		Trie is over budget.
+		"""
+		if self._measure(key):
+			self._touch(key)
+			self._evict()
+	
+	def _evict(self):
+		while (self._maxSize is not None and self._size > self._maxSize) or (self._maxBytes is not None and self._bytes > self._maxBytes):
+			# every entry is tracked, but don't spin if that ever slips
+			if not (self._recent or self._uses):
+				return
+			
+			key = self._coldest()
+			self._untrack(key)
+			self._discardKey(key, 'evict')
+			self._evictionStats['evictions'] += 1
+	
+	def add(self, path, value = None, atAllSubPaths = False):
+		Trie.add(self, path, value, atAllSubPaths)
+		
+		key = tuple(self._pathToKey(path))
+		if atAllSubPaths:
+			for depth in xrange(1, len(key) + 1):
+				self._used(key[:depth])
+		else:
+			self._used(key)
+	
+	def addCounts(self, paths, value = None, atAllSubPaths = False):
+		paths = list(paths)
+		Trie.addCounts(self, paths, value, atAllSubPaths)
+		
+		for path in set(paths):
+			key = tuple(self._pathToKey(path))
+			if atAllSubPaths:
+				for depth in xrange(1, len(key) + 1):
+					self._used(key[:depth])
+			else:
+				self._used(key)
+	
+	def get(self, path, defaultValue = None):
+		key = tuple(self._pathToKey(path))
+		node = self._findNode(key)
+		if node is None or '__' not in node:
+			self._evictionStats['misses'] += 1
+			return defaultValue
+		
+		self._evictionStats['hits'] += 1
+		self._touch(key)
+		
+		ret = self._storeFunction['get'](node['__'])
+		if ret is not None:
+			return ret
+		else:
+			return defaultValue
+	
+	def remove(self, path, value = None, atAllSubPaths = False):
+		Trie.remove(self, path, value, atAllSubPaths)
+		
+		key = tuple(self._pathToKey(path))
+		if atAllSubPaths:
+			depths = xrange(1, len(key) + 1)
+		else:
+			depths = [len(key)]
+		
+		for depth in depths:
+			self._measure(key[:depth])
+	
+	def removeAll(self, path):
+		Trie.removeAll(self, path)
+		self._untrack(tuple(self._pathToKey(path)))
+	
+	def extract(self, prefix):
+		nt = Trie.extract(self, prefix)
+		
+		key = list(self._pathToKey(prefix))
+		for (subKey, raw) in nt._rawItems():
+			self._untrack(tuple(key + subKey))
+		return nt
+	
+	def _rewritten(self, key, raw):
+		if raw is None:
+			self._untrack(tuple(key))
+		else:
+			self._measure(tuple(key))
+	
+	def _rewrite(self, prefix, op, transform):
+		removed = Trie._rewrite(self, prefix, op, transform)
+		
+		# mapped values may have grown
+		self._evict()
+		return removed
+	
+	def _loadItems(self, items):
+		loaded = Trie._loadItems(self, items)
+		pathToKey = self._keyFunction['pathToKey']
+		for (path, value) in items:
+			self._used(tuple(pathToKey(path)))
+		return loaded
+	
+	def _loadValue(self, key, value):
+		# applyDiff sets values here
+		Trie._loadValue(self, key, value)
+		self._used(tuple(key))
+
+class HeavyHitterTrie(Trie):
+	"""
+	Approximate prefix counts of an unbounded stream, in bounded memory.
+	Like adding to a STORE_COUNT Trie with atAllSubPaths, every add counts
+	each prefix of the path, but only the _capacity_ heaviest prefixes of
+	each depth are kept, using the space saving algorithm at each depth:
+		
+		clicks = HeavyHitterTrie(keyFunction = KEY_DOTTED, capacity = 1000)
+		for url in stream:
+			clicks.add(url)
+		
+		clicks.topN(2, 10)
+	
+	A prefix that isn't kept is replaced by the new one with the lowest
+	count, which inherits that count as its error. So get returns an upper
+	bound of the true count, getBounds gives the (lower, upper) range, and
+	any prefix counted more than total / capacity times is always kept. At
+	most _capacity_ prefixes are kept at each depth, and only the first
+	_maxDepth_ components of a path are counted if it is given.
+	
+	Counts can only be added; remove, removeAll, prune, loadStream,
+	applyDiff, mapValues and filterValues raise a TypeError.
+	Subscribers see each counted prefix as an 'add' and each replaced one as
+	an 'evict'.
+	"""
+	
+	def __init__(self, keyFunction = None, capacity = 1000, maxDepth = None):
+		Trie.__init__(self, keyFunction = keyFunction, storeFunction = STORE_ADD)
+		self._capacity = capacity
+		self._maxDepth = maxDepth
+		self._total = 0
+		
+		# for each depth: prefix key -> count and error, and a heap of
+		# (count, key) with stale items for keys counted since
+		self._counts = []
+		self._errors = []
+		self._heaps = []
+	
+	def add(self, path, value = None, atAllSubPaths = True):
+		"""
+		Count each prefix of the path _value_ times (once by default).
+		Prefixes are always counted, whatever _atAllSubPaths_ is.
+		"""
+		n = 1 if value is None else value
+		self._total += n
+		
+		key = self._pathToKey(path)
+		if self._maxDepth is not None:
+			key = key[:self._maxDepth]
+		if self._hashes or self._subtreeSizes:
+			self._invalidatePath(key)
+		
+		baseNode = self._nodes
+		prefix = ()
+		for (depth, comp) in enumerate(key):
+			prefix += (comp,)
+			
+			if comp not in baseNode:
+				baseNode[comp] = {}
+				self._changes += 1
+				if self._childOrder:
+					self._childAdded(baseNode, comp)
+			baseNode = baseNode[comp]
+			
+			if depth == len(self._counts):
+				self._counts.append({})
+				self._errors.append({})
+				self._heaps.append([])
+			self._count(depth, prefix, baseNode, n)
+	
+	def addCounts(self, paths, value = None, atAllSubPaths = True):
+		"""
+		Count each prefix of many paths, tallying repeated paths first.
+		"""
+		n = 1 if value is None else value
+		
+		tally = {}
+		for path in paths:
+			tally[path] = tally.get(path, 0) + 1
+		
+		for (path, occurrences) in tally.iteritems():
+			self.add(path, occurrences * n)
+	
+	def _count(self, depth, prefix, node, n):
+		counts = self._counts[depth]
+		heap = self._heaps[depth]
+		
+		if prefix in counts:
+			count = counts[prefix] + n
+		else:
+			if len(counts) < self._capacity:
+				error = 0
+			else:
+				# replace the lightest prefix, inheriting its count as error
+				(error, victim) = self._lightest(depth)
+				del counts[victim]
+				del self._errors[depth][victim]
+				self._discardKey(victim, 'evict')
+			
+			count = error + n
+			self._errors[depth][prefix] = error
+			self._size += 1
+			self._changes += 1
+		
+		if self._watched:
+			before = self._beforeChange(node.get('__'))
+		
+		counts[prefix] = count
+		node['__'] = count
+		heapq.heappush(heap, (count, prefix))
+		
+		if self._watched:
+			self._changed('add', list(prefix), before, count, n)
+		
+		if len(heap) > 4 * self._capacity + 64:
+			heap = self._heaps[depth] = [(count, key) for (key, count) in counts.iteritems()]
+			heapq.heapify(heap)
+	
+	def _lightest(self, depth):
+		"""
+		Return (count, key) of the kept prefix of the depth with the lowest
+		count.
+		"""
+		counts = self._counts[depth]
+		heap = self._heaps[depth]
+		while True:
+			(count, key) = heap[0]
+			if counts.get(key) == count:
+				return (count, key)
+			heapq.heappop(heap)
+	
+	def getBounds(self, path):
+		"""
+		Return the (lower, upper) bounds of the number of times the prefix
+		was counted. For prefixes that weren't kept the lower bound is 0,
+		and the upper bound is the lowest count kept at that depth.
+		"""
+		key = tuple(self._pathToKey(path))
+		depth = len(key) - 1
+		if depth < 0 or depth >= len(self._counts):
+			return (0, 0)
+		
+		counts = self._counts[depth]
+		if key in counts:
+			return (counts[key] - self._errors[depth][key], counts[key])
+		elif len(counts) < self._capacity:
+			return (0, 0)
+		else:
+			return (0, self._lightest(depth)[0])
+	
+	def topN(self, depth, n):
+		"""
+		Return (path, count) of the _n_ heaviest prefixes of _depth_
+		components, heaviest first.
+		"""
+		if depth < 1 or depth > len(self._counts):
+			return []
+		
+		heaviest = heapq.nlargest(n, self._counts[depth - 1].iteritems(), key = lambda item: item[1])
+		return [(self._keyToPath(list(key)), count) for (key, count) in heaviest]
+	
+	def total(self):
+		"""
+		Return the total of the counts added.
+		"""
+		return self._total
+	
+	def remove(self, path, value = None, atAllSubPaths = False):
+		raise TypeError("HeavyHitterTrie counts can't be removed")
+	
+	def removeAll(self, path):
+		raise TypeError("HeavyHitterTrie counts can't be removed")
+	
+	def prune(self, path):
+		raise TypeError("HeavyHitterTrie counts can't be removed")
+	
+	def extract(self, prefix):
+		raise TypeError("HeavyHitterTrie counts can't be removed")
+	
+	def loadStream(self, fileobj, format = 'jsonl', batchSize = 10000, encoding = 'utf-8'):
+		raise TypeError("HeavyHitterTrie counts can only be added")
+	
+	def applyDiff(self, delta):
+		raise TypeError("HeavyHitterTrie counts can only be added")
+	
+	def mapValues(self, fn, prefix = None):
+		raise TypeError("HeavyHitterTrie counts can only be added")
+	
+	def filterValues(self, pred, prefix = None):
+		raise TypeError("HeavyHitterTrie counts can't be removed")
+
+class NormalizedTrie(Trie):
+	"""
+	A case insensitive (or Unicode normalized) Trie that remembers how its
+	paths were spelled. Paths are indexed by their normalized key (see
+	key_normalized), and any spelling finds them, but paths(), items() and
+	events give back the spelling a path was first added with:
+		
+		t = NormalizedTrie(keyFunction = key_normalized('casefold'))
+		t.add('McDonald', 1)
+		t.add('MCDONALD', 2)
+		
+		t.get('mcdonald')	# [1, 2]
+		list(t.paths())		# ['McDonald']
+	
+	get and has fold the path one component at a time as they walk down,
+	stopping at the first component that isn't there, rather than building
+	the normalized key first. Values added at the prefixes of a path with
+	atAllSubPaths, and the paths of extract() and views, are given back in
+	their normalized spelling.
+	"""
+	
+	def __init__(self, keyFunction = None, defaultValue = None, storeFunction = None):
+		if keyFunction is None:
+			keyFunction = key_normalized()
+		elif 'fold' not in keyFunction:
+			raise ValueError("NormalizedTrie needs a normalized keyFunction, see key_normalized")
+		
+		Trie.__init__(self, keyFunction = keyFunction, defaultValue = defaultValue, storeFunction = storeFunction)
+		
+		# normalized key -> spelling of the path first added there
+		self._spellings = {}
+		self._watched = True
+	
+	def _watch(self):
+		# always watched, to forget the spellings of removed paths
+		self._watched = True
+	
+	def _changed(self, op, key, before, raw, value):
+		Trie._changed(self, op, key, before, raw, value)
+		if raw is None:
+			self._spellings.pop(tuple(key), None)
+	
+	def _keyToPath(self, k):
+		spelling = self._spellings.get(tuple(k))
+		if spelling is None:
+			return self._keyFunction['keyToPath'](k)
+		return spelling
+	
+	def _spell(self, path):
+		key = tuple(self._pathToKey(path))
+		if key not in self._spellings:
+			self._spellings[key] = path
+	
+	def add(self, path, value = None, atAllSubPaths = False):
+		self._spell(path)
+		Trie.add(self, path, value, atAllSubPaths)
+	
+	def addCounts(self, paths, value = None, atAllSubPaths = False):
+		paths = list(paths)
+		for path in paths:
+			self._spell(path)
+		Trie.addCounts(self, paths, value, atAllSubPaths)
+	
+	def _loadItems(self, items):
+		for (path, value) in items:
+			self._spell(path)
+		return Trie._loadItems(self, items)
+	
+	def spelling(self, path):
+		"""
+		Return the spelling the path was first added with, in any spelling,
+		or None if it isn't stored.
+		"""
+		if not self.has(path):
+			return None
+		return self._keyToPath(self._pathToKey(path))
+	
+	def get(self, path, defaultValue = None):
+		baseNode = self._nodes
+		
+		for comp in self._keyFunction['fold'](path):
+			if comp not in baseNode:
+				return defaultValue
+			baseNode = baseNode[comp]
+		
+		if '__' not in baseNode:
+			return defaultValue
+		
+		ret = self._storeFunction['get'](baseNode['__'])
+		if ret is not None:
+			return ret
+		return defaultValue
+	
+	def has(self, path):
+		baseNode = self._nodes
+		
+		for comp in self._keyFunction['fold'](path):
+			if comp not in baseNode:
+				return False
+			baseNode = baseNode[comp]
+		
+		return '__' in baseNode
+
+class DurableTrie(Trie):
+	"""
+	A Trie that survives restarts. Every add, addCounts, remove, removeAll,
+	prune, extract and applyDiff is appended to a write-ahead log in _directory_, and the whole Trie
+	is periodically written out as a compact snapshot. Opening a DurableTrie
+	on an existing directory loads the latest snapshot and replays the log
+	written since:
+		
+		t = DurableTrie('/var/lib/counters', storeFunction = STORE_COUNT)
+		t.add('com.example')
+		t.close()
+	
+	The _sync_ policy trades durability for write throughput:
+		
+		always: fsync the log after every mutation
+		batch: group commit, fsync once _batchSize_ mutations are buffered
+			(or on sync() and close()), the default
+		never: leave flushing to the operating system
+	
+	A snapshot is written every _snapshotEvery_ logged mutations (or by
+	calling snapshot()), after which the old log is discarded. Paths and
+	values must be picklable, and the key and store functions must be the
+	same each time the directory is opened.
+	"""
+	
+	def __init__(self, directory, keyFunction = None, defaultValue = None, storeFunction = None, sync = 'batch', batchSize = 100, snapshotEvery = 100000):
+		Trie.__init__(self, keyFunction = keyFunction, defaultValue = defaultValue, storeFunction = storeFunction)
+		
+		if sync not in ('always', 'batch', 'never'):
+			raise ValueError("Unknown sync policy: %s" % (sync))
+		
+		self._directory = directory
+		self._sync = sync
+		self._batchSize = batchSize
+		self._snapshotEvery = snapshotEvery
+		
+		self._pending = []
+		self._logged = 0
+		self._generation = 0
+		
+		# mutations made while replaying, or inside other logged
+		# mutations (prune calls removeAll), aren't logged again
+		self._logging = False
+		
+		if not os.path.isdir(directory):
+			os.makedirs(directory)
+		
+		self._recover()
+		self._log = open(self._logPath(self._generation), 'ab')
+		self._logging = True
+	
+	def _logPath(self, generation):
+		return os.path.join(self._directory, 'trie.log.%i' % (generation))
+	
+	def _snapshotPath(self):
+		return os.path.join(self._directory, 'trie.snapshot')
+	
+	def _recover(self):
+		"""
+		Load the snapshot, then replay the log that follows it.
+		"""
+		if os.path.exists(self._snapshotPath()):
+			snapshot = open(self._snapshotPath(), 'rb')
+			try:
+				header = pickle.load(snapshot)
+				self._generation = header['generation']
+				
+				for (key, value) in pickle.load(snapshot):
+					self._loadValue(key, value)
+				self._size = header['size']
+			finally:
+				snapshot.close()
+		
+		logPath = self._logPath(self._generation)
+		if os.path.exists(logPath):
+			log = open(logPath, 'r+b')
+			try:
+				good = 0
+				for (offset, record) in _readLogRecords(log):
+					self._replay(record)
+					good = offset
+				
+				# drop any torn record at the tail, left by a crash mid write
+				log.truncate(good)
+			finally:
+				log.close()
+		
+		# a crash between writing a snapshot and removing the log it
+		# replaced leaves that log behind
+		stale = self._logPath(self._generation - 1)
+		if os.path.exists(stale):
+			os.remove(stale)
+	
+	def _replay(self, record):
+		op = record[0]
+		if op == 'add':
+			Trie.add(self, *record[1:])
+		elif op == 'addCounts':
+			Trie.addCounts(self, *record[1:])
+		elif op == 'remove':
+			Trie.remove(self, *record[1:])
+		elif op == 'removeAll':
+			Trie.removeAll(self, *record[1:])
+		elif op == 'prune':
+			Trie.prune(self, *record[1:])
+		elif op == 'extract':
+			Trie.extract(self, *record[1:])
+		elif op == 'applyDiff':
+			Trie.applyDiff(self, *record[1:])
+	
+	def _append(self, record):
+		payload = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+		self._pending.append(struct.pack(LOG_HEADER, len(payload), zlib.crc32(payload) & 0xffffffff))
+		self._pending.append(payload)
+		self._logged += 1
+		
+		if self._sync == 'always' or len(self._pending) >= 2 * self._batchSize:
+			self._flush(self._sync != 'never')
+		
+		if self._logged >= self._snapshotEvery:
+			self.snapshot()
+	
+	def _flush(self, fsync):
+		if self._pending:
+			self._log.write(''.join(self._pending))
+			self._pending = []
+		self._log.flush()
+		if fsync:
+			os.fsync(self._log.fileno())
+	
+	def _loggedCall(self, record, method, *args):
+		if not self._logging:
+			return method(self, *args)
+		
+		self._logging = False
+		try:
+			ret = method(self, *args)
+		finally:
+			self._logging = True
+		self._append(record)
+		return ret
+	
+	def add(self, path, value = None, atAllSubPaths = False):
+		return self._loggedCall(('add', path, value, atAllSubPaths), Trie.add, path, value, atAllSubPaths)
+	
+	def addCounts(self, paths, value = None, atAllSubPaths = False):
+		paths = list(paths)
+		return self._loggedCall(('addCounts', paths, value, atAllSubPaths), Trie.addCounts, paths, value, atAllSubPaths)
+	
+	def remove(self, path, value = None, atAllSubPaths = False):
+		return self._loggedCall(('remove', path, value, atAllSubPaths), Trie.remove, path, value, atAllSubPaths)
+	
+	def removeAll(self, path):
+		return self._loggedCall(('removeAll', path), Trie.removeAll, path)
+	
+	def prune(self, path):
+		return self._loggedCall(('prune', path), Trie.prune, path)
+	
+	def extract(self, prefix):
+		return self._loggedCall(('extract', prefix), Trie.extract, prefix)
+	
+	def applyDiff(self, delta):
+		delta = list(delta)
+		return self._loggedCall(('applyDiff', delta), Trie.applyDiff, delta)
+	
+	def mapValues(self, fn, prefix = None):
+		"""
+		See Trie::mapValues. Functions can't be logged, so the Trie is
+		snapshot after the values are replaced.
+		"""
+		Trie.mapValues(self, fn, prefix)
+		self.snapshot()
+	
+	def filterValues(self, pred, prefix = None):
+		"""
+		See Trie::filterValues. Snapshots like mapValues.
+		"""
+		removed = Trie.filterValues(self, pred, prefix)
+		self.snapshot()
+		return removed
+	
+	def loadStream(self, fileobj, format = 'jsonl', batchSize = 10000, encoding = 'utf-8'):
+		"""
+		Load a dump, see Trie::loadStream, then snapshot rather than
+		logging every path loaded.
+		"""
+		loaded = Trie.loadStream(self, fileobj, format, batchSize, encoding)
+		self.snapshot()
+		return loaded
+	
+	def sync(self):
+		"""
+		Write and fsync any buffered log records.
+		"""
+		self._flush(True)
+	
+	def snapshot(self):
+		"""
+		Write the whole Trie to a new snapshot and start a new log. The
+		snapshot is written to a temporary file and renamed into place, so a
+		crash at any point leaves either the old snapshot and its complete
+		log, or the new snapshot.
+		"""
+		self._flush(self._sync != 'never')
+		
+		generation = self._generation + 1
+		tmpPath = self._snapshotPath() + '.tmp'
+		
+		snapshot = open(tmpPath, 'wb')
+		try:
+			pickle.dump({'generation': generation, 'size': self._size}, snapshot, pickle.HIGHEST_PROTOCOL)
+			items = [(list(key), self._dumpValue(raw)) for (key, raw) in self._rawItems()]
+			pickle.dump(items, snapshot, pickle.HIGHEST_PROTOCOL)
+			snapshot.flush()
+			os.fsync(snapshot.fileno())
+		finally:
+			snapshot.close()
+		
+		os.rename(tmpPath, self._snapshotPath())
+		_fsyncDirectory(self._directory)
+		
+		self._log.close()
+		os.remove(self._logPath(self._generation))
+		
+		self._generation = generation
+		self._log = open(self._logPath(generation), 'ab')
+		self._logged = 0
+	
+	def close(self):
+		"""
+		Sync the log and close it. The DurableTrie can't be changed after
+		it is closed.
+		"""
+		self.sync()
+		self._log.close()
+
+# log records are framed with their length and CRC32, so a torn write at
+# the end of the log can be detected and dropped on recovery
+LOG_HEADER = '>II'
+LOG_HEADER_SIZE = struct.calcsize(LOG_HEADER)
+
+def _readLogRecords(log):
+	"""
+	Generate (end offset, record) for each intact record in the log.
+	"""
+	offset = 0
+	while True:
+		header = log.read(LOG_HEADER_SIZE)
+		if len(header) < LOG_HEADER_SIZE:
+			return
+		
+		(length, crc) = struct.unpack(LOG_HEADER, header)
+		payload = log.read(length)
+		if len(payload) < length or zlib.crc32(payload) & 0xffffffff != crc:
+			return
+		
+		offset += LOG_HEADER_SIZE + length
+		yield (offset, pickle.loads(payload))
+
+def _fsyncDirectory(directory):
+	fd = os.open(directory, os.O_RDONLY)
+	try:
+		os.fsync(fd)
+	finally:
+		os.close(fd)
+
+
+class DiskTrie(object):
+	"""
+	A Trie for key sets larger than memory. Nodes are stored in an SQLite
+	database file, and only the most recently used nodes are kept in an
+	in-memory cache of _cacheSize_ nodes. DiskTrie supports the same core
+	interface as Trie:
+		
+		t = DiskTrie('/var/lib/words.db', keyFunction = KEY_DOTTED)
+		t.add('com.example', handler)
+		t.get('com.example')
+		t.flush()
+	
+	add, addCounts, get, has, remove, removeAll, prune, paths, items,
+	getSubPaths, getAllPathValues and the matching operators are available.
+	Changes are committed every _commitEvery_ writes and by flush() or
+	close(). ioStats() reports cache hits and misses, evictions, and the
+	number of database reads and writes, for tuning the cache size.
+	
+	Values are pickled into the database, so they must be picklable, and
+	storage functions holding state outside the nodes (store_array) can't
+	be used.
+	"""
+	
+	def __init__(self, filename, keyFunction = None, defaultValue = None, storeFunction = None, cacheSize = 100000, commitEvery = 10000):
+		
+		if storeFunction is None:
+			self._storeFunction = STORE_DEFAULT
+		elif 'values' in storeFunction:
+			raise TypeError("DiskTrie can't use a storeFunction with values outside the nodes")
+		else:
+			self._storeFunction = storeFunction
+		
+		if keyFunction is None:
+			self._keyFunction = KEY_STRING
+		else:
+			self._keyFunction = keyFunction
+		
+		self._defaultValue = defaultValue
+		self._cacheSize = cacheSize
+		self._commitEvery = commitEvery
+		self._uncommitted = 0
+		
+		# (parent id, component) -> [node id, raw value or None], or None
+		# for a child known not to exist
+		self._cache = OrderedDict()
+		self._io = {'hits': 0, 'misses': 0, 'evictions': 0, 'reads': 0, 'writes': 0}
+		
+		self._db = sqlite3.connect(filename)
+		self._db.execute("CREATE TABLE IF NOT EXISTS nodes (id INTEGER PRIMARY KEY, parent INTEGER NOT NULL, comp BLOB NOT NULL, value BLOB)")
+		self._db.execute("CREATE UNIQUE INDEX IF NOT EXISTS nodes_child ON nodes (parent, comp)")
+		self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+		
+		row = self._db.execute("SELECT value FROM meta WHERE name = 'size'").fetchone()
+		if row is None:
+			self._size = 0
+		else:
+			self._size = row[0]
+	
+	def _pathToKey(self, p):
+		return self._keyFunction['pathToKey'](p)
+	
+	def _keyToPath(self, k):
+		return self._keyFunction['keyToPath'](k)
+	
+	def _encode(self, obj):
+		return sqlite3.Binary(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+	
+	def _decode(self, blob):
+		if blob is None:
+			return None
+		return pickle.loads(str(blob))
+	
+	def _child(self, parent, comp, create = False):
+		"""
+		Look up the [node id, raw value] entry of a child node, going to the
+		database on a cache miss, and creating the node if asked to.
+		"""
+		cacheKey = (parent, comp)
+		cache = self._cache
+		
+		if cacheKey in cache:
+			entry = cache.pop(cacheKey)
+			cache[cacheKey] = entry
+			if entry is not None or not create:
+				self._io['hits'] += 1
+				return entry
+		else:
+			self._io['misses'] += 1
+			self._io['reads'] += 1
+			row = self._db.execute("SELECT id, value FROM nodes WHERE parent = ? AND comp = ?", (parent, self._encode(comp))).fetchone()
+			if row is None:
+				entry = None
+			else:
+				entry = [row[0], self._decode(row[1])]
+		
+		if entry is None and create:
+			cursor = self._db.execute("INSERT INTO nodes (parent, comp) VALUES (?, ?)", (parent, self._encode(comp)))
+			entry = [cursor.lastrowid, None]
+			self._wrote()
+		
+		cache[cacheKey] = entry
+		while len(cache) > self._cacheSize:
+			cache.popitem(last = False)
+			self._io['evictions'] += 1
+		
+		return entry
+	
+	def _walk(self, key, create = False):
+		"""
+		Return the entries of the nodes along the key, or None if the key
+		isn't in the Trie.
+		"""
+		entries = []
+		parent = 0
+		for comp in key:
+			entry = self._child(parent, comp, create)
+			if entry is None:
+				return None
+			entries.append(entry)
+			parent = entry[0]
+		return entries
+	
+	def _setValue(self, entry, value):
+		entry[1] = value
+		self._db.execute("UPDATE nodes SET value = ? WHERE id = ?", (None if value is None else self._encode(value), entry[0]))
+		self._wrote()
+	
+	def _wrote(self):
+		self._io['writes'] += 1
+		self._uncommitted += 1
+		if self._uncommitted >= self._commitEvery:
+			self.flush()
+	
+	def _children(self, nodeId):
+		self._io['reads'] += 1
+		return [(self._decode(comp), childId, self._decode(value)) for (childId, comp, value) in self._db.execute("SELECT id, comp, value FROM nodes WHERE parent = ?", (nodeId,))]
+	
+	def _deleteIfEmpty(self, parent, comp, entry):
+		"""
+		Delete a node that no longer holds a value or any children.
+		"""
+		if entry[1] is not None:
+			return
+		
+		self._io['reads'] += 1
+		if self._db.execute("SELECT 1 FROM nodes WHERE parent = ? LIMIT 1", (entry[0],)).fetchone() is not None:
+			return
+		
+		self._db.execute("DELETE FROM nodes WHERE id = ?", (entry[0],))
+		self._cache[(parent, comp)] = None
+		self._wrote()
+	
+	def add(self, path, value = None, atAllSubPaths = False):
+		"""
+		Map the path key to the given object, see Trie::add
+		"""
+		addObj = value
+		if addObj is None:
+			addObj = self._defaultValue
+		
+		entries = self._walk(self._pathToKey(path), create = True)
+		if not entries:
+			return
+		
+		lastNodeAdded = entries[-1][1] is None
+		
+		storeAdd = self._storeFunction['add']
+		if atAllSubPaths:
+			for entry in entries:
+				self._setValue(entry, storeAdd(entry[1], addObj))
+		else:
+			self._setValue(entries[-1], storeAdd(entries[-1][1], addObj))
+		
+		if lastNodeAdded:
+			self._size += 1
+	
+	def addCounts(self, paths, value = None, atAllSubPaths = False):
+		"""
+		Add many paths, see Trie::addCounts. Sorting the paths keeps related
+		nodes together in the cache.
+		"""
+		for path in sorted(paths):
+			self.add(path, value, atAllSubPaths)
+	
+	def __setitem__(self, path, obj):
+		self.add(path, obj)
+	
+	def remove(self, path, value = None, atAllSubPaths = False):
+		"""
+		Remove a specific item of the path, see Trie::remove
+		"""
+		remObj = value
+		if remObj is None:
+			remObj = self._defaultValue
+		
+		key = self._pathToKey(path)
+		entries = self._walk(key)
+		if not entries or entries[-1][1] is None:
+			return
+		
+		storeRemove = self._storeFunction['remove']
+		if atAllSubPaths:
+			targets = entries
+		else:
+			targets = entries[-1:]
+		
+		for entry in targets:
+			if entry[1] is not None:
+				self._setValue(entry, storeRemove(entry[1], remObj))
+		
+		if entries[-1][1] is None:
+			self._size -= 1
+			parent = entries[-2][0] if len(entries) > 1 else 0
+			self._deleteIfEmpty(parent, key[-1], entries[-1])
+	
+	def removeAll(self, path):
+		"""
+		Remove all of the items associated with this path, see Trie::removeAll
+		"""
+		key = self._pathToKey(path)
+		entries = self._walk(key)
+		if not entries or entries[-1][1] is None:
+			return
+		
+		self._setValue(entries[-1], None)
+		self._size -= 1
+		
+		parent = entries[-2][0] if len(entries) > 1 else 0
+		self._deleteIfEmpty(parent, key[-1], entries[-1])
+	
+	def __delitem__(self, path):
+		self.removeAll(path)
+	
+	def prune(self, path):
+		"""
+		Remove an entire branch of the path, see Trie::prune
+		"""
+		key = self._pathToKey(path)
+		entries = self._walk(key)
+		if not entries:
+			return
+		
+		# delete the branch one level at a time
+		doomed = set()
+		level = [entries[-1]]
+		while level:
+			nodeIds = [entry[0] for entry in level]
+			doomed.update(nodeIds)
+			
+			for entry in level:
+				if entry[1] is not None:
+					self._size -= 1
+			
+			level = []
+			for nodeId in nodeIds:
+				level.extend([childId, value] for (comp, childId, value) in self._children(nodeId))
+		
+		for nodeId in doomed:
+			self._db.execute("DELETE FROM nodes WHERE id = ?", (nodeId,))
+			self._wrote()
+		
+		for cacheKey in [k for k in self._cache if k[0] in doomed]:
+			del self._cache[cacheKey]
+		
+		parent = entries[-2][0] if len(entries) > 1 else 0
+		self._cache[(parent, key[-1])] = None
+	
+	def __len__(self):
+		return self._size
+	
+	def get(self, path, defaultValue = None):
+		"""
+		Retrieve the objects mapped to this path key, see Trie::get
+		"""
+		entries = self._walk(self._pathToKey(path))
+		if not entries or entries[-1][1] is None:
+			return defaultValue
+		
+		ret = self._storeFunction['get'](entries[-1][1])
+		if ret is None:
+			return defaultValue
+		return ret
+	
+	def __getitem__(self, path):
+		return self.get(path)
+	
+	def has(self, path):
+		"""
+		Return true if a path exists, otherwise false.
+		"""
+		entries = self._walk(self._pathToKey(path))
+		return bool(entries) and entries[-1][1] is not None
+	
+	def __contains__(self, path):
+		return self.has(path)
+	
+	def getSubPaths(self, path):
+		"""
+		Retrieve the given path and any stored paths along it, see
+		Trie::getSubPaths
+		"""
+		keyBits = []
+		keyPaths = []
+		
+		parent = 0
+		for comp in self._pathToKey(path):
+			keyBits.append(comp)
+			
+			entry = self._child(parent, comp)
+			if entry is None:
+				break
+			parent = entry[0]
+			
+			if entry[1] is not None:
+				keyPaths.append(self._keyToPath(keyBits))
+		
+		return keyPaths
+	
+	def getAllPathValues(self, path):
+		"""
+		Retrieve the values mapped along the path key, see
+		Trie::getAllPathValues
+		"""
+		entries = self._walk(self._pathToKey(path))
+		if not entries or entries[-1][1] is None:
+			return None
+		
+		retValues = []
+		members = self._storeFunction.get('members')
+		for entry in entries:
+			if entry[1] is not None:
+				if members is None:
+					retValues += entry[1]
+				else:
+					retValues.extend(members(entry[1]))
+		return retValues
+	
+	def paths(self, prefix = None, ordered = True):
+		"""
+		Generate the stored paths, see Trie::paths. Traversals read children
+		straight from the database, rather than flushing the cache of hot
+		nodes.
+		"""
+		if prefix is None:
+			start = ([], 0, None)
+		else:
+			key = list(self._pathToKey(prefix))
+			entries = self._walk(key)
+			if not entries:
+				return
+			start = (key, entries[-1][0], entries[-1][1])
+		
+		keyToPath = self._keyToPath
+		stack = [start]
+		
+		while stack:
+			(key, nodeId, value) = stack.pop()
+			
+			if value is not None and key:
+				yield keyToPath(key)
+			
+			# push the children in reverse, so the smallest is popped next
+			children = self._children(nodeId)
+			if ordered:
+				children.sort(reverse = True)
+			
+			for (comp, childId, childValue) in children:
+				stack.append((key + [comp], childId, childValue))
+	
+	def items(self, prefix = None, ordered = True):
+		"""
+		Generate (path, value) pairs for the stored paths, see paths()
+		"""
+		for path in self.paths(prefix = prefix, ordered = ordered):
+			yield (path, self[path])
+	
+	def flush(self):
+		"""
+		Commit any uncommitted changes to the database.
+		"""
+		self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('size', ?)", (self._size,))
+		self._db.commit()
+		self._uncommitted = 0
+	
+	def close(self):
+		"""
+		Commit and close the database.
+		"""
+		self.flush()
+		self._db.close()
+	
+	def ioStats(self):
+		"""
+		Return a copy of the cache and database counters:
+			
+			hits: node lookups answered from the cache
+			misses: node lookups that went to the database
+			evictions: nodes dropped from the cache to stay within cacheSize
+			reads: database queries
+			writes: database inserts, updates and deletes
+			cached: nodes currently cached
+		"""
+		stats = dict(self._io)
+		stats['cached'] = len(self._cache)
+		return stats
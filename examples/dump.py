@@ -0,0 +1,85 @@
+#!/usr/bin/python
+"""
+Measure how fast a Trie of a few million counter keys is written out with
+Trie::dump and read back with Trie::loadStream, in each line format,
+against building the same Trie with a hand written add loop. Pass the
+number of keys to use, 2000000 by default.
+
+This example uses:
+	
+	* Trie::dump and Trie::loadStream, in the jsonl and tsv formats
+	* The STORE_COUNT storage function
+	
+"""
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_COUNT
+import gc
+import os
+import random
+import resource
+import tempfile
+import time
+
+def counterKeys(n):
+	rand = random.Random(42)
+	sections = ['home', 'search', 'cart', 'account', 'help']
+	return ('%s.%s.%i' % (rand.choice(sections), rand.choice(sections), i) for i in xrange(n))
+
+def peakMB():
+	return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def newTrie():
+	return Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+
+def report(label, n, seconds, filename = None):
+	line = "\t%-24s %10.0f keys / second" % (label, n / seconds)
+	if filename is not None:
+		line += "  (%0.1f MB)" % (os.path.getsize(filename) / 1048576.0)
+	print line
+
+if __name__ == "__main__":
+	
+	n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+	
+	# nothing here makes cycles, and the collector would scan every node
+	# of the Trie over and over as it grows
+	gc.disable()
+	
+	print "Building a Trie of %i counter keys" % (n)
+	t = newTrie()
+	st = time.time()
+	for key in counterKeys(n):
+		t.add(key)
+	report("add loop", n, time.time() - st)
+	
+	# dumping streams, so shouldn't raise the peak much past the Trie itself
+	print "Peak memory with the Trie built %0.0f MB" % (peakMB())
+	
+	directory = tempfile.mkdtemp()
+	try:
+		for format in ('jsonl', 'tsv'):
+			filename = os.path.join(directory, 'counts.' + format)
+			
+			print "Format %s:" % (format)
+			
+			out = open(filename, 'w')
+			st = time.time()
+			written = t.dump(out, format = format)
+			out.close()
+			report("dump", written, time.time() - st, filename)
+			
+			# load into a fresh Trie, freeing the old copy first
+			loaded = newTrie()
+			st = time.time()
+			count = loaded.loadStream(open(filename), format = format)
+			report("loadStream", count, time.time() - st)
+			
+			if list(loaded.paths(prefix = 'cart.help')) != list(t.paths(prefix = 'cart.help')):
+				print "\tLoaded Trie doesn't match"
+			del loaded
+			os.remove(filename)
+	finally:
+		os.rmdir(directory)
+	
+	print "Peak memory %0.0f MB" % (peakMB())
@@ -0,0 +1,50 @@
+#!/usr/bin/python
+"""
+Measure the sustained write throughput of a DurableTrie under each of its
+log sync policies, against a plain in memory Trie. Each run adds random
+dotted counter keys, as a clickstream counter would.
+
+This example uses:
+	
+	* The DurableTrie write-ahead log and snapshots
+	* The STORE_COUNT storage function
+	
+"""
+import sys
+sys.path.append("../")
+from Trieful import Trie, DurableTrie, KEY_DOTTED, STORE_COUNT
+import random
+import shutil
+import tempfile
+import time
+
+def counterKeys(n):
+	rand = random.Random(42)
+	sections = ['home', 'search', 'cart', 'account', 'help']
+	return ['%s.%s.%i' % (rand.choice(sections), rand.choice(sections), rand.randint(0, 1000)) for i in xrange(n)]
+
+def run(label, t, keys):
+	st = time.time()
+	for key in keys:
+		t.add(key)
+	if isinstance(t, DurableTrie):
+		t.close()
+	ed = time.time()
+	
+	print "\t%-32s %10.0f writes / second" % (label, len(keys) / (ed - st))
+
+if __name__ == "__main__":
+	
+	keys = counterKeys(50000)
+	
+	print "Write throughput for %i counter updates" % (len(keys))
+	
+	run("in memory Trie", Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT), keys)
+	
+	for (sync, batchSize, n) in [('never', 100, len(keys)), ('batch', 1000, len(keys)), ('batch', 100, len(keys)), ('always', 1, 2000)]:
+		directory = tempfile.mkdtemp()
+		try:
+			t = DurableTrie(directory, keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT, sync = sync, batchSize = batchSize)
+			run("sync=%s batchSize=%i" % (sync, batchSize), t, keys[:n])
+		finally:
+			shutil.rmtree(directory)
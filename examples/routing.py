@@ -0,0 +1,49 @@
+#!/usr/bin/python
+"""
+Build an IPv4 routing table the size of a full internet table from random
+prefixes, and time longest prefix match lookups of random addresses at
+several node strides.
+
+This example uses:
+	
+	* The key_ip key function, with 4 and 8 bit strides
+	* The STORE_OVERWRITE storage function
+	* The Trie::longestPrefix method
+	
+"""
+import sys
+sys.path.append("../")
+from Trieful import Trie, STORE_OVERWRITE, key_ip
+import random
+import time
+
+def randomAddress(rand):
+	return '%i.%i.%i.%i' % (rand.randint(1, 223), rand.randint(0, 255), rand.randint(0, 255), rand.randint(0, 255))
+
+if __name__ == "__main__":
+	
+	rand = random.Random(42)
+	
+	# real tables are dominated by /24s, with most of the rest between /16 and /23
+	lengths = [24] * 60 + range(16, 24) * 4 + range(8, 16)
+	routes = [('%s/%i' % (randomAddress(rand), rand.choice(lengths)), i) for i in xrange(900000)]
+	addresses = [randomAddress(rand) for i in xrange(200000)]
+	
+	for stride in (4, 8):
+		t = Trie(keyFunction = key_ip(4, stride), storeFunction = STORE_OVERWRITE)
+		
+		st = time.time()
+		for (prefix, nextHop) in routes:
+			t.add(prefix, nextHop)
+		ed = time.time()
+		
+		print "stride %i: built table of %i prefixes in %0.2fs" % (stride, len(t), ed - st)
+		
+		matched = 0
+		st = time.time()
+		for address in addresses:
+			if t.longestPrefix(address) is not None:
+				matched += 1
+		ed = time.time()
+		
+		print "\t%i lookups (%i matched) at %0.0f lookups / second" % (len(addresses), matched, len(addresses) / (ed - st))
@@ -10,6 +10,30 @@ import tests.trie_add
 import tests.trie_iadd
 import tests.trie_path
 import tests.trie_prune
+import tests.store_array
+import tests.trie_profile
+import tests.trie_stats
+import tests.trie_range
+import tests.trie_paging
+import tests.trie_durable
+import tests.trie_disk
+import tests.keys_ip
+import tests.trie_scanner
+import tests.trie_many
+import tests.trie_pickle
+import tests.trie_diff
+import tests.trie_events
+import tests.trie_index
+import tests.store_set
+import tests.trie_expiring
+import tests.trie_bounded
+import tests.trie_heavy
+import tests.trie_walk
+import tests.trie_transform
+import tests.trie_sample
+import tests.trie_view
+import tests.keys_normalized
+import tests.trie_dump
 
 from Trieful import Trie
 
@@ -25,4 +49,28 @@ if __name__ == "__main__":
 	suite.addTests(tests.trie_iadd.suite())
 	suite.addTests(tests.trie_path.suite())
 	suite.addTests(tests.trie_prune.suite())
+	suite.addTests(tests.store_array.suite())
+	suite.addTests(tests.trie_profile.suite())
+	suite.addTests(tests.trie_stats.suite())
+	suite.addTests(tests.trie_range.suite())
+	suite.addTests(tests.trie_paging.suite())
+	suite.addTests(tests.trie_durable.suite())
+	suite.addTests(tests.trie_disk.suite())
+	suite.addTests(tests.keys_ip.suite())
+	suite.addTests(tests.trie_scanner.suite())
+	suite.addTests(tests.trie_many.suite())
+	suite.addTests(tests.trie_pickle.suite())
+	suite.addTests(tests.trie_diff.suite())
+	suite.addTests(tests.trie_events.suite())
+	suite.addTests(tests.trie_index.suite())
+	suite.addTests(tests.store_set.suite())
+	suite.addTests(tests.trie_expiring.suite())
+	suite.addTests(tests.trie_bounded.suite())
+	suite.addTests(tests.trie_heavy.suite())
+	suite.addTests(tests.trie_walk.suite())
+	suite.addTests(tests.trie_transform.suite())
+	suite.addTests(tests.trie_sample.suite())
+	suite.addTests(tests.trie_view.suite())
+	suite.addTests(tests.keys_normalized.suite())
+	suite.addTests(tests.trie_dump.suite())
 	unittest.TextTestRunner(verbosity=2).run(suite)
\ No newline at end of file
@@ -0,0 +1,97 @@
+import unittest
+import random
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_IPV4, KEY_IPV6, STORE_OVERWRITE, key_ip
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(IPv4KeyTests))
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(IPv6KeyTests))
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(IPStrideTests))
+	return suite
+	
+class IPv4KeyTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_IPV4, storeFunction = STORE_OVERWRITE)
+		self.routes = {
+			'10.0.0.0/8': 'a',
+			'10.1.0.0/16': 'b',
+			'10.128.0.0/9': 'c',
+			'10.1.2.0/23': 'd',
+			'192.168.1.1': 'e'
+		}
+		self.trie += self.routes
+	
+	def test_keys(self):
+		self.assertTrue(KEY_IPV4['pathToKey']('10.128.0.0/9') == [10, (1, 1)], "KEY_IPV4 partial stride")
+		self.assertTrue(KEY_IPV4['pathToKey']('10.1.2.3/16') == [10, 1], "KEY_IPV4 ignores host bits")
+		self.assertTrue(KEY_IPV4['keyToPath']([10, (1, 1)]) == '10.128.0.0/9', "KEY_IPV4 keyToPath")
+		self.assertRaises(ValueError, KEY_IPV4['pathToKey'], '10.0.0.0/33')
+	
+	def test_paths(self):
+		self.assertTrue(sorted(self.trie.paths()) == sorted(['10.0.0.0/8', '10.1.0.0/16', '10.128.0.0/9', '10.1.2.0/23', '192.168.1.1/32']), "KEY_IPV4 paths")
+		self.assertTrue(self.trie.get('10.1.0.0/16') == 'b', "KEY_IPV4 get")
+	
+	def test_longestPrefix(self):
+		self.assertTrue(self.trie.longestPrefix('10.1.2.3') == ('10.1.2.0/23', 'd'), "Trie::longestPrefix partial")
+		self.assertTrue(self.trie.longestPrefix('10.1.3.255') == ('10.1.2.0/23', 'd'), "Trie::longestPrefix partial")
+		self.assertTrue(self.trie.longestPrefix('10.1.4.1') == ('10.1.0.0/16', 'b'), "Trie::longestPrefix")
+		self.assertTrue(self.trie.longestPrefix('10.200.0.1') == ('10.128.0.0/9', 'c'), "Trie::longestPrefix partial")
+		self.assertTrue(self.trie.longestPrefix('10.2.0.1') == ('10.0.0.0/8', 'a'), "Trie::longestPrefix")
+		self.assertTrue(self.trie.longestPrefix('192.168.1.1') == ('192.168.1.1/32', 'e'), "Trie::longestPrefix host")
+		self.assertTrue(self.trie.longestPrefix('11.0.0.1') is None, "Trie::longestPrefix no match")
+		
+		self.trie.add('0.0.0.0/0', 'default')
+		self.assertTrue(self.trie.longestPrefix('11.0.0.1') == ('0.0.0.0/0', 'default'), "Trie::longestPrefix default route")
+		self.assertTrue(self.trie.longestPrefix('10.128.0.0/9') == ('10.128.0.0/9', 'c'), "Trie::longestPrefix of a partial prefix")
+	
+	def test_defaultRoute(self):
+		self.assertTrue(KEY_IPV4['pathToKey']('0.0.0.0/0') == [(0, 0)] and KEY_IPV4['keyToPath']([(0, 0)]) == '0.0.0.0/0', "KEY_IPV4 default route")
+		
+		self.trie.add('0.0.0.0/0', 'default')
+		self.assertTrue(len(self.trie) == 6 and len(list(self.trie.paths())) == 6, "KEY_IPV4 default route paths")
+		self.assertTrue(self.trie.nth(len(self.trie) - 1) == '0.0.0.0/0' and self.trie.get('0.0.0.0/0') == 'default', "KEY_IPV4 default route nth")
+		
+		self.trie.removeAll('0.0.0.0/0')
+		self.assertTrue(len(self.trie) == 5 and self.trie.longestPrefix('11.0.0.1') is None, "KEY_IPV4 default route removeAll")
+		
+		t = Trie(keyFunction = key_ip(4, 1), storeFunction = STORE_OVERWRITE)
+		t.add('0.0.0.0/0', 'default')
+		t.add('128.0.0.0/1', 'high')
+		self.assertTrue(t.longestPrefix('1.2.3.4') == ('0.0.0.0/0', 'default') and t.longestPrefix('200.0.0.1') == ('128.0.0.0/1', 'high'), "key_ip stride 1 default route")
+
+class IPv6KeyTests(unittest.TestCase):
+	
+	def test_longestPrefix(self):
+		t = Trie(keyFunction = KEY_IPV6, storeFunction = STORE_OVERWRITE)
+		t.add('2001:db8::/32', 'a')
+		t.add('2001:db8:8000::/33', 'b')
+		
+		self.assertTrue(t.longestPrefix('2001:db8::1') == ('2001:db8::/32', 'a'), "KEY_IPV6 longestPrefix")
+		self.assertTrue(t.longestPrefix('2001:db8:ffff::1') == ('2001:db8:8000::/33', 'b'), "KEY_IPV6 longestPrefix partial")
+		self.assertTrue(t.longestPrefix('2001:db9::1') is None, "KEY_IPV6 longestPrefix no match")
+
+class IPStrideTests(unittest.TestCase):
+	
+	def test_strides(self):
+		rand = random.Random(3)
+		prefixes = {}
+		for i in xrange(200):
+			length = rand.randint(4, 28)
+			address = '%i.%i.%i.%i' % tuple(rand.randint(0, 255) for j in xrange(4))
+			prefixes[KEY_IPV4['keyToPath'](KEY_IPV4['pathToKey']('%s/%i' % (address, length)))] = i
+		
+		tries = []
+		for stride in (1, 4, 8):
+			t = Trie(keyFunction = key_ip(4, stride), storeFunction = STORE_OVERWRITE)
+			t += prefixes
+			tries.append(t)
+		
+		self.assertTrue(len(tries[2].stats()['depths']) <= 4, "key_ip stride bounds depth")
+		
+		for i in xrange(500):
+			address = '%i.%i.%i.%i' % tuple(rand.randint(0, 255) for j in xrange(4))
+			matches = [t.longestPrefix(address) for t in tries]
+			self.assertTrue(matches[0] == matches[1] == matches[2], "key_ip strides agree on %s" % (address))
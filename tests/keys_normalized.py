@@ -0,0 +1,79 @@
+import unittest
+import pickle
+import sys
+sys.path.append("../")
+from Trieful import Trie, NormalizedTrie, STORE_OVERWRITE, STORE_SET, key_normalized
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(NormalizedKeyTests))
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(NormalizedTrieTests))
+	return suite
+	
+class NormalizedKeyTests(unittest.TestCase):
+	
+	def test_casefold(self):
+		k = key_normalized('casefold')
+		self.assertTrue(k['pathToKey'](u'Stra\xdfe') == list(u'strasse'), "key_normalized casefold")
+		self.assertTrue(k['pathToKey'](u'\u03a3\u03c2') == [u'\u03c3', u'\u03c3'], "key_normalized casefold final sigma")
+		self.assertTrue(k['pathToKey']('Caf\xc3\xa9') == list(u'caf\xe9'), "key_normalized decodes str")
+		self.assertTrue(k['keyToPath'](k['pathToKey']('ABC')) == 'abc', "key_normalized keyToPath")
+		self.assertTrue(key_normalized('casefold') is k, "key_normalized registered once")
+	
+	def test_nfkc(self):
+		k = key_normalized('nfkc')
+		self.assertTrue(k['pathToKey'](u'\uff21\ufb01') == list(u'Afi'), "key_normalized nfkc")
+		self.assertTrue(k['pathToKey'](u'cafe\u0301') == list(u'caf\xe9'), "key_normalized nfkc combines with ASCII")
+		self.assertTrue(key_normalized('nfkc_casefold')['pathToKey'](u'\uff21\xdf') == list(u'ass'), "key_normalized nfkc_casefold")
+		self.assertRaises(ValueError, key_normalized, 'upper')
+	
+	def test_fold(self):
+		k = key_normalized('nfkc_casefold')
+		for path in [u'caf\xe9 CAFE\u0301', 'plain ASCII', u'\u1100\u1161\u11a8 \uff21\ufb01']:
+			self.assertTrue(list(k['fold'](path)) == k['pathToKey'](path), "key_normalized fold")
+		
+		folded = k['fold'](u'Zoo\xdf')
+		self.assertTrue(folded.next() == 'z', "key_normalized fold is incremental")
+	
+	def test_separator(self):
+		k = key_normalized('casefold', '.')
+		self.assertTrue(k['pathToKey']('WWW.Example.COM') == ['www', 'example', 'com'], "key_normalized separator")
+		self.assertTrue(k['keyToPath'](['www', 'example']) == 'www.example', "key_normalized separator keyToPath")
+		
+		t = Trie(keyFunction = k, storeFunction = STORE_OVERWRITE)
+		t.add('Example.COM', 1)
+		self.assertTrue(t.get('example.com') == 1 and list(t.paths()) == ['example.com'], "Trie with key_normalized")
+	
+class NormalizedTrieTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = NormalizedTrie(keyFunction = key_normalized('casefold', '.'))
+		self.trie.add('Example.COM', 1)
+		self.trie.add('example.com', 2)
+		self.trie.add('Example.ORG', 3)
+	
+	def test_spellings(self):
+		self.assertTrue(self.trie.get('EXAMPLE.com') == [1, 2] and self.trie.has('example.org'), "NormalizedTrie::get")
+		self.assertTrue(not self.trie.has('example') and self.trie.get('example.net', 0) == 0, "NormalizedTrie::get missing")
+		self.assertTrue(list(self.trie.paths()) == ['Example.COM', 'Example.ORG'], "NormalizedTrie keeps spellings")
+		self.assertTrue(self.trie.spelling('example.org') == 'Example.ORG' and self.trie.spelling('x') is None, "NormalizedTrie::spelling")
+	
+	def test_removal(self):
+		events = []
+		self.trie.subscribe(events.append)
+		self.trie.removeAll('EXAMPLE.COM')
+		self.trie.add('EXAMPLE.COM', 4)
+		self.assertTrue(events[0][:2] == ('removeAll', 'Example.COM'), "NormalizedTrie events use spellings")
+		self.assertTrue(list(self.trie.paths()) == ['EXAMPLE.COM', 'Example.ORG'], "NormalizedTrie forgets removed spellings")
+		
+		self.trie.unsubscribe(events.append)
+		self.trie.prune('example')
+		self.assertTrue(len(self.trie) == 0 and self.trie._spellings == {}, "NormalizedTrie::prune")
+	
+	def test_stores(self):
+		t = NormalizedTrie(storeFunction = STORE_SET)
+		t.addCounts([u'Stra\xdfe', 'STRASSE', 'Other'], 'x')
+		t.enableValueIndex()
+		self.assertTrue(list(t.paths()) == ['Other', u'Stra\xdfe'] and t.pathsFor('x') == ['Other', u'Stra\xdfe'], "NormalizedTrie::addCounts")
+		self.assertTrue(pickle.loads(pickle.dumps(t)).get('strasse') == set(['x']), "NormalizedTrie pickles")
+		self.assertRaises(ValueError, NormalizedTrie, keyFunction = STORE_SET)
@@ -0,0 +1,93 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_COUNT, store_array
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(StoreArrayTests))
+	return suite
+	
+class StoreArrayTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED, storeFunction = store_array())
+		self.keys = ['com.example', 'com.baz', 'com.example.sub', 'org.example', 'com.example', 'com.example.sub', 'com.example.sub']
+		for key in self.keys:
+			self.trie.add(key)
+	
+	def test_counts(self):
+		countParts = {
+			'com.example': 2,
+			'com.baz': 1,
+			'com.example.sub': 3
+		}
+		
+		for countPart in countParts.items():
+			val = self.trie.get(countPart[0])
+			self.assertTrue(val == countPart[1], "Trie::get with store_array")
+		
+		self.assertTrue(len(self.trie) == 4, "Trie::__len__ with store_array")
+	
+	def test_removes(self):
+		self.trie.remove('org.example')
+		self.trie.remove('com.example')
+		
+		self.assertTrue(self.trie.get('org.example') is None, "remove single path")
+		self.assertTrue(self.trie.get('com.example') == 1, "remove double path")
+		
+		# freed slots are reused
+		slots = len(self.trie._storeFunction['values'])
+		self.trie.add('net.example')
+		self.assertTrue(len(self.trie._storeFunction['values']) == slots, "store_array slot reuse")
+		
+		self.trie.removeAll('com.example.sub')
+		self.assertTrue(self.trie.get('com.example.sub') is None, "Trie::removeAll with store_array")
+		self.assertTrue(len(self.trie) == 3, "Trie::__len__ with store_array")
+	
+	def test_addCounts(self):
+		self.trie.addCounts(['com.example', 'com.example', 'net.example'])
+		
+		self.assertTrue(self.trie.get('com.example') == 4, "Trie::addCounts")
+		self.assertTrue(self.trie.get('net.example') == 1, "Trie::addCounts new path")
+		self.assertTrue(len(self.trie) == 5, "Trie::addCounts length")
+	
+	def test_addCounts_subpaths(self):
+		t = Trie(storeFunction = store_array())
+		t.addCounts(['cat', 'car', 'cat', 'dog'], atAllSubPaths = True)
+		
+		self.assertTrue(t.get('c') == 3, "Trie::addCounts atAllSubPaths")
+		self.assertTrue(t.get('cat') == 2, "Trie::addCounts atAllSubPaths")
+		self.assertTrue(t.get('d') == 1, "Trie::addCounts atAllSubPaths")
+		
+		# counting existing paths again doesn't change the paths
+		changes = t._changes
+		t.addCounts(['cat', 'dog'], atAllSubPaths = True)
+		self.assertTrue(t._changes == changes and t.get('c') == 4, "Trie::addCounts atAllSubPaths existing paths")
+	
+	def test_addCounts_values(self):
+		t = Trie(storeFunction = store_array('d', count = False))
+		t.addCounts(['a', 'a', 'b'], value = 0.5)
+		
+		self.assertTrue(t.get('a') == 1.0, "Trie::addCounts store_array(count = False)")
+		self.assertTrue(t.get('b') == 0.5, "Trie::addCounts store_array(count = False)")
+	
+	def test_aggregates(self):
+		self.assertTrue(self.trie.prefixSum('com') == 6, "Trie::prefixSum")
+		self.assertTrue(self.trie.prefixSum() == 7, "Trie::prefixSum")
+		self.assertTrue(self.trie.prefixMax('com') == 3, "Trie::prefixMax")
+		self.assertTrue(self.trie.prefixMax('gov') is None, "Trie::prefixMax missing prefix")
+		self.assertTrue(self.trie.prefixSum('gov') == 0, "Trie::prefixSum missing prefix")
+	
+	def test_copy(self):
+		nt = self.trie + {'com.example': 1}
+		
+		self.assertTrue(nt.get('com.example') == 3, "Trie::__add__ with store_array")
+		self.assertTrue(self.trie.get('com.example') == 2, "Trie::__add__ leaves original")
+	
+	def test_addCounts_store_count(self):
+		t = Trie(storeFunction = STORE_COUNT)
+		t.addCounts(['a', 'a', 'b'])
+		
+		self.assertTrue(t.get('a') == 2, "Trie::addCounts with STORE_COUNT")
+		self.assertTrue(len(t) == 2, "Trie::addCounts with STORE_COUNT")
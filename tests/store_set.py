@@ -0,0 +1,101 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_SET, STORE_MULTISET
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(StoreSetTests))
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(StoreMultisetTests))
+	return suite
+	
+class StoreSetTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_SET)
+		for (key, value) in [('com', 'a'), ('com.example', 'b'), ('com.example', 'c'), ('com.example', 'b')]:
+			self.trie.add(key, value)
+	
+	def test_get(self):
+		values = self.trie.get('com.example')
+		self.assertTrue(values == set(['b', 'c']), "STORE_SET get")
+		self.assertTrue('b' in values and len(values) == 2, "STORE_SET view")
+		self.assertRaises(AttributeError, getattr, values, 'add')
+		
+		self.trie.add('com.example', 'd')
+		self.assertTrue('d' in values, "STORE_SET live view")
+	
+	def test_remove(self):
+		self.trie.remove('com.example', 'b')
+		self.trie.remove('com.example', 'z')
+		self.assertTrue(self.trie.get('com.example') == set(['c']), "STORE_SET remove")
+		
+		self.trie.remove('com.example', 'c')
+		self.assertTrue(not self.trie.has('com.example') and len(self.trie) == 1, "STORE_SET remove last")
+	
+	def test_getAllPathValues(self):
+		self.assertTrue(sorted(self.trie.getAllPathValues('com.example')) == ['a', 'b', 'c'], "STORE_SET getAllPathValues")
+		self.assertTrue([sorted(v) for v in self.trie.getAllPathValuesMany(['com.example', 'com'])] == [['a', 'b', 'c'], ['a']], "STORE_SET getAllPathValuesMany")
+	
+	def test_valueIndex(self):
+		self.trie.enableValueIndex()
+		self.trie.remove('com.example', 'b')
+		self.assertTrue(self.trie.pathsFor('b') == [] and self.trie.pathsFor('c') == ['com.example'], "STORE_SET value index")
+
+	def test_merge(self):
+		other = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_SET)
+		other.add('com.example', 'd')
+		other.add('org', 'e')
+		
+		merged = self.trie + other
+		self.trie += other
+		for t in (merged, self.trie):
+			self.assertTrue(t.get('com.example') == set(['b', 'c', 'd']) and t.get('org') == set(['e']), "STORE_SET merge")
+
+class StoreMultisetTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_MULTISET)
+		for (key, value) in [('com', 'a'), ('com.example', 'b'), ('com.example', 'c'), ('com.example', 'b')]:
+			self.trie.add(key, value)
+	
+	def test_get(self):
+		values = self.trie.get('com.example')
+		self.assertTrue(values.count('b') == 2 and values.count('c') == 1 and values.count('z') == 0, "STORE_MULTISET count")
+		self.assertTrue(sorted(values) == ['b', 'c'] and len(values) == 2, "STORE_MULTISET distinct values")
+		self.assertTrue(sorted(values.elements()) == ['b', 'b', 'c'], "STORE_MULTISET elements")
+		self.assertTrue(values == {'b': 2, 'c': 1}, "STORE_MULTISET equality")
+	
+	def test_remove(self):
+		self.trie.remove('com.example', 'b')
+		self.assertTrue(self.trie.get('com.example') == {'b': 1, 'c': 1}, "STORE_MULTISET remove")
+		
+		self.trie.remove('com.example', 'b')
+		self.trie.remove('com.example', 'c')
+		self.assertTrue(not self.trie.has('com.example') and len(self.trie) == 1, "STORE_MULTISET remove last")
+	
+	def test_getAllPathValues(self):
+		self.assertTrue(sorted(self.trie.getAllPathValues('com.example')) == ['a', 'b', 'b', 'c'], "STORE_MULTISET getAllPathValues")
+	
+	def test_removeValueEverywhere(self):
+		self.trie.enableValueIndex()
+		self.trie.add('com', 'b')
+		self.assertTrue(self.trie.removeValueEverywhere('b') == 2, "STORE_MULTISET removeValueEverywhere")
+		self.assertTrue(self.trie.get('com.example') == {'c': 1} and self.trie.get('com') == {'a': 1}, "STORE_MULTISET removeValueEverywhere values")
+	
+	def test_events(self):
+		events = []
+		self.trie.subscribe(events.append)
+		self.trie.add('com', 'a')
+		(op, path, old, new) = events[0]
+		self.assertTrue(old.count('a') == 1 and new.count('a') == 2, "STORE_MULTISET event snapshots")
+	
+	def test_merge(self):
+		other = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_MULTISET)
+		other.add('com.example', 'b')
+		other.add('org', 'e')
+		
+		merged = self.trie + other
+		self.trie += other
+		for t in (merged, self.trie):
+			self.assertTrue(t.get('com.example') == {'b': 3, 'c': 1} and t.get('org') == {'e': 1}, "STORE_MULTISET merge")
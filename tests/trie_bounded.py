@@ -0,0 +1,97 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import Trie, BoundedTrie, KEY_DOTTED, STORE_OVERWRITE
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(BoundedTrieTests))
+	return suite
+	
+class BoundedTrieTests(unittest.TestCase):
+	
+	def fill(self, policy):
+		t = BoundedTrie(keyFunction = KEY_DOTTED, storeFunction = STORE_OVERWRITE, maxSize = 3, policy = policy)
+		t.add('com.example', 1)
+		t.add('com.example.sub', 2)
+		t.add('org.example', 3)
+		return t
+	
+	def test_lru(self):
+		t = self.fill('lru')
+		t.get('com.example')
+		t.add('net.example', 4)
+		
+		self.assertTrue(len(t) == 3, "BoundedTrie::__len__")
+		self.assertTrue(sorted(t.paths()) == ['com.example', 'net.example', 'org.example'], "BoundedTrie lru eviction")
+		
+		t.add('gov.example', 5)
+		self.assertTrue(sorted(t.paths()) == ['com.example', 'gov.example', 'net.example'], "BoundedTrie lru eviction")
+		self.assertTrue('org' not in t._nodes, "BoundedTrie evicts empty branches")
+		self.assertTrue(t.evictionStats() == {'evictions': 2, 'hits': 1, 'misses': 0}, "BoundedTrie::evictionStats")
+	
+	def test_lfu(self):
+		t = self.fill('lfu')
+		for i in xrange(3):
+			t.get('org.example')
+		t.get('com.example')
+		t.get('missing')
+		
+		t.add('net.example', 4)
+		self.assertTrue(sorted(t.paths()) == ['com.example', 'net.example', 'org.example'], "BoundedTrie lfu eviction")
+		
+		# net.example has the fewest uses
+		t.add('gov.example', 5)
+		self.assertTrue(sorted(t.paths()) == ['com.example', 'gov.example', 'org.example'], "BoundedTrie lfu eviction")
+		self.assertTrue(t.evictionStats() == {'evictions': 2, 'hits': 4, 'misses': 1}, "BoundedTrie::evictionStats")
+	
+	def test_removals(self):
+		for policy in ('lru', 'lfu'):
+			t = self.fill(policy)
+			t.removeAll('com.example.sub')
+			t.prune('org')
+			t.add('net.example', 4)
+			t.add('gov.example', 5)
+			self.assertTrue(sorted(t.paths()) == ['com.example', 'gov.example', 'net.example'], "BoundedTrie removals untracked")
+			self.assertTrue(t.evictionStats()['evictions'] == 0, "BoundedTrie removals not evicted")
+	
+	def test_maxBytes(self):
+		t = BoundedTrie(storeFunction = STORE_OVERWRITE, maxBytes = 25, sizeOf = lambda key, value: len(value))
+		t.add('a', 'x' * 10)
+		t.add('b', 'x' * 10)
+		t.add('c', 'x' * 10)
+		self.assertTrue(sorted(''.join(p) for p in t.paths()) == ['b', 'c'], "BoundedTrie maxBytes")
+		
+		t.add('b', 'x')
+		t.add('d', 'x' * 10)
+		self.assertTrue(sorted(''.join(p) for p in t.paths()) == ['b', 'c', 'd'], "BoundedTrie maxBytes after shrinking")
+		self.assertTrue(t._bytes == 21, "BoundedTrie byte count")
+	
+	def test_transform(self):
+		t = BoundedTrie(storeFunction = STORE_OVERWRITE, maxSize = 3, maxBytes = 25, sizeOf = lambda key, value: len(value))
+		t.add('a', 'x' * 5)
+		t.add('b', 'x' * 5)
+		t.filterValues(lambda value: False)
+		self.assertTrue(len(t) == 0 and t._bytes == 0 and not t._recent, "BoundedTrie::filterValues untracked")
+		
+		for path in 'cde':
+			t.add(path, 'x' * 5)
+		self.assertTrue(t.evictionStats()['evictions'] == 0, "BoundedTrie filtered values not evicted")
+		
+		t.mapValues(lambda value: value * 2)
+		self.assertTrue(len(t) == 2 and t._bytes == 20 and t.evictionStats()['evictions'] == 1, "BoundedTrie::mapValues measured")
+	
+	def test_applyDiff(self):
+		source = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_OVERWRITE)
+		for i in xrange(10):
+			source.add('p%i' % (i), i)
+		
+		t = BoundedTrie(keyFunction = KEY_DOTTED, storeFunction = STORE_OVERWRITE, maxSize = 5)
+		t.applyDiff(t.diff(source))
+		self.assertTrue(len(t) == 5 and list(t.paths()) == ['p5', 'p6', 'p7', 'p8', 'p9'], "BoundedTrie::applyDiff evicts")
+		
+		t.add('new', 1)
+		self.assertTrue(len(t) == 5 and t.has('new') and not t.has('p5'), "BoundedTrie tracks applied values")
+	
+	def test_badPolicy(self):
+		self.assertRaises(ValueError, BoundedTrie, policy = 'fifo')
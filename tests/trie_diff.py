@@ -0,0 +1,69 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_OVERWRITE, STORE_COUNT, store_array
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieDiffTests))
+	return suite
+	
+class TrieDiffTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.primary = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_OVERWRITE)
+		self.replica = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_OVERWRITE)
+		for key in ['com', 'com.example', 'com.example.sub', 'org.example', 'net.example']:
+			self.primary.add(key, key)
+			self.replica.add(key, key)
+	
+	def test_identical(self):
+		self.assertTrue(list(self.primary.diff(self.replica)) == [], "Trie::diff identical")
+		self.assertTrue(list(self.primary.diff(self.primary)) == [], "Trie::diff self")
+	
+	def test_changes(self):
+		self.primary.add('com.example', 'changed')
+		self.primary.add('com.example.other', 'new')
+		self.primary.removeAll('org.example')
+		self.primary.add('gov.example.sub', 'deep')
+		
+		self.assertTrue(list(self.replica.diff(self.primary)) == [
+			('changed', 'com.example', 'com.example', 'changed'),
+			('added', 'com.example.other', None, 'new'),
+			('added', 'gov.example.sub', None, 'deep'),
+			('removed', 'org.example', 'org.example', None)
+		], "Trie::diff changes")
+		
+		self.replica.applyDiff(self.replica.diff(self.primary))
+		self.assertTrue(self.replica._nodes == self.primary._nodes, "Trie::applyDiff nodes")
+		self.assertTrue(len(self.replica) == len(self.primary), "Trie::applyDiff size")
+		self.assertTrue(list(self.replica.diff(self.primary)) == [], "Trie::applyDiff synced")
+	
+	def test_cachedHashes(self):
+		# hashes cached by one diff must be dropped by later changes
+		self.assertTrue(list(self.replica.diff(self.primary)) == [], "Trie::diff cached")
+		self.primary.add('com.example.sub', 'changed')
+		self.assertTrue(list(self.replica.diff(self.primary)) == [('changed', 'com.example.sub', 'com.example.sub', 'changed')], "Trie::diff after add")
+		self.primary.removeAll('com.example.sub')
+		self.assertTrue(list(self.replica.diff(self.primary)) == [('removed', 'com.example.sub', 'com.example.sub', None)], "Trie::diff after removeAll")
+		self.primary.prune('com')
+		self.assertTrue(len(list(self.replica.diff(self.primary))) == 3, "Trie::diff after prune")
+	
+	def test_arrayStore(self):
+		primary = Trie(storeFunction = store_array())
+		replica = Trie(storeFunction = store_array())
+		primary.addCounts(['a', 'ab', 'ab', 'b'])
+		replica.addCounts(['a', 'ab', 'c'])
+		
+		self.assertTrue(list(replica.diff(primary)) == [
+			('changed', ['a', 'b'], 1, 2),
+			('added', ['b'], None, 1),
+			('removed', ['c'], 1, None)
+		], "Trie::diff store_array")
+		
+		replica.applyDiff(replica.diff(primary))
+		self.assertTrue([replica.get(k) for k in ['a', 'ab', 'b', 'c']] == [1, 2, 1, None], "Trie::applyDiff store_array")
+	
+	def test_incompatible(self):
+		other = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+		self.assertRaises(TypeError, list, self.primary.diff(other))
@@ -0,0 +1,102 @@
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+sys.path.append("../")
+from Trieful import Trie, DiskTrie, KEY_DOTTED, STORE_COUNT, STORE_MULTISET, store_array
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(DiskTrieTests))
+	return suite
+	
+class DiskTrieTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.filename = os.path.join(self.directory, 'trie.db')
+		self.trie = self.open()
+		self.keys = ['com.example', 'com.example.sub', 'org.example', 'com.other', 'com.other.sub', 'net.example', 'com.example']
+		for key in self.keys:
+			self.trie.add(key)
+	
+	def tearDown(self):
+		self.trie.close()
+		shutil.rmtree(self.directory)
+	
+	def open(self):
+		return DiskTrie(self.filename, keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT, cacheSize = 4)
+	
+	def test_get(self):
+		self.assertTrue(len(self.trie) == 6, "DiskTrie::__len__")
+		self.assertTrue(self.trie.get('com.example') == 2, "DiskTrie::get")
+		self.assertTrue(self.trie['com.other.sub'] == 1, "DiskTrie::__getitem__")
+		self.assertTrue(self.trie.get('com') is None, "DiskTrie::get without value")
+		self.assertTrue(self.trie.get('gov.example', 0) == 0, "DiskTrie::get default")
+		self.assertTrue('net.example' in self.trie, "DiskTrie::__contains__")
+		self.assertTrue(not self.trie.has('com'), "DiskTrie::has without value")
+	
+	def test_paths(self):
+		reference = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+		for key in self.keys:
+			reference.add(key)
+		
+		self.assertTrue(list(self.trie.paths()) == list(reference.paths()), "DiskTrie::paths")
+		self.assertTrue(list(self.trie.paths(prefix = 'com.example')) == ['com.example', 'com.example.sub'], "DiskTrie::paths(prefix)")
+		self.assertTrue(sorted(self.trie.paths(ordered = False)) == sorted(reference.paths()), "DiskTrie::paths(ordered = False)")
+		self.assertTrue(dict(self.trie.items()) == dict(reference.items()), "DiskTrie::items")
+		self.assertTrue(self.trie.getSubPaths('com.example.sub.x') == ['com.example', 'com.example.sub'], "DiskTrie::getSubPaths")
+	
+	def test_removes(self):
+		self.trie.remove('com.example')
+		self.trie.remove('org.example')
+		self.trie.removeAll('com.other.sub')
+		
+		self.assertTrue(self.trie.get('com.example') == 1, "DiskTrie::remove")
+		self.assertTrue(not self.trie.has('org.example'), "DiskTrie::remove last")
+		self.assertTrue(not self.trie.has('com.other.sub'), "DiskTrie::removeAll")
+		self.assertTrue(len(self.trie) == 4, "DiskTrie::__len__ after removes")
+		
+		self.trie.prune('com')
+		self.assertTrue(list(self.trie.paths()) == ['net.example'], "DiskTrie::prune")
+		self.assertTrue(len(self.trie) == 1, "DiskTrie::__len__ after prune")
+		
+		self.trie.add('com.example')
+		self.assertTrue(self.trie.get('com.example') == 1, "DiskTrie::add after prune")
+	
+	def test_subpaths(self):
+		self.trie.add('gov.example.sub', atAllSubPaths = True)
+		self.trie.add('gov.other', atAllSubPaths = True)
+		
+		self.assertTrue(self.trie.get('gov') == 2, "DiskTrie::add atAllSubPaths")
+		self.assertTrue(self.trie.get('gov.example') == 1, "DiskTrie::add atAllSubPaths")
+	
+	def test_reopen(self):
+		self.trie.close()
+		self.trie = self.open()
+		
+		self.assertTrue(len(self.trie) == 6, "DiskTrie reopened length")
+		self.assertTrue(self.trie.get('com.example') == 2, "DiskTrie reopened get")
+	
+	def test_ioStats(self):
+		stats = self.trie.ioStats()
+		
+		self.assertTrue(stats['cached'] <= 4, "DiskTrie cacheSize")
+		self.assertTrue(stats['evictions'] > 0, "DiskTrie::ioStats evictions")
+		
+		self.trie.get('net.example')
+		hits = self.trie.ioStats()['hits']
+		self.trie.get('net.example')
+		self.assertTrue(self.trie.ioStats()['hits'] == hits + 2, "DiskTrie::ioStats hits")
+	
+	def test_pathValues(self):
+		t = DiskTrie(os.path.join(self.directory, 'multiset.db'), keyFunction = KEY_DOTTED, storeFunction = STORE_MULTISET)
+		t.add('com', 'a')
+		t.add('com', 'a')
+		t.add('com.example', 'b')
+		self.assertTrue(t.getAllPathValues('com.example') == ['a', 'a', 'b'], "DiskTrie::getAllPathValues members")
+		t.close()
+	
+	def test_array_store(self):
+		self.assertRaises(TypeError, DiskTrie, self.filename, storeFunction = store_array())
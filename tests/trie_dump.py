@@ -0,0 +1,123 @@
+import unittest
+import tempfile
+import shutil
+from StringIO import StringIO
+import sys
+sys.path.append("../")
+from Trieful import Trie, DurableTrie, NormalizedTrie, BoundedTrie, ExpiringTrie, HeavyHitterTrie, KEY_DOTTED, KEY_STRING, STORE_COUNT, key_normalized, store_array
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieDumpTests))
+	return suite
+	
+class TrieDumpTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED)
+		self.trie.add('com.example', 1)
+		self.trie.add('com.example', 'two')
+		self.trie.add('com.example.www', 3)
+		self.trie.add('org.example', {'a': [1, 2]})
+	
+	def roundTrip(self, t, format, **kwargs):
+		out = StringIO()
+		written = t.dump(out, format = format)
+		
+		(keyFunction, storeFunction) = t._functions()
+		nt = Trie(keyFunction = keyFunction, storeFunction = storeFunction)
+		loaded = nt.loadStream(StringIO(out.getvalue()), format = format, **kwargs)
+		self.assertTrue(written == loaded == len(t), "Trie::dump and loadStream counts")
+		return (out.getvalue(), nt)
+	
+	def test_jsonl(self):
+		(text, nt) = self.roundTrip(self.trie, 'jsonl')
+		self.assertTrue(text.splitlines()[0] == '["com.example",[1,"two"]]', "Trie::dump jsonl")
+		self.assertTrue(list(nt.items()) == list(self.trie.items()), "Trie::loadStream jsonl")
+	
+	def test_tsv(self):
+		(text, nt) = self.roundTrip(self.trie, 'tsv', batchSize = 1)
+		self.assertTrue(text.splitlines()[1] == 'com.example.www\t[3]', "Trie::dump tsv")
+		self.assertTrue(list(nt.items()) == list(self.trie.items()), "Trie::loadStream tsv")
+		
+		t = Trie(keyFunction = KEY_DOTTED)
+		t.add(u'caf\xe9.example', 4)
+		(text, nt) = self.roundTrip(t, 'tsv', encoding = None)
+		self.assertTrue(nt.get(u'caf\xe9.example') == 4 and list(nt.items()) == list(t.items()), "Trie::loadStream tsv unicode")
+		
+		self.trie.add('bad\tpath', 1)
+		self.assertRaises(ValueError, self.trie.dump, StringIO(), format = 'tsv')
+		self.assertRaises(ValueError, Trie().loadStream, ['no tab\n'], format = 'tsv')
+		self.assertRaises(ValueError, self.trie.dump, StringIO(), format = 'xml')
+	
+	def test_encoding(self):
+		self.trie.add('caf\xc3\xa9.x', 4)
+		for format in ('jsonl', 'tsv'):
+			(text, nt) = self.roundTrip(self.trie, format)
+			self.assertTrue(nt.get('caf\xc3\xa9.x') == 4 and nt.has('caf\xc3\xa9.x'), "Trie::loadStream %s str paths" % (format))
+			self.assertTrue(list(nt.items()) == list(self.trie.items()), "Trie::loadStream %s str paths items" % (format))
+			
+			# loading into the source Trie replaces its values
+			self.trie.loadStream(StringIO(text), format = format)
+			self.assertTrue(len(self.trie) == 4 and list(self.trie.paths())[0] == 'caf\xc3\xa9.x', "Trie::loadStream %s into the source" % (format))
+			
+			(text, nt) = self.roundTrip(self.trie, format, encoding = 'latin-1')
+			self.assertTrue(nt.get('caf\xe9.x') == 4, "Trie::loadStream %s encoding" % (format))
+	
+	def test_prefix(self):
+		out = StringIO()
+		self.assertTrue(self.trie.dump(out, prefix = 'com.example') == 2, "Trie::dump prefix")
+		self.assertTrue(self.trie.dump(StringIO(), prefix = 'gov') == 0, "Trie::dump missing prefix")
+		self.assertTrue(list(self.trie.dumpLines(prefix = 'org')) == ['["org.example",[{"a":[1,2]}]]\n'], "Trie::dumpLines")
+	
+	def test_stores(self):
+		for t in [Trie(storeFunction = STORE_COUNT), Trie(keyFunction = KEY_STRING, storeFunction = store_array())]:
+			t.addCounts(['abc', 'abd', 'abc', 'b', 'b', 'b'])
+			for format in ('jsonl', 'tsv'):
+				(text, nt) = self.roundTrip(t, format)
+				self.assertTrue(list(nt.items()) == list(t.items()), "Trie::loadStream %s" % (format))
+	
+	def test_merge(self):
+		t = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+		t.add('com.example')
+		t.add('net.example')
+		events = []
+		t.subscribe(events.append)
+		t.rank('net')
+		
+		t.loadStream(['["com.example",5]\n', '\n', '["com.example.www",2]\n'])
+		self.assertTrue(list(t.items()) == [('com.example', 5), ('com.example.www', 2), ('net.example', 1)], "Trie::loadStream into a Trie")
+		self.assertTrue(len(t) == 3 and t.rank('net.example') == 2 and len(events) == 2, "Trie::loadStream sizes and events")
+	
+	def test_subclasses(self):
+		t = NormalizedTrie(keyFunction = key_normalized('casefold', '.'))
+		t.add('Example.COM', 1)
+		(text, nt) = self.roundTrip(t, 'jsonl')
+		
+		nt = NormalizedTrie(keyFunction = key_normalized('casefold', '.'))
+		nt.loadStream(StringIO(text))
+		self.assertTrue(list(nt.paths()) == ['Example.COM'] and nt.get('example.com') == 1, "NormalizedTrie::loadStream")
+		
+		directory = tempfile.mkdtemp()
+		try:
+			dt = DurableTrie(directory, keyFunction = KEY_DOTTED)
+			dt.loadStream(self.trie.dumpLines())
+			dt.close()
+			dt = DurableTrie(directory, keyFunction = KEY_DOTTED)
+			self.assertTrue(list(dt.items()) == list(self.trie.items()), "DurableTrie::loadStream")
+			dt.close()
+		finally:
+			shutil.rmtree(directory)
+	
+	def test_bookkeeping(self):
+		lines = list(self.trie.dumpLines())
+		
+		t = BoundedTrie(keyFunction = KEY_DOTTED, maxSize = 2)
+		t.loadStream(lines)
+		self.assertTrue(list(t.paths()) == ['com.example.www', 'org.example'] and t.evictionStats()['evictions'] == 1, "BoundedTrie::loadStream evicts")
+		
+		t = ExpiringTrie(keyFunction = KEY_DOTTED, ttl = 10, clock = lambda: 100)
+		t.loadStream(lines)
+		self.assertTrue(t.expiresAt('com.example.www') == 110, "ExpiringTrie::loadStream sets the ttl")
+		
+		self.assertRaises(TypeError, HeavyHitterTrie(keyFunction = KEY_DOTTED).loadStream, lines)
@@ -0,0 +1,119 @@
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+sys.path.append("../")
+from Trieful import Trie, DurableTrie, KEY_DOTTED, STORE_COUNT, store_array
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(DurableTrieTests))
+	return suite
+	
+class DurableTrieTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.trie = self.open()
+		self.keys = ['com.example', 'com.example.sub', 'org.example', 'com.other', 'com.other.sub', 'net.example', 'com.example']
+		for key in self.keys:
+			self.trie.add(key)
+	
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+	
+	def open(self, **kwargs):
+		return DurableTrie(self.directory, keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT, **kwargs)
+	
+	def reopen(self, **kwargs):
+		self.trie.close()
+		self.trie = self.open(**kwargs)
+	
+	def test_recover_log(self):
+		self.trie.remove('com.example')
+		self.trie.removeAll('org.example')
+		self.trie.prune('com.other')
+		self.trie.addCounts(['net.example', 'net.other'])
+		
+		self.reopen()
+		
+		self.assertTrue(len(self.trie) == 4, "DurableTrie recovered length")
+		self.assertTrue(self.trie.get('com.example') == 1, "DurableTrie recovered remove")
+		self.assertTrue(not self.trie.has('org.example'), "DurableTrie recovered removeAll")
+		self.assertTrue(list(self.trie.paths(prefix = 'com.other')) == [], "DurableTrie recovered prune")
+		self.assertTrue(self.trie.get('net.example') == 2, "DurableTrie recovered addCounts")
+	
+	def test_recover_snapshot(self):
+		self.trie.snapshot()
+		self.trie.add('com.example')
+		
+		self.reopen()
+		
+		self.assertTrue(self.trie.get('com.example') == 3, "DurableTrie recovered snapshot and log")
+		self.assertTrue(len(self.trie) == 6, "DurableTrie recovered length")
+		self.assertTrue(sorted(os.listdir(self.directory)) == ['trie.log.1', 'trie.snapshot'], "DurableTrie replaced log")
+	
+	def test_periodic_snapshot(self):
+		self.reopen(snapshotEvery = 5)
+		
+		for i in xrange(12):
+			self.trie.add('net.%i' % (i))
+		
+		self.reopen()
+		
+		self.assertTrue(len(self.trie) == 18, "DurableTrie periodic snapshots")
+		self.assertTrue(self.trie._generation == 2, "DurableTrie periodic snapshots")
+	
+	def test_torn_write(self):
+		self.trie.close()
+		
+		log = open(os.path.join(self.directory, 'trie.log.0'), 'ab')
+		log.write('\x00\x00\x01\x00garbage')
+		log.close()
+		
+		self.trie = self.open()
+		self.assertTrue(self.trie.get('com.example') == 2, "DurableTrie ignores torn record")
+		
+		self.trie.add('com.example')
+		self.reopen()
+		self.assertTrue(self.trie.get('com.example') == 3, "DurableTrie appends after torn record")
+	
+	def test_sync_policies(self):
+		for sync in ('always', 'never'):
+			self.reopen(sync = sync)
+			self.trie.add('com.%s' % (sync))
+			
+			self.reopen()
+			self.assertTrue(self.trie.has('com.%s' % (sync)), "DurableTrie sync = %s" % (sync))
+		
+		self.assertRaises(ValueError, self.open, sync = 'sometimes')
+	
+	def test_array_store(self):
+		self.trie.close()
+		shutil.rmtree(self.directory)
+		
+		self.trie = DurableTrie(self.directory, storeFunction = store_array())
+		self.trie.addCounts(['a', 'a', 'b'])
+		self.trie.snapshot()
+		self.trie.add('b')
+		self.trie.close()
+		
+		self.trie = DurableTrie(self.directory, storeFunction = store_array())
+		self.assertTrue(self.trie.get('a') == 2 and self.trie.get('b') == 2, "DurableTrie with store_array")
+	
+	def test_transform(self):
+		self.trie.mapValues(lambda count: count * 10)
+		self.trie.filterValues(lambda count: count > 10)
+		
+		self.reopen()
+		self.assertTrue(list(self.trie.items()) == [('com.example', 20)], "DurableTrie recovered mapValues and filterValues")
+	
+	def test_applyDiff(self):
+		primary = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+		primary.add('com.example')
+		primary.add('gov.example')
+		self.trie.applyDiff(self.trie.diff(primary))
+		
+		self.reopen()
+		self.assertTrue(list(self.trie.items()) == [('com.example', 1), ('gov.example', 1)], "DurableTrie recovered applyDiff")
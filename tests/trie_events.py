@@ -0,0 +1,82 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_COUNT
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieEventsTests))
+	return suite
+	
+class TrieEventsTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED)
+		self.trie.add('com.example', 'a')
+		self.events = []
+		self.trie.subscribe(self.events.append)
+	
+	def test_add(self):
+		self.trie.add('com.example', 'b')
+		self.trie['org.example'] = 'c'
+		self.assertTrue(self.events == [
+			('add', 'com.example', 'a', ['a', 'b']),
+			('add', 'org.example', None, 'c')
+		], "Trie::subscribe add")
+	
+	def test_remove(self):
+		self.trie.add('com.example', 'b')
+		del self.events[:]
+		
+		self.trie.remove('com.example', 'a')
+		self.trie.remove('com.missing', 'a')
+		del self.trie['com.example']
+		self.assertTrue(self.events == [
+			('remove', 'com.example', ['a', 'b'], 'b'),
+			('removeAll', 'com.example', 'b', None)
+		], "Trie::subscribe remove")
+	
+	def test_pruneAndMerge(self):
+		self.trie.add('com.example.sub', 'b')
+		del self.events[:]
+		
+		self.trie.prune('com')
+		self.assertTrue(sorted(self.events) == [
+			('removeAll', 'com.example', 'a', None),
+			('removeAll', 'com.example.sub', 'b', None)
+		], "Trie::subscribe prune")
+		
+		del self.events[:]
+		self.trie += {'net.example': 'c'}
+		self.assertTrue(self.events == [('add', 'net.example', None, 'c')], "Trie::subscribe +=")
+	
+	def test_atAllSubPaths(self):
+		t = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+		events = []
+		t.subscribe(events.append)
+		t.add('com.example', atAllSubPaths = True)
+		t.addCounts(['com', 'com'])
+		self.assertTrue(events == [
+			('add', 'com', None, 1),
+			('add', 'com.example', None, 1),
+			('add', 'com', 1, 3)
+		], "Trie::subscribe atAllSubPaths")
+	
+	def test_batch(self):
+		batches = []
+		t = Trie(keyFunction = KEY_DOTTED)
+		t.subscribe(batches.append, batch = 2)
+		for key in ['a', 'b', 'c']:
+			t.add(key, 1)
+		
+		self.assertTrue(batches == [[('add', 'a', None, 1), ('add', 'b', None, 1)]], "Trie::subscribe batch")
+		t.flushEvents()
+		self.assertTrue(batches[1:] == [[('add', 'c', None, 1)]], "Trie::flushEvents")
+		t.flushEvents()
+		self.assertTrue(len(batches) == 2, "Trie::flushEvents empty")
+		
+		t.add('d', 1)
+		t.unsubscribe(batches.append)
+		t.add('e', 1)
+		self.assertTrue(batches[2:] == [[('add', 'd', None, 1)]], "Trie::unsubscribe delivers")
+		self.assertRaises(ValueError, t.unsubscribe, batches.append)
@@ -0,0 +1,87 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import ExpiringTrie, KEY_DOTTED, STORE_COUNT
+
+class Clock(object):
+	
+	def __init__(self):
+		self.now = 1000.0
+	
+	def __call__(self):
+		return self.now
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(ExpiringTrieTests))
+	return suite
+	
+class ExpiringTrieTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.clock = Clock()
+		self.trie = ExpiringTrie(keyFunction = KEY_DOTTED, ttl = 10, clock = self.clock)
+		self.trie.add('com.example', 'a')
+		self.trie.add('com.example.sub', 'b', ttl = 5)
+		self.trie.add('org.example', 'c', ttl = 20)
+	
+	def test_lazyExpiry(self):
+		self.assertTrue(self.trie.expiresAt('com.example.sub') == 1005.0, "ExpiringTrie::expiresAt")
+		
+		self.clock.now += 6
+		self.assertTrue(self.trie.get('com.example.sub') is None, "ExpiringTrie::get expired")
+		self.assertTrue('com.example.sub' not in self.trie, "ExpiringTrie::has expired")
+		self.assertTrue(self.trie.get('com.example') == 'a', "ExpiringTrie::get live")
+		self.assertTrue(len(self.trie) == 2, "ExpiringTrie lazy removal")
+	
+	def test_purgeExpired(self):
+		self.clock.now += 11
+		self.assertTrue(self.trie.purgeExpired() == 2, "ExpiringTrie::purgeExpired")
+		self.assertTrue(list(self.trie.paths()) == ['org.example'], "ExpiringTrie::purgeExpired paths")
+		self.assertTrue('com' not in self.trie._nodes, "ExpiringTrie::purgeExpired empty branches")
+		self.assertTrue(self.trie.purgeExpired() == 0, "ExpiringTrie::purgeExpired nothing due")
+		
+		self.clock.now += 10
+		self.assertTrue(self.trie.purgeExpired() == 1 and len(self.trie) == 0 and self.trie._nodes == {}, "ExpiringTrie::purgeExpired all")
+	
+	def test_restart(self):
+		self.clock.now += 8
+		self.trie.add('com.example', 'a')
+		self.clock.now += 8
+		self.assertTrue(self.trie.purgeExpired() == 1, "ExpiringTrie restarted ttl")
+		self.assertTrue(self.trie.get('com.example') == ['a', 'a'], "ExpiringTrie restarted entry kept")
+	
+	def test_permanent(self):
+		t = ExpiringTrie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT, clock = self.clock)
+		t.add('com.example', ttl = 5)
+		t.add('org.example')
+		t.addCounts(['net.example', 'net.example'])
+		self.clock.now += 100
+		self.assertTrue(t.purgeExpired() == 1, "ExpiringTrie permanent entries")
+		self.assertTrue(sorted(t.paths()) == ['net.example', 'org.example'], "ExpiringTrie permanent paths")
+		
+		t.add('org.example', ttl = 5)
+		t.add('org.example')
+		self.clock.now += 100
+		self.assertTrue(t.purgeExpired() == 0 and t.get('org.example') == 3, "ExpiringTrie made permanent")
+	
+	def test_removals(self):
+		self.trie.remove('com.example.sub', 'b')
+		self.trie.removeAll('com.example')
+		self.trie.prune('org')
+		self.assertTrue(len(self.trie) == 0 and self.trie._expiry == {}, "ExpiringTrie removals forget expiry")
+		
+		self.trie.applyDiff([('added', 'com.example', None, ['d'])])
+		self.clock.now += 30
+		self.assertTrue(self.trie.get('com.example') == 'd', "ExpiringTrie stale expiry")
+	
+	def test_transform(self):
+		self.trie.filterValues(lambda value: value != ['c'])
+		self.assertTrue(self.trie.expiresAt('org.example') is None, "ExpiringTrie::filterValues forgets expiry")
+	
+	def test_events(self):
+		events = []
+		self.trie.subscribe(events.append)
+		self.clock.now += 6
+		self.trie.purgeExpired()
+		self.assertTrue(events == [('expire', 'com.example.sub', 'b', None)], "ExpiringTrie expire events")
@@ -0,0 +1,86 @@
+import unittest
+import random
+import sys
+sys.path.append("../")
+from Trieful import HeavyHitterTrie, Trie, KEY_DOTTED, STORE_COUNT
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(HeavyHitterTrieTests))
+	return suite
+	
+class HeavyHitterTrieTests(unittest.TestCase):
+	
+	def setUp(self):
+		random.seed(7)
+		self.stream = []
+		for i in xrange(5000):
+			site = 'site%i' % (min(int(random.paretovariate(1.0)), 50))
+			page = 'page%i' % (min(int(random.paretovariate(1.0)), 200))
+			self.stream.append('%s.%s.%i' % (site, page, random.randint(0, 1000)))
+		
+		self.exact = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+		for path in self.stream:
+			self.exact.add(path, atAllSubPaths = True)
+		
+		self.trie = HeavyHitterTrie(keyFunction = KEY_DOTTED, capacity = 50)
+		for path in self.stream:
+			self.trie.add(path)
+	
+	def test_bounded(self):
+		self.assertTrue(len(self.trie) <= 150, "HeavyHitterTrie capacity")
+		self.assertTrue(self.trie.total() == 5000, "HeavyHitterTrie::total")
+		
+		depths = {}
+		for path in self.trie.paths(ordered = False):
+			depths[path.count('.')] = depths.get(path.count('.'), 0) + 1
+		self.assertTrue(max(depths.values()) <= 50, "HeavyHitterTrie capacity per depth")
+	
+	def test_bounds(self):
+		for (path, count) in self.trie.items(ordered = False):
+			(lower, upper) = self.trie.getBounds(path)
+			exact = self.exact.get(path)
+			self.assertTrue(upper == count and lower <= exact <= upper, "HeavyHitterTrie::getBounds")
+			self.assertTrue(upper - lower <= 5000 / 50, "HeavyHitterTrie error bound")
+		
+		(lower, upper) = self.trie.getBounds('missing.path')
+		self.assertTrue(lower == 0 and upper >= 0, "HeavyHitterTrie::getBounds missing")
+	
+	def test_topN(self):
+		top = self.trie.topN(1, 3)
+		exactTop = sorted([(path, self.exact.get(path)) for path in set(p.split('.')[0] for p in self.stream)], key = lambda item: -item[1])[:3]
+		self.assertTrue([path for (path, count) in top] == [path for (path, count) in exactTop], "HeavyHitterTrie::topN")
+		self.assertTrue(top[0][1] == exactTop[0][1], "HeavyHitterTrie::topN counts")
+		self.assertTrue(self.trie.topN(9, 3) == [], "HeavyHitterTrie::topN missing depth")
+		
+		# every prefix counted more than total / capacity times is kept
+		for (path, count) in self.exact.items(ordered = False):
+			if count > 5000 / 50:
+				self.assertTrue(path in self.trie, "HeavyHitterTrie heavy prefixes kept")
+	
+	def test_maxDepth(self):
+		t = HeavyHitterTrie(keyFunction = KEY_DOTTED, capacity = 10, maxDepth = 2)
+		t.addCounts(['a.b.c', 'a.b.c', 'a.d'])
+		self.assertTrue(sorted(t.items()) == [('a', 3), ('a.b', 2), ('a.d', 1)], "HeavyHitterTrie maxDepth")
+		self.assertRaises(TypeError, t.removeAll, 'a')
+		self.assertRaises(TypeError, t.filterValues, lambda value: value >= 2)
+		self.assertRaises(TypeError, t.mapValues, lambda value: value * 100)
+		self.assertRaises(TypeError, t.applyDiff, [('added', 'e', None, 5)])
+		self.assertTrue(len(t) == 3 and t.get('a') == 3 and t.getBounds('a') == (3, 3), "HeavyHitterTrie counts unchanged")
+	
+	def test_events(self):
+		t = HeavyHitterTrie(keyFunction = KEY_DOTTED, capacity = 2)
+		events = []
+		t.subscribe(events.append)
+		t.enableValueIndex()
+		
+		t.add('a.b')
+		t.add('a.b')
+		t.add('c')
+		self.assertTrue([e[:2] for e in events] == [('add', 'a'), ('add', 'a.b'), ('add', 'a'), ('add', 'a.b'), ('add', 'c')], "HeavyHitterTrie add events")
+		self.assertTrue(t.pathsFor(2) == ['a', 'a.b'] and t.pathsFor(1) == ['c'], "HeavyHitterTrie value index")
+		
+		del events[:]
+		t.add('d', 5)
+		self.assertTrue([e[:2] for e in events] == [('evict', 'c'), ('add', 'd')], "HeavyHitterTrie evict events")
+		self.assertTrue(t.pathsFor(1) == [] and t.pathsFor(6) == ['d'], "HeavyHitterTrie value index after evictions")
@@ -0,0 +1,63 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_OVERWRITE
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieIndexTests))
+	return suite
+	
+class TrieIndexTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED)
+		self.trie.add('com.example', 'a')
+		self.trie.add('com.example', 'b')
+		self.trie.add('org.example', 'a')
+		self.trie.enableValueIndex()
+	
+	def test_pathsFor(self):
+		self.assertTrue(self.trie.pathsFor('a') == ['com.example', 'org.example'], "Trie::pathsFor")
+		self.assertTrue(self.trie.pathsFor('b') == ['com.example'], "Trie::pathsFor")
+		self.assertTrue(self.trie.pathsFor('z') == [], "Trie::pathsFor missing")
+		
+		self.trie.add('net.example', 'b', atAllSubPaths = True)
+		self.assertTrue(self.trie.pathsFor('b') == ['com.example', 'net', 'net.example'], "Trie::pathsFor after add")
+		
+		self.trie.remove('com.example', 'b')
+		del self.trie['net']
+		self.assertTrue(self.trie.pathsFor('b') == ['net.example'], "Trie::pathsFor after remove")
+		
+		self.trie.prune('com')
+		self.assertTrue(self.trie.pathsFor('a') == ['org.example'], "Trie::pathsFor after prune")
+	
+	def test_duplicates(self):
+		self.trie.add('org.example', 'a')
+		self.trie.remove('org.example', 'a')
+		self.assertTrue(self.trie.pathsFor('a') == ['com.example', 'org.example'], "Trie::pathsFor duplicate values")
+	
+	def test_removeValueEverywhere(self):
+		self.trie.add('org.example', 'a')
+		self.assertTrue(self.trie.removeValueEverywhere('a') == 2, "Trie::removeValueEverywhere")
+		self.assertTrue(self.trie.pathsFor('a') == [], "Trie::removeValueEverywhere index")
+		self.assertTrue(self.trie.get('com.example') == 'b' and not self.trie.has('org.example'), "Trie::removeValueEverywhere values")
+		self.assertTrue(len(self.trie) == 1, "Trie::removeValueEverywhere size")
+		self.assertTrue(self.trie.removeValueEverywhere('a') == 0, "Trie::removeValueEverywhere missing")
+	
+	def test_overwrite(self):
+		t = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_OVERWRITE)
+		t.enableValueIndex()
+		t.add('com.example', 'a')
+		t.add('org.example', 'a')
+		t.add('com.example', 'b')
+		self.assertTrue(t.pathsFor('a') == ['org.example'] and t.pathsFor('b') == ['com.example'], "Trie::pathsFor overwrite")
+		
+		t.removeValueEverywhere('b')
+		self.assertTrue(not t.has('com.example') and len(t) == 1, "Trie::removeValueEverywhere overwrite")
+	
+	def test_disabled(self):
+		self.trie.disableValueIndex()
+		self.trie.add('net.example', 'a')
+		self.assertRaises(ValueError, self.trie.pathsFor, 'a')
+		self.assertRaises(ValueError, self.trie.removeValueEverywhere, 'a')
@@ -0,0 +1,48 @@
+import unittest
+import random
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_COUNT
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieManyTests))
+	return suite
+	
+class TrieManyTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED)
+		self.keys = ['com.example', 'com.example.sub', 'org.example', 'com.other', 'com.other.sub', 'net.example', 'com.example.sub2']
+		for key in self.keys:
+			self.trie.add(key, key)
+		
+		self.queries = ['com.example.sub', 'com', 'gov.example', 'com.example', 'com.example.sub.x', 'org.example', 'com.example.sub', 'com.other.sub', 'a']
+	
+	def test_hasMany(self):
+		self.assertTrue(self.trie.hasMany(self.queries) == [self.trie.has(q) for q in self.queries], "Trie::hasMany")
+		self.assertTrue(self.trie.hasMany([]) == [], "Trie::hasMany empty")
+	
+	def test_getMany(self):
+		self.assertTrue(self.trie.getMany(self.queries) == [self.trie.get(q) for q in self.queries], "Trie::getMany")
+		self.assertTrue(self.trie.getMany(['gov'], defaultValue = 0) == [0], "Trie::getMany default")
+	
+	def test_getAllPathValuesMany(self):
+		expected = [self.trie.getAllPathValues(q) for q in self.queries]
+		self.assertTrue(self.trie.getAllPathValuesMany(self.queries) == expected, "Trie::getAllPathValuesMany")
+	
+	def test_random(self):
+		rand = random.Random(11)
+		t = Trie(storeFunction = STORE_COUNT)
+		for i in xrange(300):
+			t.add(''.join(rand.choice('abc') for j in xrange(rand.randint(1, 6))))
+		
+		queries = [''.join(rand.choice('abcd') for j in xrange(rand.randint(0, 7))) for i in xrange(300)]
+		self.assertTrue(t.hasMany(queries) == [t.has(q) for q in queries], "Trie::hasMany random")
+		self.assertTrue(t.getMany(queries) == [t.get(q) for q in queries], "Trie::getMany random")
+	
+	def test_unhashable(self):
+		t = Trie()
+		t.add(['a', 'b'], 1)
+		
+		self.assertTrue(t.hasMany([['a', 'b'], ['a']]) == [True, False], "Trie::hasMany unhashable paths")
@@ -0,0 +1,58 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_COUNT
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TriePagingTests))
+	return suite
+	
+class TriePagingTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+		self.keys = ['com.example', 'com.example.sub', 'org.example', 'com.other', 'com.other.sub', 'net.example', 'com.example.sub2']
+		for key in self.keys:
+			self.trie.add(key, 1)
+	
+	def test_pages(self):
+		
+		pages = []
+		(page, cursor) = self.trie.iterFrom(limit = 3)
+		pages.append(page)
+		
+		while cursor is not None:
+			(page, cursor) = self.trie.iterFrom(limit = 3, cursor = cursor)
+			pages.append(page)
+		
+		self.assertTrue([len(page) for page in pages] == [3, 3, 1], "Trie::iterFrom page sizes")
+		self.assertTrue(sum(pages, []) == list(self.trie.paths()), "Trie::iterFrom order")
+	
+	def test_exact_pages(self):
+		
+		(page, cursor) = self.trie.iterFrom(limit = 7)
+		self.assertTrue(len(page) == 7 and cursor is None, "Trie::iterFrom last page")
+	
+	def test_afterPath(self):
+		
+		(page, cursor) = self.trie.iterFrom('com.other', limit = 2)
+		self.assertTrue(page == ['com.other.sub', 'net.example'], "Trie::iterFrom(afterPath)")
+		
+		(page, cursor) = self.trie.iterFrom('com.p', limit = 2)
+		self.assertTrue(page == ['net.example', 'org.example'], "Trie::iterFrom(afterPath) missing path")
+	
+	def test_changes_between_pages(self):
+		
+		(page, cursor) = self.trie.iterFrom(limit = 2)
+		
+		self.trie.removeAll('com.example.sub2')
+		self.trie.add('com.example.sub1')
+		self.trie.add('com.aardvark')
+		
+		(page, cursor) = self.trie.iterFrom(limit = 2, cursor = cursor)
+		self.assertTrue(page == ['com.example.sub1', 'com.other'], "Trie::iterFrom after changes")
+	
+	def test_bad_cursor(self):
+		
+		self.assertRaises(ValueError, self.trie.iterFrom, cursor = 'not a cursor')
@@ -26,4 +26,49 @@ class TriePathsTest(unittest.TestCase):
 		examplePaths = list(self.trie.paths(prefix = 'com.example'))
 		
 		self.assertTrue(len(comPaths) == 5, "Trie::paths(prefix)")
-		self.assertTrue(len(examplePaths) == 3, "Trie::paths(prefix)")
\ No newline at end of file
+		self.assertTrue(len(examplePaths) == 3, "Trie::paths(prefix)")
+	
+	def test_ordered(self):
+		
+		paths = list(self.trie.paths())
+		self.assertTrue(paths == sorted(self.keys, key = lambda k: k.split('.')), "Trie::paths ordered")
+		
+		# the cached child order follows adds and removes
+		self.trie.add('com.aardvark')
+		self.trie.add('com.example.sub0')
+		self.trie.removeAll('com.other.sub')
+		self.trie.removeAll('net.example')
+		
+		keys = set(self.keys) | set(['com.aardvark', 'com.example.sub0'])
+		keys -= set(['com.other.sub', 'net.example'])
+		
+		paths = list(self.trie.paths())
+		self.assertTrue(paths == sorted(keys, key = lambda k: k.split('.')), "Trie::paths ordered after changes")
+	
+	def test_unordered(self):
+		
+		paths = list(self.trie.paths(ordered = False))
+		self.assertTrue(sorted(paths) == sorted(self.keys), "Trie::paths(ordered = False)")
+		
+		paths = list(self.trie.paths(prefix = 'com.example', ordered = False))
+		self.assertTrue(sorted(paths) == ['com.example', 'com.example.sub', 'com.example.sub2'], "Trie::paths(prefix, ordered = False)")
+	
+	def test_missing_prefix(self):
+		
+		self.assertTrue(list(self.trie.paths(prefix = 'gov')) == [], "Trie::paths(prefix) missing")
+	
+	def test_ordered_wide(self):
+		
+		# wide nodes use the cached child order
+		keys = ['wide.%03i' % (i) for i in xrange(0, 200, 3)]
+		for key in keys:
+			self.trie.add(key)
+		paths = list(self.trie.paths(prefix = 'wide'))
+		self.assertTrue(paths == keys, "Trie::paths ordered wide")
+		
+		self.trie.add('wide.100')
+		self.trie.removeAll('wide.000')
+		keys = sorted(keys[1:] + ['wide.100'])
+		
+		paths = list(self.trie.paths(prefix = 'wide'))
+		self.assertTrue(paths == keys, "Trie::paths ordered wide after changes")
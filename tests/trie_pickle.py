@@ -0,0 +1,87 @@
+import unittest
+import cPickle as pickle
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, KEY_STRING, STORE_COUNT, STORE_DEFAULT, key_ip, store_array, registerKeyFunction, registeredFunctions
+
+KEY_REVERSED = registerKeyFunction('test-reversed', {
+	'pathToKey': lambda x: x[::-1],
+	'keyToPath': lambda x: ''.join(x)[::-1]
+})
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TriePickleTests))
+	return suite
+	
+class TriePickleTests(unittest.TestCase):
+	
+	def roundTrip(self, t):
+		return pickle.loads(pickle.dumps(t, pickle.HIGHEST_PROTOCOL))
+	
+	def test_roundTrip(self):
+		t = Trie(keyFunction = KEY_DOTTED, defaultValue = 'missing')
+		for key in ['com', 'com.example', 'com.example.sub', 'org.example', 'net']:
+			t.add(key, key.upper())
+		
+		nt = self.roundTrip(t)
+		self.assertTrue(nt._nodes == t._nodes, "Trie::__reduce__ nodes")
+		self.assertTrue(len(nt) == len(t), "Trie::__reduce__ size")
+		nt.add('gov')
+		self.assertTrue(nt.get('gov') == 'missing', "Trie::__reduce__ defaultValue")
+		self.assertTrue(nt._keyFunction is KEY_DOTTED, "Trie::__reduce__ keyFunction")
+		self.assertTrue(nt._storeFunction is STORE_DEFAULT, "Trie::__reduce__ storeFunction")
+		
+		self.assertTrue(len(nt) == len(t) + 1, "Trie::__reduce__ usable")
+	
+	def test_empty(self):
+		nt = self.roundTrip(Trie())
+		self.assertTrue(nt._nodes == {} and len(nt) == 0, "Trie::__reduce__ empty")
+	
+	def test_registered(self):
+		t = Trie(keyFunction = KEY_REVERSED, storeFunction = STORE_COUNT)
+		t.add('abc')
+		t.add('abc')
+		t.add('xbc')
+		
+		nt = self.roundTrip(t)
+		self.assertTrue(nt.get('abc') == 2 and nt.get('xbc') == 1, "Trie::__reduce__ registered keyFunction")
+		self.assertTrue(registeredFunctions('key', 'test-reversed') is KEY_REVERSED, "registeredFunctions")
+		self.assertRaises(KeyError, registeredFunctions, 'key', 'test-missing')
+		
+		# unpickled Tries can still be merged with the originals
+		t += nt
+		self.assertTrue(t.get('abc') == 3, "Trie::__reduce__ compatible")
+	
+	def test_unregistered(self):
+		t = Trie(keyFunction = {'pathToKey': lambda x: x, 'keyToPath': lambda x: x})
+		t.add('abc', 1)
+		self.assertRaises(Exception, pickle.dumps, t, pickle.HIGHEST_PROTOCOL)
+	
+	def test_keyIP(self):
+		self.assertTrue(key_ip(4, 8) is key_ip(4, 8), "key_ip registered")
+		
+		t = Trie(keyFunction = key_ip(4, 4))
+		t.add('10.0.0.0/8', 'ten')
+		nt = self.roundTrip(t)
+		self.assertTrue(nt.longestPrefix('10.1.2.3') == t.longestPrefix('10.1.2.3'), "Trie::__reduce__ key_ip")
+	
+	def test_storeArray(self):
+		t = Trie(storeFunction = store_array())
+		for key in ['a', 'ab', 'abc', 'b']:
+			t.add(key)
+		t.add('ab')
+		t.remove('b')
+		
+		nt = self.roundTrip(t)
+		self.assertTrue([(k, nt.get(k)) for k in ['a', 'ab', 'abc', 'b']] == [('a', 1), ('ab', 2), ('abc', 1), ('b', None)], "Trie::__reduce__ store_array")
+		self.assertTrue(nt._storeFunction['values'] is not t._storeFunction['values'], "Trie::__reduce__ store_array copied")
+		
+		nt.add('c')
+		nt.add('abc')
+		self.assertTrue(nt.get('c') == 1 and nt.get('abc') == 2 and t.get('abc') == 1, "Trie::__reduce__ store_array usable")
+	
+	def test_deep(self):
+		t = Trie(keyFunction = KEY_STRING)
+		t.add('x' * 20000, 1)
+		self.assertTrue(self.roundTrip(t).get('x' * 20000) == 1, "Trie::__reduce__ deep paths")
@@ -0,0 +1,62 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_COUNT
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieProfileTests))
+	return suite
+	
+class TrieProfileTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+		self.keys = ['com.example', 'com.example.sub', 'org.example']
+		for key in self.keys:
+			self.trie.add(key, 1)
+	
+	def test_counts(self):
+		profiler = self.trie.enableProfiling()
+		
+		self.trie.add('net.example')
+		self.trie.get('com.example')
+		self.trie.has('com.example')
+		self.trie.remove('org.example')
+		paths = list(self.trie.paths())
+		
+		snap = profiler.snapshot()
+		
+		for op in ('add', 'get', 'has', 'remove', 'paths', 'store.add', 'store.get', 'store.remove', 'key.pathToKey', 'key.keyToPath'):
+			self.assertTrue(op in snap, "TrieProfiler::snapshot %s" % (op))
+		
+		self.assertTrue(snap['add']['calls'] == 1, "TrieProfiler::snapshot calls")
+		self.assertTrue(snap['paths']['calls'] == 1, "TrieProfiler::snapshot generator calls")
+		self.assertTrue(snap['key.keyToPath']['calls'] == len(paths), "TrieProfiler::snapshot key calls")
+		self.assertTrue(sum(snap['get']['histogram'].values()) == 1, "TrieProfiler::snapshot histogram")
+		
+	def test_sink(self):
+		calls = []
+		self.trie.enableProfiling(sink = lambda op, elapsed: calls.append(op))
+		
+		self.trie.get('com.example')
+		
+		self.assertTrue(calls == ['key.pathToKey', 'store.get', 'get'], "TrieProfiler sink")
+	
+	def test_disable(self):
+		profiler = self.trie.enableProfiling()
+		self.assertTrue(self.trie.disableProfiling() is profiler, "Trie::disableProfiling")
+		
+		self.trie.get('com.example')
+		
+		self.assertTrue(profiler.snapshot() == {}, "Trie::disableProfiling stops recording")
+		self.assertTrue('get' not in self.trie.__dict__, "Trie::disableProfiling restores methods")
+		self.assertTrue(self.trie.disableProfiling() is None, "Trie::disableProfiling when disabled")
+	
+	def test_merge(self):
+		self.trie.enableProfiling()
+		
+		self.trie += Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT) + {'net.example': 1}
+		
+		self.assertTrue(self.trie.has('net.example'), "Trie::__iadd__ while profiling")
+		self.assertRaises(TypeError, self.trie.__iadd__, Trie())
@@ -0,0 +1,85 @@
+import unittest
+import random
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_COUNT
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieRangeTests))
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieRangeRandomTests))
+	return suite
+	
+class TrieRangeTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+		self.keys = ['com.example', 'com.example.sub', 'org.example', 'com.other', 'com.other.sub', 'net.example', 'com.example.sub2']
+		for key in self.keys:
+			self.trie.add(key, 1)
+		
+	def test_range(self):
+		
+		self.assertTrue(list(self.trie.range('com.example.sub', 'net')) == ['com.example.sub', 'com.example.sub2', 'com.other', 'com.other.sub'], "Trie::range")
+		self.assertTrue(list(self.trie.range('com.f', 'com.z')) == ['com.other', 'com.other.sub'], "Trie::range")
+		self.assertTrue(list(self.trie.range(hi = 'com.example.sub')) == ['com.example'], "Trie::range(hi)")
+		self.assertTrue(list(self.trie.range(lo = 'net')) == ['net.example', 'org.example'], "Trie::range(lo)")
+		self.assertTrue(list(self.trie.range('com.other', 'com.other')) == [], "Trie::range empty")
+		self.assertTrue(list(self.trie.range('net', reverse = True)) == ['org.example', 'net.example'], "Trie::range(reverse)")
+		
+	def test_neighbours(self):
+		
+		self.assertTrue(self.trie.successor('com.example') == 'com.example.sub', "Trie::successor")
+		self.assertTrue(self.trie.successor('com.example.sub3') == 'com.other', "Trie::successor")
+		self.assertTrue(self.trie.successor('org.example') is None, "Trie::successor last")
+		self.assertTrue(self.trie.predecessor('com.other') == 'com.example.sub2', "Trie::predecessor")
+		self.assertTrue(self.trie.predecessor('com.example') is None, "Trie::predecessor first")
+		self.assertTrue(self.trie.ceiling('com.other') == 'com.other', "Trie::ceiling")
+		self.assertTrue(self.trie.ceiling('com.otherz') == 'net.example', "Trie::ceiling")
+		self.assertTrue(self.trie.floor('com.other') == 'com.other', "Trie::floor")
+		self.assertTrue(self.trie.floor('com.other.a') == 'com.other', "Trie::floor")
+		self.assertTrue(self.trie.floor('com') is None, "Trie::floor before first")
+	
+	def test_rank(self):
+		
+		paths = list(self.trie.paths())
+		for (i, path) in enumerate(paths):
+			self.assertTrue(self.trie.rank(path) == i, "Trie::rank")
+			self.assertTrue(self.trie.nth(i) == path, "Trie::nth")
+		
+		self.assertTrue(self.trie.nth(-1) == 'org.example', "Trie::nth negative")
+		self.assertRaises(IndexError, self.trie.nth, len(paths))
+
+class TrieRangeRandomTests(unittest.TestCase):
+	
+	def setUp(self):
+		rand = random.Random(7)
+		self.trie = Trie()
+		self.keys = set()
+		for i in xrange(300):
+			key = ''.join(rand.choice('abc') for c in xrange(rand.randint(1, 5)))
+			self.keys.add(key)
+			self.trie.add(key)
+		self.keys = sorted(self.keys)
+		self.bounds = [''.join(rand.choice('abcd') for c in xrange(rand.randint(1, 5))) for i in xrange(50)]
+	
+	def test_range(self):
+		for lo in self.bounds:
+			for hi in self.bounds[:10]:
+				expected = [k for k in self.keys if lo <= k < hi]
+				found = [''.join(p) for p in self.trie.range(lo, hi)]
+				self.assertTrue(found == expected, "Trie::range(%s, %s)" % (lo, hi))
+				
+				found = [''.join(p) for p in self.trie.range(lo, hi, reverse = True)]
+				self.assertTrue(found == expected[::-1], "Trie::range(%s, %s, reverse)" % (lo, hi))
+	
+	def test_neighbours(self):
+		for bound in self.bounds:
+			after = [k for k in self.keys if k > bound]
+			before = [k for k in self.keys if k < bound]
+			
+			successor = self.trie.successor(bound)
+			predecessor = self.trie.predecessor(bound)
+			
+			self.assertTrue((successor and ''.join(successor)) == (after[0] if after else None), "Trie::successor(%s)" % (bound))
+			self.assertTrue((predecessor and ''.join(predecessor)) == (before[-1] if before else None), "Trie::predecessor(%s)" % (bound))
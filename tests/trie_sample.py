@@ -0,0 +1,47 @@
+import unittest
+import random
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_COUNT
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieSampleTests))
+	return suite
+	
+class TrieSampleTests(unittest.TestCase):
+	
+	def setUp(self):
+		random.seed(11)
+		self.trie = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+		for (key, count) in [('com', 1), ('com.example', 1), ('com.example.sub', 6), ('org.example', 2)]:
+			for i in xrange(count):
+				self.trie.add(key)
+	
+	def test_uniform(self):
+		samples = self.trie.sample(4000)
+		self.assertTrue(len(samples) == 4000 and set(samples) == set(self.trie.paths()), "Trie::sample")
+		for path in self.trie.paths():
+			self.assertTrue(800 < samples.count(path) < 1200, "Trie::sample uniform")
+	
+	def test_weighted(self):
+		samples = self.trie.sample(5000, weighted = True)
+		self.assertTrue(2700 < samples.count('com.example.sub') < 3300, "Trie::sample weighted")
+		self.assertTrue(300 < samples.count('com') < 700, "Trie::sample weighted")
+	
+	def test_prefix(self):
+		self.assertTrue(set(self.trie.sample(100, prefix = 'com.example')) == set(['com.example', 'com.example.sub']), "Trie::sample prefix")
+		self.assertTrue(self.trie.sample(10, prefix = 'gov') == [], "Trie::sample missing prefix")
+		self.assertTrue(Trie().sample(10) == [], "Trie::sample empty")
+	
+	def test_changes(self):
+		self.trie.sample(1)
+		self.trie.prune('com')
+		self.trie.add('net.example')
+		self.assertTrue(set(self.trie.sample(200)) == set(['org.example', 'net.example']), "Trie::sample after changes")
+		self.assertTrue(self.trie.nth(1) == 'org.example' and self.trie.rank('org.example') == 1, "Trie::nth after changes")
+	
+	def test_weightedNeedsNumbers(self):
+		t = Trie()
+		t.add('a', 'x')
+		self.assertRaises(TypeError, t.sample, 1, weighted = True)
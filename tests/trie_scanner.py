@@ -0,0 +1,88 @@
+import unittest
+import random
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_OVERWRITE
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieScannerTests))
+	return suite
+	
+class TrieScannerTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(storeFunction = STORE_OVERWRITE)
+		self.words = ['he', 'she', 'his', 'hers', 'h', 'ers']
+		for word in self.words:
+			self.trie.add(word, word)
+	
+	def expected(self, text, words):
+		matches = []
+		for end in xrange(1, len(text) + 1):
+			for start in xrange(end):
+				if text[start:end] in words:
+					matches.append((start, end, list(text[start:end]), text[start:end]))
+		return matches
+	
+	def test_scan(self):
+		text = 'ushershishe'
+		self.assertTrue(list(self.trie.scanner().scan(text)) == self.expected(text, self.words), "TrieScanner::scan")
+		self.assertTrue(list(self.trie.scanner().scan('xyz')) == [], "TrieScanner::scan no matches")
+	
+	def test_rootValue(self):
+		self.trie.add('', 'root')
+		self.assertTrue(list(self.trie.scanner().scan('ahe')) == self.expected('ahe', self.words), "TrieScanner ignores a value on the root")
+	
+	def test_random(self):
+		rand = random.Random(5)
+		words = set(''.join(rand.choice('ab') for i in xrange(rand.randint(1, 4))) for j in xrange(10))
+		
+		t = Trie(storeFunction = STORE_OVERWRITE)
+		for word in words:
+			t.add(word, word)
+		scanner = t.scanner()
+		
+		for i in xrange(20):
+			text = ''.join(rand.choice('abc') for j in xrange(30))
+			self.assertTrue(list(scanner.scan(text)) == self.expected(text, words), "TrieScanner::scan random")
+	
+	def test_rebuild(self):
+		scanner = self.trie.scanner()
+		list(scanner.scan('ushers'))
+		
+		self.trie.add('us', 'us')
+		self.trie.removeAll('he')
+		words = [w for w in self.words if w != 'he'] + ['us']
+		
+		self.assertTrue(list(scanner.scan('ushers')) == self.expected('ushers', words), "TrieScanner rebuild after changes")
+	
+	def test_feed(self):
+		text = 'ushershishe'
+		scanner = self.trie.scanner()
+		
+		matches = []
+		for chunk in ['us', 'h', 'ershi', 'she']:
+			matches += scanner.feed(chunk)
+		
+		self.assertTrue(matches == self.expected(text, self.words), "TrieScanner::feed")
+		
+		scanner.reset()
+		self.assertTrue(scanner.feed('ers') == self.expected('ers', self.words), "TrieScanner::reset")
+	
+	def test_feed_rebuild(self):
+		scanner = self.trie.scanner()
+		matches = scanner.feed('ushe')
+		
+		self.trie.add('x', 'x')
+		matches += scanner.feed('rsx')
+		
+		self.assertTrue(matches == self.expected('ushersx', self.words + ['x']), "TrieScanner::feed across a rebuild")
+	
+	def test_dotted(self):
+		t = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_OVERWRITE)
+		t.add('error.disk', 1)
+		t.add('disk.full', 2)
+		
+		matches = list(t.scanner().scan('kernel.error.disk.full.error'))
+		self.assertTrue(matches == [(1, 3, 'error.disk', 1), (2, 4, 'disk.full', 2)], "TrieScanner with KEY_DOTTED")
@@ -0,0 +1,44 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_COUNT
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieStatsTests))
+	return suite
+	
+class TrieStatsTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+		self.keys = ['com.example', 'com.example.sub', 'org.example.a.b', 'com.other']
+		for key in self.keys:
+			self.trie.add(key, 1)
+	
+	def test_stats(self):
+		stats = self.trie.stats()
+		
+		self.assertTrue(stats['nodes'] == 8, "Trie::stats nodes")
+		self.assertTrue(stats['values'] == 4, "Trie::stats values")
+		self.assertTrue(stats['leaves'] == 3, "Trie::stats leaves")
+		self.assertTrue(stats['maxDepth'] == 4, "Trie::stats maxDepth")
+		self.assertTrue(stats['depths'] == {1: 2, 2: 3, 3: 2, 4: 1}, "Trie::stats depths")
+		self.assertTrue(stats['fanout'] == {0: 3, 1: 4, 2: 1}, "Trie::stats fanout")
+		self.assertTrue(stats['singleChildRatio'] == 3 / 8.0, "Trie::stats singleChildRatio")
+		self.assertTrue(stats['bytes'] > 0, "Trie::stats bytes")
+	
+	def test_empty(self):
+		stats = Trie().stats()
+		
+		self.assertTrue(stats['nodes'] == 0, "Trie::stats empty")
+		self.assertTrue(stats['singleChildRatio'] == 0.0, "Trie::stats empty")
+	
+	def test_repr(self):
+		self.assertTrue(repr(self.trie) == "<Trie size=4 ['com.example', 'com.example.sub', 'com.other', 'org.example.a.b']>", "Trie::__repr__")
+		
+		for i in xrange(20):
+			self.trie.add('net.%i' % (i))
+		
+		self.assertTrue(repr(self.trie).endswith(", ...]>"), "Trie::__repr__ bounded")
+		self.assertTrue(repr(self.trie).count("'") == 20, "Trie::__repr__ bounded")
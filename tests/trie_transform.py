@@ -0,0 +1,56 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_ADD, store_array
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieTransformTests))
+	return suite
+	
+class TrieTransformTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_ADD)
+		for (key, value) in [('com', 1), ('com.example', 2), ('com.example.sub', 3), ('com.other', 4), ('org.example', 5)]:
+			self.trie.add(key, value)
+	
+	def test_mapValues(self):
+		self.trie.mapValues(lambda value: value * 10)
+		self.assertTrue(list(self.trie.items()) == [('com', 10), ('com.example', 20), ('com.example.sub', 30), ('com.other', 40), ('org.example', 50)], "Trie::mapValues")
+		
+		self.trie.mapValues(lambda value: value + 1, prefix = 'com.example')
+		self.assertTrue([self.trie.get(k) for k in ['com', 'com.example', 'com.example.sub']] == [10, 21, 31], "Trie::mapValues prefix")
+	
+	def test_mapValuesRemoves(self):
+		self.trie.mapValues(lambda value: None if value % 2 else value)
+		self.assertTrue(list(self.trie.paths()) == ['com.example', 'com.other'], "Trie::mapValues None removes")
+		self.assertTrue(len(self.trie) == 2 and 'org' not in self.trie._nodes, "Trie::mapValues cleans branches")
+	
+	def test_filterValues(self):
+		self.assertTrue(self.trie.filterValues(lambda value: value >= 3) == 2, "Trie::filterValues count")
+		self.assertTrue(list(self.trie.paths()) == ['com.example.sub', 'com.other', 'org.example'], "Trie::filterValues")
+		self.assertTrue(len(self.trie) == 3, "Trie::filterValues size")
+		self.assertTrue(self.trie._nodes['com']['example'] == {'sub': {'__': 3}}, "Trie::filterValues keeps needed branches")
+	
+	def test_filterPrefix(self):
+		self.assertTrue(self.trie.filterValues(lambda value: False, prefix = 'com.example') == 2, "Trie::filterValues prefix")
+		self.assertTrue(list(self.trie.paths()) == ['com', 'com.other', 'org.example'], "Trie::filterValues prefix paths")
+		
+		self.trie.filterValues(lambda value: False, prefix = 'org.example')
+		self.assertTrue('org' not in self.trie._nodes, "Trie::filterValues prefix cleans branches above")
+		self.assertTrue(self.trie.filterValues(lambda value: False, prefix = 'gov') == 0, "Trie::filterValues missing prefix")
+	
+	def test_arrayStore(self):
+		t = Trie(storeFunction = store_array())
+		t.addCounts(['a', 'ab', 'ab', 'b', 'b', 'b'])
+		t.mapValues(lambda count: count * 2)
+		t.filterValues(lambda count: count > 2)
+		self.assertTrue([t.get(k) for k in ['a', 'ab', 'b']] == [None, 4, 6] and len(t) == 2, "Trie::mapValues store_array")
+	
+	def test_events(self):
+		events = []
+		self.trie.subscribe(events.append)
+		self.trie.filterValues(lambda value: value != 4)
+		self.trie.mapValues(lambda value: value, prefix = 'org')
+		self.assertTrue(events == [('filter', 'com.other', 4, None), ('map', 'org.example', 5, 5)], "Trie::filterValues events")
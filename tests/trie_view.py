@@ -0,0 +1,85 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import Trie, BoundedTrie, KEY_DOTTED, STORE_COUNT
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieViewTests))
+	return suite
+	
+class TrieViewTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_COUNT)
+		for path in ['com', 'com.example', 'com.example.www', 'com.example.mail', 'com.other', 'org.example']:
+			self.trie.add(path)
+	
+	def test_read(self):
+		com = self.trie.view('com')
+		self.assertTrue(com.get('example.www') == 1 and com['other'] == 1, "TrieView::get")
+		self.assertTrue(com.get('missing', 0) == 0 and com.get('') == None, "TrieView::get missing")
+		self.assertTrue(com.has('example') and 'example.mail' in com and not com.has('org'), "TrieView::has")
+		self.assertTrue(list(com.paths()) == ['example', 'example.mail', 'example.www', 'other'], "TrieView::paths")
+		self.assertTrue(list(com.paths(prefix = 'example')) == ['example', 'example.mail', 'example.www'], "TrieView::paths prefix")
+		self.assertTrue(len(com) == 4 and len(self.trie.view('gov')) == 0, "TrieView::len")
+		self.assertTrue(list(self.trie.view('com').view('example').items()) == [('mail', 1), ('www', 1)], "TrieView::view")
+	
+	def test_live(self):
+		com = self.trie.view('com')
+		self.assertTrue(len(com) == 4, "TrieView::len")
+		
+		self.trie.add('com.example.ftp')
+		self.trie.prune('com.other')
+		self.assertTrue(len(com) == 4 and com.has('example.ftp') and not com.has('other'), "TrieView sees Trie changes")
+		
+		com.add('net')
+		com['example.www'] = 1
+		com.remove('example.mail')
+		del com['example']
+		self.assertTrue(self.trie.get('com.net') == 1 and self.trie.get('com.example.www') == 2, "TrieView::add")
+		self.assertTrue(not self.trie.has('com.example.mail') and not self.trie.has('com.example'), "TrieView::remove")
+		self.assertTrue(len(self.trie) == 5 and len(com) == 3, "TrieView changes sizes")
+		
+		gov = self.trie.view('gov')
+		gov.add('example')
+		self.assertTrue(self.trie.get('gov.example') == 1 and len(gov) == 1, "TrieView of a missing prefix")
+	
+	def test_extract(self):
+		events = []
+		self.trie.subscribe(events.append)
+		
+		com = self.trie.extract('com')
+		self.assertTrue(list(com.items()) == [('example', 1), ('example.mail', 1), ('example.www', 1), ('other', 1)], "Trie::extract")
+		self.assertTrue(len(com) == 4 and len(self.trie) == 2, "Trie::extract sizes")
+		self.assertTrue(list(self.trie.paths()) == ['com', 'org.example'], "Trie::extract leaves the prefix value")
+		self.assertTrue(len(events) == 4 and set(e[0] for e in events) == set(['extract']), "Trie::extract events")
+		
+		org = self.trie.extract('org')
+		self.assertTrue(list(org.paths()) == ['example'] and self.trie._nodes.keys() == ['com'], "Trie::extract prunes the branch")
+		self.assertTrue(len(self.trie.extract('gov')) == 0, "Trie::extract missing prefix")
+	
+	def test_extractCached(self):
+		self.trie.rank('org')
+		www = self.trie.view('com.example').extract('www')
+		self.assertTrue(len(www) == 0 and len(self.trie) == 6, "Trie::extract leaf")
+		
+		example = self.trie.extract('com.example')
+		self.assertTrue(len(example) == 2 and len(self.trie) == 4 and self.trie.nth(1) == 'com.example', "Trie::extract with cached sizes")
+		
+		for i in xrange(40):
+			self.trie.add('net.example.%i' % (i))
+		list(self.trie.paths())
+		self.trie._subtreeHash(self.trie._nodes)
+		net = self.trie.extract('net')
+		moved = set(id(node) for node in net._subNodes(net._nodes))
+		cached = set(self.trie._subtreeSizes) | set(self.trie._hashes) | set(self.trie._childOrder)
+		self.assertTrue(len(net) == 40 and not moved & cached, "Trie::extract drops cache entries of moved nodes")
+		
+		t = BoundedTrie(keyFunction = KEY_DOTTED, maxSize = 2)
+		t.add('a.b', 1)
+		t.add('a.c', 2)
+		t.extract('a')
+		t.add('d', 3)
+		t.add('e', 4)
+		self.assertTrue(list(t.paths()) == ['d', 'e'], "BoundedTrie::extract")
@@ -0,0 +1,62 @@
+import unittest
+import sys
+sys.path.append("../")
+from Trieful import Trie, KEY_DOTTED, STORE_ADD, WALK_SKIP, WALK_STOP
+
+def suite():
+	suite = unittest.TestSuite()
+	suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TrieWalkTests))
+	return suite
+	
+class TrieWalkTests(unittest.TestCase):
+	
+	def setUp(self):
+		self.trie = Trie(keyFunction = KEY_DOTTED, storeFunction = STORE_ADD)
+		for (key, value) in [('com', 1), ('com.example', 2), ('com.example.sub', 3), ('com.other', 4), ('org.example', 5)]:
+			self.trie.add(key, value)
+	
+	def test_preorder(self):
+		seen = []
+		self.trie.walk(lambda key, value: seen.append(('.'.join(key), value)))
+		self.assertTrue(seen == [('', None), ('com', 1), ('com.example', 2), ('com.example.sub', 3), ('com.other', 4), ('org', None), ('org.example', 5)], "Trie::walk")
+		
+		seen = []
+		self.trie.walk(lambda key, value: seen.append('.'.join(key)), ordered = False)
+		self.assertTrue(sorted(seen) == ['', 'com', 'com.example', 'com.example.sub', 'com.other', 'org', 'org.example'], "Trie::walk unordered")
+	
+	def test_prefix(self):
+		seen = []
+		self.trie.walk(lambda key, value: seen.append('.'.join(key)), prefix = 'com.example')
+		self.assertTrue(seen == ['com.example', 'com.example.sub'], "Trie::walk prefix")
+		self.assertTrue(self.trie.walk(lambda key, value: None, prefix = 'gov') is None, "Trie::walk missing prefix")
+	
+	def test_skipAndStop(self):
+		seen = []
+		def visitor(key, value):
+			seen.append('.'.join(key))
+			if key == ['com', 'example']:
+				return WALK_SKIP
+			if key == ['org']:
+				return WALK_STOP
+		
+		self.assertTrue(self.trie.walk(visitor, leave = lambda key, value, results: 1) is None, "Trie::walk stopped")
+		self.assertTrue(seen == ['', 'com', 'com.example', 'com.other', 'org'], "Trie::walk skip and stop")
+	
+	def test_sharedKey(self):
+		keys = []
+		self.trie.walk(lambda key, value: keys.append(key))
+		self.assertTrue(all(key is keys[0] for key in keys), "Trie::walk shared key")
+	
+	def test_leave(self):
+		sums = {}
+		def leave(key, value, results):
+			total = (value or 0) + sum(results)
+			sums['.'.join(key)] = total
+			return total
+		
+		self.assertTrue(self.trie.walk(leave = leave) == 15, "Trie::walk aggregate")
+		self.assertTrue(sums == {'': 15, 'com': 10, 'com.example': 5, 'com.example.sub': 3, 'com.other': 4, 'org': 5, 'org.example': 5}, "Trie::walk post order")
+		self.assertTrue(self.trie.walk(leave = leave, prefix = 'com') == 10, "Trie::walk aggregate prefix")
+		
+		# skipped subtrees are left without child results
+		self.assertTrue(self.trie.walk(lambda key, value: WALK_SKIP if key == ['com'] else None, leave = leave) == 6, "Trie::walk aggregate skip")